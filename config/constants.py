@@ -24,4 +24,7 @@ def get_color_rules_text():
 # AI Configuration
 LLM_MODEL_NAME = "gemini-flash-latest"       # Used for Chat Agent
 VISION_MODEL_NAME = "gemini-2.0-flash"       # Used for Image Extraction <--- NEW
+VISION_MAX_WORKERS = 4                       # Images extracted in parallel during a visual import
+VISION_MAX_DIMENSION = 1600                  # Longest image side sent to the vision model (px)
+VISION_GRAYSCALE = False                     # Send images in grayscale (smaller, loses colour cues)
 LLM_TEMPERATURE = 0.0
\ No newline at end of file
@@ -1,83 +1,194 @@
-import json
-from PIL import Image
-from config.constants import EVENT_CATEGORIES, VISION_MODEL_NAME
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config.constants import (
+    EVENT_CATEGORIES, VISION_MODEL_NAME, VISION_MAX_WORKERS, VISION_MAX_DIMENSION, VISION_GRAYSCALE
+)
 from config.prompts import get_vision_prompt
-from tools.document_extraction import extract_events_from_image 
-from tools.calendar_ops import add_event, _fetch_events_from_db, get_conflicts_report
-from tools.database_ops import verify_user, create_user
-
-# Langfuse setup
-try:
-    from langfuse import observe
-except ImportError:
-    def observe(name=None):
-        def decorator(func): return func
-        return decorator
+from tools.calendar_ops import add_events_bulk, find_events, fetch_events, find_conflicts, get_events_version, get_conflicts_report
+from tools.event_cache import event_cache
+from tools.extraction_cache import extraction_cache
+from tools.database_ops import (
+    verify_user, create_user, init_db, create_session_token, verify_session_token, revoke_session_token
+)
+from tools.observability import observe
+from tools.profiling import profiled
 
 class CalendarService:
+
+    @staticmethod
+    @profiled
+    def initialize_storage():
+        """Creates tables and applies pending schema migrations (idempotent)."""
+        init_db()
     
     @staticmethod
+    @profiled
     def authenticate(username, password):
         return verify_user(username, password)
 
     @staticmethod
+    @profiled
     def register_user(username, password, email):
         return create_user(username, password, email)
 
     @staticmethod
+    @profiled
+    def issue_session_token(user_id):
+        """Signed token that lets this browser skip the password check next time."""
+        return create_session_token(user_id)
+
+    @staticmethod
+    @profiled
+    def resume_session(token):
+        """(valid, user_id, username) for a session token; no bcrypt involved."""
+        return verify_session_token(token)
+
+    @staticmethod
+    @profiled
+    def end_session(token):
+        """Revokes a session token on logout, so a leaked copy can't resume the session."""
+        return revoke_session_token(token)
+
+    @staticmethod
+    @profiled
     def get_conflict_report(user_id):
+        """Reads the conflicts maintained on every write (no re-expansion)."""
         return get_conflicts_report(user_id)
 
     @staticmethod
-    def get_ui_events(user_id):
-        """Fetches events and ensures they are in a format Streamlit-Calendar likes."""
-        events = _fetch_events_from_db(user_id)
-        
-        # If your tool returns a JSON string, decode it here ONCE.
-        if isinstance(events, str):
-            try:
-                return json.loads(events)
-            except json.JSONDecodeError:
-                return []
-        return events if events else []
+    @profiled
+    def get_conflicts(user_id, window_start=None, window_end=None, limit=20, offset=0):
+        """Structured, pageable conflict report (see tools.conflicts.ConflictReport)."""
+        return find_conflicts(user_id, window_start, window_end, limit=limit, offset=offset)
 
-    @observe(name="Service: Visual Import")
-    @staticmethod # Only one is needed
-    def process_visual_import_workflow(image, user_id, agent, hint):
-        """Orchestrates extraction, DB saving, and Agent notification."""
-        
-        # 1. Extraction
-        events = extract_events_from_image(
+    @staticmethod
+    @profiled
+    def get_ui_events(user_id, range_start=None, range_end=None):
+        """
+        Fetches the events visible in [range_start, range_end) in a format Streamlit-Calendar likes.
+        Without a range, the user's whole calendar is returned.
+
+        Results are cached per user and window, and reused only while the user's
+        data version is unchanged. Treat the returned list as read-only.
+        """
+        key = (range_start, range_end)
+        version = get_events_version(user_id)
+        events = event_cache.get(user_id, key, version)
+        if events is None:
+            events = [event.to_fullcalendar() for event in fetch_events(user_id, range_start, range_end)]
+            event_cache.put(user_id, key, version, events)
+        return events
+
+    @staticmethod
+    @profiled
+    def search_events(user_id, query, limit=10):
+        """Ranked, typo-tolerant title search for the sidebar search box."""
+        return find_events(user_id, query, limit=limit)
+
+    @staticmethod
+    def get_cache_stats():
+        return event_cache.stats()
+
+    @staticmethod
+    def get_vision_cache_stats():
+        """Hit/miss/eviction counters and size of the vision extraction cache."""
+        return extraction_cache.stats()
+
+    @staticmethod
+    def _extract_image(image, hint):
+        # Imported here: google-genai and PIL are only needed once an image is uploaded
+        from tools.document_extraction import extract_events_from_image
+        return extract_events_from_image(
             image=image,
             event_categories=EVENT_CATEGORIES,
             vision_model_name=VISION_MODEL_NAME,
             get_vision_prompt_fn=get_vision_prompt,
-            user_hint=hint
+            user_hint=hint,
+            max_dimension=VISION_MAX_DIMENSION,
+            grayscale=VISION_GRAYSCALE
         )
 
+    @staticmethod
+    @profiled
+    def extract_images(images, hint, on_progress=None, max_workers=VISION_MAX_WORKERS):
+        """
+        Runs the vision extraction for several images on a bounded thread pool.
+
+        The calls are network bound, so N images take about as long as the slowest one.
+        on_progress(done, total, index, events, error) is called from the calling thread
+        as each image finishes, so it is safe to update Streamlit widgets from it.
+
+        Returns one (events, error) tuple per image, in upload order.
+        """
+        results = [([], None)] * len(images)
+        if not images:
+            return results
+
+        workers = max(1, min(max_workers, len(images)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vision") as pool:
+            futures = {
+                pool.submit(CalendarService._extract_image, image, hint): i
+                for i, image in enumerate(images)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    results[i] = (future.result() or [], None)
+                except Exception as e:
+                    results[i] = ([], e)
+                if on_progress:
+                    on_progress(done, len(images), i, *results[i])
+        return results
+
+    @observe(name="Service: Visual Import")
+    @staticmethod # Only one is needed
+    @profiled
+    def process_visual_import_workflow(images, user_id, agent, hint, on_progress=None):
+        """
+        Orchestrates extraction, DB saving, and Agent notification.
+        Accepts a single image or a list of images; see extract_images for on_progress.
+        """
+        if not isinstance(images, (list, tuple)):
+            images = [images]
+
+        # 1. Extraction (in parallel, one vision call per image)
+        extracted = CalendarService.extract_images(images, hint, on_progress)
+        events = [event for image_events, _ in extracted for event in image_events]
+        failed = sum(1 for _, error in extracted if error is not None)
+
         if not events:
-            return "No events found in the image."
-
-        # 2. Saving to DB
-        added_titles = []
-        for event in events:
-            res = add_event(
-                title=event['title'], 
-                start=event['start'], 
-                end=event['end'], 
-                allDay=event.get('allDay', False),
-                user_id=user_id,
-                recurrence=event.get('recurrence'),
-                recurrence_end=event.get('recurrence_end'),
-                color=event.get('color', '#3788d8')
-            )
-            if "Success" in res:
-                added_titles.append(event['title'])
+            if failed:
+                errors = "; ".join(str(error) for _, error in extracted if error is not None)
+                return f"Couldn't read {failed} of {len(images)} images: {errors}"
+            return "No events found in the image." if len(images) == 1 else "No events found in the images."
+
+        # 2. Saving to DB (one transaction for every extracted event).
+        # Rows go in as extracted: a malformed one gets an "error" status of its own
+        results = add_events_bulk(user_id, events)
+
+        added_titles = [r["title"] for r in results if r["status"] == "added"]
+        conflicts = [c for r in results for c in r["conflicts"]]
+        save_errors = [r["message"] for r in results if r["status"] == "error"]
+
+        # Make sure the next rerun renders the imported events
+        event_cache.invalidate(user_id)
 
         # 3. Agent Notification
         if added_titles:
-            sync_text = f"SYSTEM UPDATE: User uploaded an image. I've automatically added these to the DB: {', '.join(added_titles)}."
+            source = "an image" if len(images) == 1 else f"{len(images)} images"
+            sync_text = f"SYSTEM UPDATE: User uploaded {source}. I've automatically added these to the DB: {', '.join(added_titles)}."
             agent.send_message(sync_text)
-            return f"✅ Imported {len(added_titles)} events: {', '.join(added_titles)}"
+            summary = f"✅ Imported {len(added_titles)} events: {', '.join(added_titles)}"
+            skipped = sum(1 for r in results if r["status"] == "skipped")
+            if skipped:
+                summary += f" ({skipped} already in your calendar)"
+            if failed:
+                summary += f"\n\n⚠️ {failed} of {len(images)} images couldn't be read."
+            if save_errors:
+                summary += f"\n\n⚠️ {len(save_errors)} events couldn't be saved: " + "; ".join(save_errors)
+            if conflicts:
+                summary += "\n\n" + "\n\n".join(c.describe() for c in conflicts)
+            return summary
         
+        if save_errors:
+            return "Processed image, but couldn't save events to the database: " + "; ".join(save_errors)
         return "Processed image, but couldn't save events to the database."
\ No newline at end of file
@@ -1,22 +1,16 @@
 import os
 import sys
+import time
 import datetime
+import functools
+import inspect
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional
 from dotenv import load_dotenv
 import traceback
 
-# --- LANGFUSE SETUP (Optional, with fallback) ---
-try:
-    from langfuse import observe
-    LANGFUSE_AVAILABLE = True
-except ImportError:
-    LANGFUSE_AVAILABLE = False
-    print("Warning: Langfuse not available, observability disabled")
-    # Create a no-op decorator
-    def observe(**kwargs):
-        def decorator(func):
-            return func
-        return decorator
-
 # --- PATH SETUP ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(current_dir)
@@ -24,44 +18,239 @@ if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
 # --- IMPORTS ---
+# Nothing heavy here: google-genai and langfuse load on the first agent/traced call
 from tools.api_client import get_genai_client
-from tools.calendar_ops import add_event, list_events_json, delete_event, check_availability, get_conflicts_report
+from tools.observability import observe
+from tools.metrics import AGENT_FIRST_TOKEN_SECONDS, AGENT_TURN_ERRORS, AGENT_TURN_SECONDS
+from tools.calendar_ops import add_event, list_events_json, search_events, delete_event, check_availability, get_conflicts_report
 from config.constants import get_color_rules_text, LLM_MODEL_NAME, LLM_TEMPERATURE
 from config.prompts import get_system_instruction
 
 # 1. Load environment
 load_dotenv()
 
-# 2. Get API client from centralized module
-try:
-    client = get_genai_client()
-except ValueError as e:
-    raise ValueError(f"Failed to initialize API client: {str(e)}")
+# 2. The API client is created lazily by get_agent() (see tools/api_client.py)
 
 # 3. Register Tools
-tools_list = [add_event, list_events_json, delete_event, check_availability, get_conflicts_report]
+# Each tool is wrapped to report start/finish to whoever is running the
+# current turn on this thread (see LangfuseWrapper._run_tools).
+@dataclass
+class ToolEvent:
+    name: str
+    phase: str                          # "start" or "end"
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    def describe(self) -> str:
+        if self.phase == "start":
+            return f"🔧 Running `{self.name}`..."
+        if self.error:
+            return f"❌ `{self.name}` failed after {self.duration_ms:.0f} ms: {self.error}"
+        return f"✅ `{self.name}` finished in {self.duration_ms:.0f} ms"
+
+_tool_listener = threading.local()
+
+def _notify_tool(event: ToolEvent):
+    callback = getattr(_tool_listener, "callback", None)
+    if callback is not None:
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"Warning: tool progress callback failed: {e}")
+
+def _track_tool(func):
+    @functools.wraps(func)  # Keeps the name, docstring and signature the SDK builds the schema from
+    def wrapper(*args, **kwargs):
+        _notify_tool(ToolEvent(func.__name__, "start"))
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            _notify_tool(ToolEvent(func.__name__, "end", (time.perf_counter() - started) * 1000, str(e)))
+            raise
+        _notify_tool(ToolEvent(func.__name__, "end", (time.perf_counter() - started) * 1000))
+        return result
+    return wrapper
+
+tools_list = [_track_tool(t) for t in (add_event, list_events_json, search_events, delete_event, check_availability, get_conflicts_report)]
+_tools_by_name = {t.__name__: t for t in tools_list}
+
+# Upper bound on model -> tool -> model round trips within one turn
+MAX_TOOL_ROUNDS = 10
+
+@functools.lru_cache(maxsize=1)
+def get_tool_declarations():
+    """
+    Function declarations for tools_list, introspected once per process.
+    Passing callables in the config would make the SDK rebuild them on every request.
+    """
+    from google import genai
+    return genai.types.Tool(function_declarations=[
+        genai.types.FunctionDeclaration.from_callable_with_api_option(callable=tool, api_option="GEMINI_API")
+        for tool in tools_list
+    ])
+
+@functools.lru_cache(maxsize=1)
+def get_config_template():
+    """
+    The parts of the chat config shared by every user. get_agent() copies it
+    and only sets the system instruction. Automatic function calling is off
+    because the declarations are prebuilt; LangfuseWrapper runs the tools.
+    """
+    from google import genai
+    return genai.types.GenerateContentConfig(
+        temperature=LLM_TEMPERATURE,
+        tools=[get_tool_declarations()],
+        automatic_function_calling=genai.types.AutomaticFunctionCallingConfig(disable=True),
+    )
+
+def _coerce_args(func, args: dict) -> dict:
+    """JSON numbers arrive as floats; convert them back for parameters annotated as int."""
+    params = inspect.signature(func).parameters
+    coerced = {}
+    for name, value in (args or {}).items():
+        if params.get(name) is not None and params[name].annotation is int \
+                and isinstance(value, float) and value.is_integer():
+            value = int(value)
+        coerced[name] = value
+    return coerced
 
-# 4. Dynamic Date Setup
-today = datetime.date.today()
-today_str = today.strftime("%Y-%m-%d")
+# 4. Define the AI Persona
+@functools.lru_cache(maxsize=2)
+def _base_instruction(today_str: str) -> str:
+    return get_system_instruction(today_str, get_color_rules_text())
 
-# 5. Fetch Shared Rules
-color_rules = get_color_rules_text()
+def get_base_instruction(today: datetime.date = None) -> str:
+    """System prompt with today's date and the shared color rules (built once per day, not frozen at import)."""
+    return _base_instruction((today or datetime.date.today()).strftime("%Y-%m-%d"))
 
-# 6. Define the AI Persona
-SYSTEM_INSTRUCTION = get_system_instruction(today_str, color_rules)
+# --- PER-TURN TIMINGS ---
+@dataclass
+class TurnMetrics:
+    streamed: bool
+    ttft_ms: Optional[float] = None      # Time to first text chunk (streaming only)
+    total_ms: Optional[float] = None
+    chunks: int = 0
+    tool_calls: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+MAX_TURN_HISTORY = 50
+
+def _record_turn(metrics: TurnMetrics):
+    """Copies a finished turn into the process-wide registry (tools/metrics.py) for p50/p99."""
+    mode = "stream" if metrics.streamed else "send"
+    if metrics.total_ms is not None:
+        AGENT_TURN_SECONDS.observe(metrics.total_ms / 1000, mode=mode)
+    if metrics.ttft_ms is not None:
+        AGENT_FIRST_TOKEN_SECONDS.observe(metrics.ttft_ms / 1000)
+    if metrics.error is not None:
+        AGENT_TURN_ERRORS.inc(mode=mode)
+
+def _chunk_text(chunk) -> str:
+    """Text parts of a streamed chunk (chunk.text warns on chunks that only hold function calls)."""
+    candidates = getattr(chunk, "candidates", None)
+    if not candidates or not candidates[0].content or not candidates[0].content.parts:
+        return ""
+    return "".join(part.text for part in candidates[0].content.parts if getattr(part, "text", None))
 
 # --- OBSERVABILITY WRAPPER (CRITICAL FOR GROUPING) ---
 class LangfuseWrapper:
-    def __init__(self, chat_session):
+    def __init__(self, chat_session, created_ms: float = None):
         self.chat = chat_session
+        self.created_ms = created_ms  # How long get_agent() took
+        self.turns = deque(maxlen=MAX_TURN_HISTORY)  # TurnMetrics, newest last
+
+    @staticmethod
+    def _run_tools(function_calls) -> list:
+        """Executes the model's function calls and returns the response parts to send back."""
+        from google import genai
+        parts = []
+        for call in function_calls:
+            tool = _tools_by_name.get(call.name)
+            try:
+                if tool is None:
+                    raise ValueError(f"Unknown tool '{call.name}'")
+                response = {"result": tool(**_coerce_args(tool, call.args))}
+            except Exception as e:
+                response = {"error": str(e)}
+            parts.append(genai.types.Part.from_function_response(name=call.name, response=response))
+        return parts
+
+    @property
+    def last_turn(self) -> Optional[TurnMetrics]:
+        return self.turns[-1] if self.turns else None
+
+    @observe(as_type="generation", name="Agent Turn (streaming)")
+    def stream_message(self, message, on_tool: Callable[[ToolEvent], None] = None) -> Iterator[str]:
+        """
+        Like send_message, but yields text chunks as they arrive (for st.write_stream).
+        Tool calls made by the model during the turn are reported through on_tool.
+        Time to first token and total latency are recorded in self.turns.
+        """
+        metrics = TurnMetrics(streamed=True)
+        self.turns.append(metrics)
+
+        def _on_tool(event: ToolEvent):
+            if event.phase == "start":
+                metrics.tool_calls.append(event.name)
+            if on_tool:
+                on_tool(event)
+
+        previous = getattr(_tool_listener, "callback", None)
+        _tool_listener.callback = _on_tool
+        started = time.perf_counter()
+        try:
+            pending = message
+            for round_number in range(MAX_TOOL_ROUNDS + 1):
+                function_calls = []
+                for chunk in self.chat.send_message_stream(pending):
+                    function_calls.extend(chunk.function_calls or [])
+                    text = _chunk_text(chunk)
+                    if not text:
+                        continue
+                    if metrics.ttft_ms is None:
+                        metrics.ttft_ms = (time.perf_counter() - started) * 1000
+                    metrics.chunks += 1
+                    yield text
+                if not function_calls or round_number == MAX_TOOL_ROUNDS:
+                    break
+                pending = self._run_tools(function_calls)
+            if metrics.chunks == 0:
+                yield "I couldn't generate a response text. Tool may have been called."
+        except Exception as e:
+            metrics.error = str(e)
+            error_msg = f"Error in stream_message: {str(e)}\n{traceback.format_exc()}"
+            print(error_msg)
+            yield f"Error: {str(e)}"
+        finally:
+            _tool_listener.callback = previous
+            metrics.total_ms = (time.perf_counter() - started) * 1000
+            _record_turn(metrics)
+            ttft = f"{metrics.ttft_ms:.0f} ms" if metrics.ttft_ms is not None else "n/a"
+            print(f"Agent turn (streamed): first token {ttft}, total {metrics.total_ms:.0f} ms, "
+                  f"{metrics.chunks} chunks, tools: {', '.join(metrics.tool_calls) or 'none'}")
 
     @observe(as_type="generation", name="Agent Turn") 
     def send_message(self, message):
         # This function runs EVERY time you chat.
         # It creates a "Parent Span" that captures all tool calls inside it.
+        metrics = TurnMetrics(streamed=False)
+        self.turns.append(metrics)
+
+        def _on_tool(event: ToolEvent):
+            if event.phase == "start":
+                metrics.tool_calls.append(event.name)
+
+        previous = getattr(_tool_listener, "callback", None)
+        _tool_listener.callback = _on_tool
+        started = time.perf_counter()
         try:
             response = self.chat.send_message(message)
+            for _ in range(MAX_TOOL_ROUNDS):
+                if response is None or not response.function_calls:
+                    break
+                response = self.chat.send_message(self._run_tools(response.function_calls))
+            metrics.total_ms = (time.perf_counter() - started) * 1000
             
             # Debug: Check what we got
             if response is None:
@@ -92,6 +281,8 @@ class LangfuseWrapper:
             return response
             
         except Exception as e:
+            metrics.total_ms = (time.perf_counter() - started) * 1000
+            metrics.error = str(e)
             error_msg = f"Error in send_message: {str(e)}\n{traceback.format_exc()}"
             print(error_msg)
             # Return a response object with the error message
@@ -99,11 +290,17 @@ class LangfuseWrapper:
                 def __init__(self, txt):
                     self.text = txt
             return ErrorResponse(f"Error: {str(e)}")
+        finally:
+            _tool_listener.callback = previous
+            _record_turn(metrics)
 
-def get_agent(user_id: int, username: str) -> LangfuseWrapper:
+def get_agent(user_id: int, username: str, client=None) -> LangfuseWrapper:
     """
     Initializes and returns the Gemini Chat Session with dynamic date awareness and user security.
+    Pass `client` to reuse a process-wide GenAI client (e.g. one held by st.cache_resource).
     """
+    started = time.perf_counter()
+
     # 1. Get current time context
     now = datetime.datetime.now()
     today_date = now.strftime("%A, %B %d, %Y")
@@ -128,17 +325,19 @@ def get_agent(user_id: int, username: str) -> LangfuseWrapper:
     """
 
     # 3. COMBINE THEM
-    # Ensure SYSTEM_INSTRUCTION is defined globally or imported
-    full_instruction = SYSTEM_INSTRUCTION + security_instruction
+    full_instruction = get_base_instruction(now.date()) + security_instruction
 
     # 4. Pass 'full_instruction' to the model
-    chat = client.chats.create(
-        model=LLM_MODEL_NAME,
-        config=__import__("google").genai.types.GenerateContentConfig(
-            temperature=LLM_TEMPERATURE,
-            system_instruction=full_instruction,
-            tools=tools_list,
-        )
-    )
-    
-    return LangfuseWrapper(chat)
\ No newline at end of file
+    if client is None:
+        try:
+            client = get_genai_client()
+        except ValueError as e:
+            raise ValueError(f"Failed to initialize API client: {str(e)}")
+
+    # Only the instruction differs per user; tools and settings come from the shared template
+    config = get_config_template().model_copy(update={"system_instruction": full_instruction})
+    chat = client.chats.create(model=LLM_MODEL_NAME, config=config)
+
+    created_ms = (time.perf_counter() - started) * 1000
+    print(f"Agent created for user {user_id} in {created_ms:.1f} ms")
+    return LangfuseWrapper(chat, created_ms)
\ No newline at end of file
@@ -1,5 +1,7 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from streamlit_calendar import calendar
+import json
 import os
 import sys
 
@@ -21,18 +23,10 @@ for d in [root_dir, config_dir, services_dir, tools_dir]:
 # Now that Python knows where 'services' and 'tools' are, we can import them
 from services.calendar_service import CalendarService
 from src.agent import get_agent
-
-# Langfuse observability
-try:
-    from langfuse import observe
-    langfuse_available = True
-except ImportError:
-    # Fallback: no-op decorator if langfuse unavailable
-    def observe(name):
-        def decorator(func):
-            return func
-        return decorator
-    langfuse_available = False
+from tools.auth import SESSION_TTL_SECONDS
+from tools.profiling import (
+    PROFILE_QUERY_PARAM, finish_rerun, new_history, profiling_enabled, section as profile_section, start_rerun
+)
 
 # Robust Import: Try package import first, fallback to direct
 # UPDATED: Now imports VISION_MODEL_NAME from constants
@@ -49,6 +43,41 @@ except ImportError:
         VISION_MODEL_NAME = "gemini-2.0-flash" # Fallback default
         st.error("⚠️ Could not load config. Defaulting to Grey & Default Vision Model.")
 
+# --- PROFILING (opt-in) ---
+# AGENDAI_PROFILE=1 or ?profile=1: time this rerun and show the breakdown in the sidebar
+_profiling = profiling_enabled(st.query_params.get(PROFILE_QUERY_PARAM))
+if _profiling:
+    if "profile_history" not in st.session_state:
+        st.session_state.profile_history = new_history()
+    _rerun_profiler = start_rerun(st.session_state.profile_history)
+
+# --- DATABASE SETUP ---
+# Runs once per server process; migrations are skipped when already applied.
+@st.cache_resource
+def _initialize_storage():
+    CalendarService.initialize_storage()
+    return True
+
+_initialize_storage()
+
+# --- METRICS EXPORT ---
+# Optional: AGENDAI_METRICS_PORT serves /metrics, AGENDAI_METRICS_FILE writes a snapshot file
+@st.cache_resource
+def _start_metrics_exporters():
+    from tools.metrics import start_exporters
+    return start_exporters()
+
+_start_metrics_exporters()
+
+# --- OCCURRENCE HORIZON ---
+# Background job that moves the materialized occurrences along as days pass
+@st.cache_resource
+def _start_occurrence_extender():
+    from tools.occurrences import start_extender
+    return start_extender()
+
+_start_occurrence_extender()
+
 # --- AUTHENTICATION ---
 # Initialize session state for authentication
 if 'authenticated' not in st.session_state:
@@ -60,6 +89,44 @@ if 'username' not in st.session_state:
 if 'show_signup' not in st.session_state:
     st.session_state.show_signup = False
 
+# Returning browser: a valid session token in a cookie skips the password (and bcrypt) check.
+# The token stays out of the URL, so it can't leak through history, bookmarks or shared links.
+SESSION_COOKIE = "agendai_session"
+LEGACY_SESSION_QUERY_PARAM = "session"  # Older versions put the token in the URL
+
+def _write_session_cookie(token=None):
+    """Sets (or, without a token, deletes) the session cookie in the browser."""
+    max_age = SESSION_TTL_SECONDS if token else 0
+    components.html(
+        f"""<script>
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        window.parent.document.cookie = "{SESSION_COOKIE}=" + {json.dumps(token or "")}
+            + "; Max-Age={max_age}; Path=/; SameSite=Strict" + secure;
+        </script>""",
+        height=0,
+    )
+
+if LEGACY_SESSION_QUERY_PARAM in st.query_params:
+    del st.query_params[LEGACY_SESSION_QUERY_PARAM]
+
+if not st.session_state.authenticated and not st.session_state.get("forget_session_cookie"):
+    cookie_token = st.context.cookies.get(SESSION_COOKIE)
+    if cookie_token:
+        valid, user_id, username = CalendarService.resume_session(cookie_token)
+        if valid:
+            st.session_state.authenticated = True
+            st.session_state.user_id = user_id
+            st.session_state.username = username
+            st.session_state.session_token = cookie_token
+        else:
+            st.session_state.forget_session_cookie = True  # Expired, revoked or tampered with
+
+if st.session_state.authenticated:
+    if st.session_state.get("session_token"):
+        _write_session_cookie(st.session_state.session_token)
+elif st.session_state.get("forget_session_cookie"):
+    _write_session_cookie(None)
+
 # Login/Signup Form (shown if not authenticated)
 if not st.session_state.authenticated:
     st.markdown("<h1 style='text-align: center;'>📅 AgendAI</h1>", unsafe_allow_html=True)
@@ -83,6 +150,8 @@ if not st.session_state.authenticated:
                             st.session_state.authenticated = True
                             st.session_state.user_id = user_id
                             st.session_state.username = username
+                            st.session_state.session_token = CalendarService.issue_session_token(user_id)
+                            st.session_state.forget_session_cookie = False
                             st.success(f"Welcome back, {username}!")
                             st.rerun()
                         else:
@@ -140,10 +209,19 @@ st.markdown(
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# One GenAI client per server process, shared by every session's agent
+@st.cache_resource
+def _get_genai_client():
+    from tools.api_client import get_genai_client
+    return get_genai_client()
+
 if st.session_state.authenticated and "agent" not in st.session_state:
     try:
         # Pass the user_id to the agent so it can use it for tools
-        st.session_state.agent = get_agent(st.session_state.user_id, st.session_state.username)
+        with profile_section("get_agent"):
+            st.session_state.agent = get_agent(
+                st.session_state.user_id, st.session_state.username, client=_get_genai_client()
+            )
         st.session_state.messages.append({
             "role": "assistant", 
             "content": f"Hello {st.session_state.username}! I'm AgendAI. How can I help you manage your schedule today?"
@@ -156,8 +234,10 @@ with st.sidebar:
     # User info and logout at the top
     st.markdown(f"👤 **{st.session_state.username}**")
     if st.button("🚪 Logout"):
-        # 1. Wipe the entire temporary whiteboard
-        st.session_state.clear() 
+        # 1. Revoke this browser's session token, then wipe the entire temporary whiteboard
+        CalendarService.end_session(st.session_state.get("session_token"))
+        st.session_state.clear()
+        st.session_state.forget_session_cookie = True  # The login screen deletes the cookie
         # 2. Force the app to restart from the beginning (login screen)
         st.rerun()
     
@@ -166,34 +246,45 @@ with st.sidebar:
 # 1. VISUAL IMPORT
     st.header("📷 Visual Import")
     
-    uploaded_file = st.file_uploader("Upload schedule image", type=["png", "jpg", "jpeg", "webp"])
+    uploaded_files = st.file_uploader(
+        "Upload schedule images", type=["png", "jpg", "jpeg", "webp"], accept_multiple_files=True
+    )
     user_hint = st.text_input("Context (Optional)", placeholder="e.g., 'Weekly starting Monday'")
     
-    if uploaded_file is not None:
-        if st.button("Process Image", type="primary"): 
-            with st.spinner("Analyzing the document..."):
-                try:
-                    # 1. Convert Streamlit object to raw bytes/PIL Image HERE
-                    # This keeps the backend "Streamlit-free"
-                    from PIL import Image
-                    img = Image.open(uploaded_file)
-    
-                    # 2. Call the service. The service now returns a single status message.
-                    # We pass the agent so the service can update it internally.
-                    success_msg = CalendarService.process_visual_import_workflow(
-                        image=img,
-                        user_id=st.session_state.user_id,
-                        agent=st.session_state.agent,
-                        hint=user_hint
-                    )
-                    
-                    # 3. Handle UI feedback
-                    st.success(success_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": success_msg})
-                    st.rerun()
-                    
-                except Exception as e:
-                    st.error(f"Vision Processing Error: {e}")
+    if uploaded_files:
+        label = "Process Image" if len(uploaded_files) == 1 else f"Process {len(uploaded_files)} Images"
+        if st.button(label, type="primary"): 
+            progress_bar = st.progress(0.0, text="Analyzing the documents...")
+            try:
+                # 1. Convert Streamlit objects to PIL Images HERE
+                # This keeps the backend "Streamlit-free"
+                from PIL import Image
+                images = [Image.open(f) for f in uploaded_files]
+
+                # Called from this thread as each image finishes (images run in parallel)
+                def _on_image_done(done, total, index, events, error):
+                    name = uploaded_files[index].name
+                    status = f"❌ {name}: {error}" if error else f"✅ {name}: {len(events)} events"
+                    progress_bar.progress(done / total, text=f"{done}/{total} images analyzed")
+                    st.caption(status)
+
+                # 2. Call the service. The service now returns a single status message.
+                # We pass the agent so the service can update it internally.
+                success_msg = CalendarService.process_visual_import_workflow(
+                    images=images,
+                    user_id=st.session_state.user_id,
+                    agent=st.session_state.agent,
+                    hint=user_hint,
+                    on_progress=_on_image_done
+                )
+                
+                # 3. Handle UI feedback
+                st.success(success_msg)
+                st.session_state.messages.append({"role": "assistant", "content": success_msg})
+                st.rerun()
+                
+            except Exception as e:
+                st.error(f"Vision Processing Error: {e}")
 
     st.markdown("---")
 
@@ -215,6 +306,21 @@ with st.sidebar:
             except Exception as e:
                 st.error(f"Error: {e}")
 
+    # Find an event by title (full-text index, tolerates typos)
+    search_query = st.text_input("🔎 Find an event", placeholder="e.g., 'dentist'")
+    if search_query.strip():
+        try:
+            matches = CalendarService.search_events(st.session_state.user_id, search_query)
+            if matches:
+                for match in matches:
+                    when = match["start"].replace("T", " ")[:16]
+                    repeats = f" · repeats {match['repeats']}" if match.get("repeats") else ""
+                    st.markdown(f"**{match['title']}** · {when}{repeats}")
+            else:
+                st.caption("No matching events.")
+        except Exception as e:
+            st.error(f"Search error: {e}")
+
     st.markdown("---")
 
     # 3. CHAT HISTORY
@@ -237,24 +343,29 @@ with st.sidebar:
         with messages_container:
             with st.chat_message("assistant"):
                 try:
-                    response_placeholder = st.empty()
-                    response_placeholder.markdown("Thinking...")
-                    
-                    # Send message and get response
-                    response = st.session_state.agent.send_message(prompt)
-                    
-                    # Handle response
-                    if response is None:
+                    # Tool progress goes above the answer; created on the first tool call
+                    tool_slot = st.empty()
+                    tool_status = {}
+
+                    def _on_tool(event):
+                        if "box" not in tool_status:
+                            tool_status["box"] = tool_slot.status("Checking your calendar...", expanded=False)
+                        tool_status["box"].write(event.describe())
+
+                    # Render text chunks as they arrive instead of waiting for the whole turn
+                    with profile_section("agent turn"):
+                        response_text = st.write_stream(
+                            st.session_state.agent.stream_message(prompt, on_tool=_on_tool)
+                        )
+                    if "box" in tool_status:
+                        tool_status["box"].update(label="Done", state="complete")
+
+                    if not response_text:
                         response_text = "I received no response. Please check the logs."
-                        st.error("Response was None - Check agent logs")
-                    elif hasattr(response, 'text'):
-                        response_text = response.text
-                        if response_text is None:
-                            response_text = "I couldn't generate a response text. Tool may have been called."
-                    else:
-                        response_text = str(response)
-                    
-                    response_placeholder.markdown(response_text)
+                        st.error("Empty response - Check agent logs")
+                    elif not isinstance(response_text, str):
+                        response_text = "".join(str(part) for part in response_text)
+
                     st.session_state.messages.append({"role": "assistant", "content": response_text})
                 except Exception as e:
                     import traceback
@@ -263,9 +374,23 @@ with st.sidebar:
                     print(error_msg)
 
 # --- MAIN PAGE: CALENDAR ---
+def _default_calendar_range():
+    """Month grid around today: FullCalendar shows up to 6 weeks, so pad both sides."""
+    import datetime
+    first_of_month = datetime.date.today().replace(day=1)
+    next_month = (first_of_month + datetime.timedelta(days=32)).replace(day=1)
+    return (
+        (first_of_month - datetime.timedelta(days=7)).isoformat(),
+        (next_month + datetime.timedelta(days=14)).isoformat(),
+    )
+
+if "calendar_range" not in st.session_state:
+    st.session_state.calendar_range = _default_calendar_range()
+
 try:
-    # Use the service to get a clean list of events (it handles the JSON parsing)
-    events_list = CalendarService.get_ui_events(st.session_state.user_id)
+    # Only load the events that can appear in the currently visible window
+    range_start, range_end = st.session_state.calendar_range
+    events_list = CalendarService.get_ui_events(st.session_state.user_id, range_start, range_end)
     
     calendar_options = {
         "editable": False,
@@ -280,9 +405,45 @@ try:
         "height": "650px",
     }
     
-    calendar(events=events_list, options=calendar_options, key="agenda_calendar")
+    with profile_section("calendar render"):
+        calendar_state = calendar(
+            events=events_list,
+            options=calendar_options,
+            callbacks=["datesSet"],
+            key="agenda_calendar",
+        )
+
+    # Navigating (prev/next, view switch) reports the new visible window; reload for it
+    dates_set = (calendar_state or {}).get("datesSet")
+    if dates_set:
+        new_range = (dates_set["start"], dates_set["end"])
+        if new_range != tuple(st.session_state.calendar_range):
+            st.session_state.calendar_range = new_range
+            st.rerun()
 
 except Exception as e:
     st.error(f"Error loading calendar: {e}")
     import traceback
-    st.error(traceback.format_exc())
\ No newline at end of file
+    st.error(traceback.format_exc())
+
+# --- PROFILING PANEL ---
+def _render_profile_panel(report, history):
+    with st.sidebar.expander("⏱️ Rerun profile", expanded=False):
+        st.caption(f"This rerun took {report.total_ms:.0f} ms")
+        st.dataframe(report.breakdown(), hide_index=True, use_container_width=True)
+        st.markdown("**Top functions (cumulative time)**")
+        st.dataframe(report.top_functions, hide_index=True, use_container_width=True)
+        if report.dump_path:
+            st.caption(f"Profile saved to `{report.dump_path}`")
+        earlier = list(history)[:-1]
+        if earlier:
+            st.markdown("**Earlier reruns**")
+            st.dataframe([
+                {"ms": round(r.total_ms), "slowest section": max(r.sections, key=lambda s: s.ms).name if r.sections else "-",
+                 "interrupted": r.interrupted}
+                for r in reversed(earlier)
+            ], hide_index=True, use_container_width=True)
+
+if _profiling:
+    _render_profile_panel(finish_rerun(_rerun_profiler, st.session_state.profile_history),
+                          st.session_state.profile_history)
@@ -3,22 +3,21 @@ Centralized API client initialization for Google GenAI.
 
 This module handles all external API connections and credentials.
 It ensures a single point of control for API clients across the application.
+
+Importing it is cheap and never fails: google-genai is imported and the client
+is built on the first get_genai_client() call, so pages that never talk to
+Gemini (e.g. the login screen) don't pay for it.
 """
 
 import os
+import threading
 from dotenv import load_dotenv
-from google import genai
 
 # Load environment variables once at import time
 load_dotenv()
 
-# Get API key
-_api_key = os.getenv("GOOGLE_API_KEY")
-if not _api_key:
-    raise ValueError("API Key not found! Check your .env file.")
-
-# Initialize and cache the genai client
-_genai_client = genai.Client(api_key=_api_key)
+_genai_client = None
+_client_lock = threading.Lock()
 
 
 def get_genai_client():
@@ -26,7 +25,7 @@ def get_genai_client():
     Returns the initialized Google GenAI client.
     
     This is the single entry point for all GenAI API access throughout the application.
-    The client is initialized once and reused.
+    The client is created on the first call and reused afterwards.
     
     Returns:
         genai.Client: Initialized Google GenAI client
@@ -34,4 +33,13 @@ def get_genai_client():
     Raises:
         ValueError: If API key is not configured
     """
-    return _genai_client
\ No newline at end of file
+    global _genai_client
+    if _genai_client is None:
+        with _client_lock:
+            if _genai_client is None:
+                api_key = os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    raise ValueError("API Key not found! Check your .env file.")
+                from google import genai
+                _genai_client = genai.Client(api_key=api_key)
+    return _genai_client
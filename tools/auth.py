@@ -0,0 +1,191 @@
+"""
+Password hashing off the Streamlit script thread, and signed session tokens.
+
+bcrypt is CPU bound and slow on purpose, so a burst of logins would otherwise
+occupy the server's request threads. hash_password()/check_password() run it on
+a small, bounded process pool (spawned lazily, AGENDAI_AUTH_WORKERS processes)
+with a configurable cost (AGENDAI_BCRYPT_ROUNDS). needs_rehash() tells
+verify_user when a stored hash was made with a different cost.
+
+Session tokens let a returning browser skip the bcrypt check: they are
+HMAC-SHA256 signed with AGENDAI_SESSION_SECRET (or a random secret kept in
+data/session_secret), expire after AGENDAI_SESSION_TTL_HOURS and are bound to
+the user's current password hash, so a password change or rehash revokes them.
+Each token also carries a random id ('jti') that logging out records as revoked
+(see revoke_session_token in tools/database_ops.py).
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("AGENDAI_BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.getenv("AGENDAI_AUTH_WORKERS", str(min(4, os.cpu_count() or 1))))
+AUTH_TIMEOUT = 30.0                     # Seconds to wait for a hash/check before giving up
+SESSION_TTL_SECONDS = int(float(os.getenv("AGENDAI_SESSION_TTL_HOURS", "12")) * 3600)
+SECRET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'session_secret')
+
+
+# --- PASSWORD HASHING (process pool) ---
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: forking a threaded server process is unsafe
+                _executor = ProcessPoolExecutor(max_workers=max(1, AUTH_WORKERS),
+                                                mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(fn, *args):
+    """Runs fn on the pool (one retry if a worker died); falls back to this thread without workers."""
+    if AUTH_WORKERS <= 0:
+        return fn(*args)
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            return executor.submit(fn, *args).result(timeout=AUTH_TIMEOUT)
+        except BrokenProcessPool:
+            _reset_executor(executor)
+            if attempt:
+                raise
+
+
+def hash_password(password: str, rounds: int = None) -> str:
+    return _run(_hash, password, rounds or BCRYPT_ROUNDS)
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    return _run(_check, password, password_hash)
+
+
+def hash_rounds(password_hash: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if it isn't one."""
+    parts = password_hash.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return hash_rounds(password_hash) != BCRYPT_ROUNDS
+
+
+def shutdown():
+    """Stops the worker processes (they are also stopped at interpreter exit)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+# --- SESSION TOKENS ---
+
+_secret = None
+_secret_lock = threading.Lock()
+
+
+def _get_secret() -> bytes:
+    global _secret
+    if _secret is None:
+        with _secret_lock:
+            if _secret is None:
+                env_secret = os.getenv("AGENDAI_SESSION_SECRET")
+                if env_secret:
+                    _secret = env_secret.encode('utf-8')
+                elif os.path.exists(SECRET_PATH):
+                    with open(SECRET_PATH, "rb") as f:
+                        _secret = f.read().strip()
+                else:
+                    _secret = _create_secret_file()
+    return _secret
+
+
+def _create_secret_file() -> bytes:
+    secret = secrets.token_hex(32).encode('ascii')
+    os.makedirs(os.path.dirname(SECRET_PATH), exist_ok=True)
+    try:
+        fd = os.open(SECRET_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another server process got there first: use its secret
+        with open(SECRET_PATH, "rb") as f:
+            return f.read().strip()
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _fingerprint(password_hash: str) -> str:
+    return hashlib.sha256(password_hash.encode('utf-8')).hexdigest()[:16]
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_get_secret(), payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def issue_token(user_id: int, password_hash: str, ttl_seconds: int = SESSION_TTL_SECONDS) -> str:
+    claims = {"uid": user_id, "exp": int(time.time()) + ttl_seconds, "fp": _fingerprint(password_hash),
+              "jti": secrets.token_urlsafe(12)}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode('utf-8'))
+    return f"{payload}.{_sign(payload)}"
+
+
+def read_token(token: str) -> Optional[dict]:
+    """Claims of a correctly signed, unexpired token, or None. The caller checks 'fp' and 'jti'."""
+    try:
+        payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+
+def token_matches(claims: dict, password_hash: str) -> bool:
+    return hmac.compare_digest(str(claims.get("fp", "")), _fingerprint(password_hash))
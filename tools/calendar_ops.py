@@ -1,350 +1,902 @@
 import sqlite3
 import json
 from tools.database_ops import get_db_connection
-from datetime import datetime, timedelta
+from tools.event_cache import EventCache, event_cache
+from tools.interval_index import IntervalIndex
+from tools.conflicts import Conflict, ConflictReport, build_report
+from tools.event_search import fts_available, iter_title_matches
+from tools.recurrence import DAY_SECONDS, Series, first_overlap, from_epoch, normalize_recurrence, to_epoch
+from tools.occurrences import rolling_range
+from tools.event_model import Event
+from tools.observability import observe
+from tools.metrics import timed_tool
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+# --- SHARED HELPER: RECURRENCE EXPANSION ---
+
+def _series_for(event) -> Series:
+    """Series for an Event or row, or None (with a warning) if its dates are unusable."""
+    try:
+        return Series.from_stored(event)
+    except (ValueError, TypeError) as e:
+        print(f"Warning: Skipping event '{event['title']}' with unparseable dates: {e}")
+        return None
+
+# --- INTERNAL DATABASE FUNCTIONS (NO OBSERVABILITY) ---
+
+def _normalize_bound(value) -> str:
+    """Turns a date/datetime/ISO string (FullCalendar sends tz offsets) into a naive ISO string."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat(timespec="seconds")
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time()).isoformat(timespec="seconds")
+    value = str(value).strip().replace("Z", "+00:00")
+    if "T" not in value and " " not in value:
+        value += "T00:00:00"
+    return datetime.fromisoformat(value).replace(tzinfo=None).isoformat(timespec="seconds")
+
+def _bound_ts(value) -> int:
+    return to_epoch(datetime.fromisoformat(_normalize_bound(value)))
+
+def _window_clause(range_start=None, range_end=None):
+    """
+    SQL conditions (starting with ' AND') and parameters for events that can appear
+    in [range_start, range_end). Either bound may be None (open-ended).
+    Compares the integer columns only (end_ts is exclusive, so all-day events
+    already end at the next midnight). A series stays a candidate while its last
+    occurrence can still run into the window: until_day is compared with the window
+    start moved back by the series' occurrence length (end_ts - start_ts).
+    """
+    clause = ""
+    params = []
+
+    if range_end is not None:
+        clause += " AND start_ts < ?"
+        params.append(_bound_ts(range_end))
 
-# --- LANGFUSE SETUP (Optional, with fallback) ---
-try:
-    from langfuse import observe
-except ImportError:
-    def observe(**kwargs):
-        def decorator(func):
-            return func
-        return decorator
+    if range_start is not None:
+        start_ts = _bound_ts(range_start)
+        clause += f"""
+            AND (end_ts > ?
+                 OR (freq IS NOT NULL
+                     AND (until_day IS NULL OR until_day >= (? - (end_ts - start_ts)) / {DAY_SECONDS})))"""
+        params += [start_ts, start_ts]
 
-# --- SHARED HELPER: DATE PARSING ---
+    return clause, params
 
-def parse_dt(dt_str: str) -> datetime:
+def _occurs_in_window(rows, range_start=None, range_end=None):
     """
-    Parses a date string into a datetime object.
-    Handles both ISO format (with 'T') and simple 'YYYY-MM-DD'.
-    Returns a timezone-naive datetime for consistent comparison/calculation.
+    SQL only bounds recurring series by their first/last dates; lazily drop the
+    ones whose occurrences all fall between the window's edges.
     """
-    try:
-        if "T" in dt_str:
-            dt = datetime.fromisoformat(dt_str)
-            return dt.replace(tzinfo=None)
-        else:
-            return datetime.strptime(dt_str, "%Y-%m-%d")
-    except ValueError as e:
-        print(f"Warning: Could not parse date '{dt_str}': {e}")
-        return datetime.now() 
-
-# --- INTERNAL DATABASE FUNCTION (NO OBSERVABILITY) ---
+    if range_start is None or range_end is None:
+        yield from rows
+        return
+    window_start = datetime.fromisoformat(_normalize_bound(range_start))
+    window_end = datetime.fromisoformat(_normalize_bound(range_end))
+    for row in rows:
+        if (not row["freq"]
+                or (series := _series_for(row)) is None
+                or series.has_occurrence_in(window_start, window_end)):
+            yield row
+
+def _select_window_rows(conn, user_id: int, range_start=None, range_end=None) -> list:
+    """
+    Selects the raw rows of a user's events that can appear in [range_start, range_end).
+    Either bound may be None (open-ended).
+    """
+    clause, params = _window_clause(range_start, range_end)
+    rows = conn.execute("SELECT * FROM events WHERE user_id = ?" + clause, [user_id, *params]).fetchall()
+    return list(_occurs_in_window(rows, range_start, range_end))
 
-def _fetch_events_from_db(user_id: int) -> str:
+def fetch_events(user_id: int, range_start=None, range_end=None) -> list:
     """
-    Internal function to fetch events from database.
-    Includes fix for All-Day event rendering and duration calculation.
+    Fetches a user's events that can appear in [range_start, range_end) as Event objects.
+
+    Non-recurring events are filtered in SQL by overlap with the window.
+    Recurring series are kept only if they can produce an occurrence in it.
+    Without bounds, the user's whole history is returned.
+
+    Returns:
+        List of Event (see tools/event_model.py), or empty list on error
     """
     try:
         conn = get_db_connection()
-        # Ensure row_factory is Row so we can access by column name
-        conn.row_factory = sqlite3.Row 
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM events WHERE user_id = ?", (user_id,))
-            
-        rows = cursor.fetchall()
-        conn.close()
-        
-        events = []
-        for row in rows:
-            # Basic data mapping
-            is_all_day = bool(row["allDay"])
-            start_str = row["start"]
-            end_str = row["end"]
-
-            # --- FIX: EXCLUSIVE END DATE FOR ALL-DAY EVENTS ---
-            # If it's all-day, FullCalendar needs the 'end' to be the start of the NEXT day
-            if is_all_day and end_str:
-                try:
-                    # Parse current end (e.g., "2026-02-01 23:59:59" or "2026-02-01")
-                    # We only care about the date part for the shift
-                    end_dt = parse_dt(end_str) 
-                    # Add 1 day and set to midnight
-                    actual_end = (end_dt + timedelta(days=1)).strftime("%Y-%m-%d")
-                    end_str = actual_end
-                except Exception as e:
-                    print(f"Error adjusting allDay end date: {e}")
-
-            event_dict = {
-                "id": row["id"],
-                "title": row["title"],
-                "start": start_str,
-                "end": end_str,
-                "allDay": is_all_day, 
-                "backgroundColor": row["backgroundColor"],
-                "borderColor": row["borderColor"],
-                "resourceId": row["resourceId"],
-                "recurrence": row["recurrence"],
-                "recurrence_end": row["recurrence_end"]
-            }
-            
-            # --- HANDLE RECURRENCE DURATION ---
-            if row["recurrence"] and row["recurrence"].lower() != "none":
-                # Map user-friendly strings to RRule constants
-                freq_map = {
-                    "daily": "daily",
-                    "weekly": "weekly",
-                    "monthly": "monthly",
-                    "yearly": "yearly"
-                }
-                
-                selected_freq = freq_map.get(row["recurrence"].lower(), "daily")
-
-                # IMPORTANT: RRule often needs the start date without the "-" or ":" 
-                # for some versions, but let's try the standardized dict first.
-                rule = {
-                    "freq": selected_freq,
-                    "dtstart": row["start"] 
-                }
-                
-                if "recurrence_end" in row.keys() and row["recurrence_end"] and str(row["recurrence_end"]) != "None":
-                    rule["until"] = row["recurrence_end"]
-
-                event_dict["rrule"] = rule
-                
-                # FullCalendar needs a 'duration' if using rrule, or it defaults to 0
-                try:
-                    s = parse_dt(row["start"])
-                    e = parse_dt(row["end"])
-                    
-                    delta = e - s
-                    # For all-day events, ensure duration is at least 24 hours
-                    if is_all_day:
-                        event_dict["duration"] = "24:00"
-                    else:
-                        total_seconds = int(delta.total_seconds())
-                        hours = total_seconds // 3600
-                        minutes = (total_seconds % 3600) // 60
-                        event_dict["duration"] = f"{hours:02}:{minutes:02}"
-                    
-                except Exception as e:
-                    print(f"Error calculating duration for {row['title']}: {e}")
-            
-            events.append(event_dict)
-            
-        return json.dumps(events)
+        try:
+            # Ensure row_factory is Row so we can access by column name
+            conn.row_factory = sqlite3.Row 
+            rows = _select_window_rows(conn, user_id, range_start, range_end)
+        finally:
+            conn.close()
+
+        return [Event.from_row(row) for row in rows]
     except Exception as e:
         print(f"Error fetching events: {e}") 
-        return "[]"
+        return []
+
+def get_events_version(user_id: int) -> int:
+    """
+    Current data version of a user's events (bumped by DB triggers on every write).
+    Cheap primary-key lookup used to validate cached calendar payloads.
+    """
+    conn = get_db_connection()
+    version = _read_events_version(conn, user_id)
+    conn.close()
+    return version
+
+def _read_events_version(conn, user_id: int) -> int:
+    row = conn.execute("SELECT version FROM event_versions WHERE user_id = ?", (user_id,)).fetchone()
+    return row["version"] if row else 0
+
+def _fetch_events_from_db(user_id: int, range_start=None, range_end=None) -> str:
+    """
+    Internal function to fetch events from database as a JSON string (FullCalendar shape).
+    """
+    return json.dumps([event.to_fullcalendar() for event in fetch_events(user_id, range_start, range_end)])
 
 # --- CORE FUNCTIONS ---
 
-@observe(as_type="tool")
-def add_event(title: str, start: str, end: str, allDay: bool, user_id: int, 
-              recurrence: str = None, recurrence_end: str = None, color: str = "#3788d8") -> str:
+def _make_naive_iso(dt_str: str) -> str:
+    if "T" in dt_str:
+        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+    else:
+        dt = datetime.strptime(dt_str, "%Y-%m-%d")
+    
+    dt_naive = dt.replace(tzinfo=None)
+    
+    if "T" in dt_str:
+        return dt_naive.isoformat()
+    return dt_naive.strftime("%Y-%m-%d")
+
+def _new_result(title: str) -> dict:
+    return {"title": title, "status": "error", "message": "", "event_id": None, "conflicts": []}
+
+def add_events_bulk(user_id: int, events: list) -> list:
     """
-    Adds a new event for a specific user.
+    Inserts many events for one user in a single transaction.
+
+    Dates are normalised once up front and all rows go through one
+    executemany of INSERT ... WHERE NOT EXISTS; duplicates (same user, title
+    and start) are skipped by an index probe instead of a SELECT per row. Conflicts
+    each new event creates (with existing events or earlier rows of the batch)
+    are detected and stored in the same transaction, as are its materialized
+    occurrences.
+
+    Args:
+        events: dicts with title, start, end and optionally allDay,
+                recurrence, recurrence_end and color
+
+    Returns:
+        One dict per input row, in order: 'title', 'status' ("added",
+        "skipped" or "error"), 'message', 'event_id' and 'conflicts'
     """
+    results = [_new_result(event.get("title", "")) for event in events]
+
+    # 1. Normalise once; rows that fail validation never reach the database
+    rows = []  # (result index, params, series)
+    for i, event in enumerate(events):
+        try:
+            title = event["title"]
+            clean_start = _make_naive_iso(event["start"])
+            clean_end = _make_naive_iso(event["end"])
+            is_all_day = 1 if event.get("allDay") else 0
+            recurrence = event.get("recurrence")
+            recurrence_end = event.get("recurrence_end")
+            color = event.get("color") or "#3788d8"
+            series = Series.from_event({
+                "start": clean_start, "end": clean_end, "allDay": is_all_day,
+                "recurrence": recurrence, "recurrence_end": recurrence_end,
+            })
+            # Validated here once, so reads never parse the strings
+            columns = series.to_columns(clean_end, is_all_day)
+        except KeyError as e:
+            results[i]["message"] = f"Error adding event: missing {e}"
+            continue
+        except Exception as e:
+            results[i]["message"] = f"Error adding event: {str(e)}"
+            continue
+        rows.append((i, (user_id, title, clean_start, clean_end, is_all_day, recurrence,
+                         recurrence_end, color, color, "a", *columns), series))
+
+    if not rows:
+        return results
+
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        def make_naive_iso(dt_str):
-            if "T" in dt_str:
-                dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-            else:
-                dt = datetime.strptime(dt_str, "%Y-%m-%d")
-            
-            dt_naive = dt.replace(tzinfo=None)
-            
-            if "T" in dt_str:
-                return dt_naive.isoformat()
-            return dt_naive.strftime("%Y-%m-%d")
-
-        clean_start = make_naive_iso(start)
-        clean_end = make_naive_iso(end)
-
-        cursor.execute(
-            "SELECT id FROM events WHERE title = ? AND start = ? AND user_id = ?", 
-            (title, clean_start, user_id)
+        conn.execute("BEGIN IMMEDIATE")
+        in_sync = _conflicts_in_sync(conn, user_id)
+        occurrence_state = _synced_occurrence_state(conn, user_id)
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+        # 2. One statement for the whole batch
+        # Guarded by NOT EXISTS as well as the unique index, which migration 5 leaves
+        # out while older duplicates remain
+        conn.executemany(
+            """INSERT OR IGNORE INTO events 
+               (user_id, title, start, end, allDay, recurrence, recurrence_end, backgroundColor, borderColor, resourceId,
+                start_ts, end_ts, freq, until_day)
+               SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+               WHERE NOT EXISTS (SELECT 1 FROM events WHERE user_id = ?1 AND title = ?2 AND start = ?3)""",
+            [params for _, params, _ in rows]
         )
-        if cursor.fetchone():
-            conn.close()
-            return f"Skipped: Event '{title}' already exists at {clean_start}."
-
-        is_all_day = 1 if allDay else 0
-        
-        cursor.execute(
-        """INSERT INTO events 
-           (user_id, title, start, end, allDay, recurrence, recurrence_end, backgroundColor, borderColor, resourceId) 
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (user_id, title, clean_start, clean_end, is_all_day, recurrence, recurrence_end, color, color, "a")
+
+        # 3. Map inserted ids back to rows; anything missing was a duplicate
+        inserted = {
+            (row["title"], row["start"]): row["id"]
+            for row in conn.execute(
+                "SELECT id, title, start FROM events WHERE user_id = ? AND id > ?", (user_id, last_id)
+            )
+        }
+
+        conflict_rows = []
+        added_series = []
+        for i, params, series in rows:
+            title, clean_start, recurrence = params[1], params[2], params[5]
+            event_id = inserted.pop((title, clean_start), None)
+            result = results[i]
+            if event_id is None:
+                result.update(status="skipped", message=f"Skipped: Event '{title}' already exists at {clean_start}.")
+                continue
+
+            added_series.append((event_id, series))
+            overlaps = _detect_conflicts(conn, user_id, series, before_id=event_id)
+            # Only ids below event_id are considered, so (other, new) is the stored (a < b) order
+            conflict_rows += [(other_id, event_id, user_id, when.isoformat()) for other_id, _, when in overlaps]
+
+            rec_msg = f" (Repeats: {recurrence})" if recurrence else ""
+            message = f"Success: Event '{title}' added.{rec_msg} (Start: {clean_start})"
+            conflicts = [Conflict(other_id, other_title, event_id, title, when) for other_id, other_title, when in overlaps]
+            if conflicts:
+                listed = ", ".join(f"'{c.title_a}' ({c.first_overlap:%Y-%m-%d %H:%M})" for c in conflicts[:5])
+                more = f" and {len(conflicts) - 5} more" if len(conflicts) > 5 else ""
+                message += f" Note: it overlaps with {listed}{more}."
+            result.update(status="added", message=message, event_id=event_id, conflicts=conflicts)
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO event_conflicts (event_id_a, event_id_b, user_id, first_overlap) VALUES (?, ?, ?, ?)",
+            conflict_rows
         )
-        
+        if in_sync:
+            _mark_conflicts_synced(conn, user_id)
+        if occurrence_state is not None:
+            from_ts, to_ts = occurrence_state["from_ts"], occurrence_state["to_ts"]
+            max_duration = _store_occurrences(conn, _expand_occurrences(user_id, added_series, from_ts, to_ts))
+            _mark_occurrences_synced(conn, user_id, from_ts, to_ts, max(max_duration, occurrence_state["max_duration"]))
         conn.commit()
+    except Exception as e:
+        conn.rollback()
+        for i, _, _ in rows:
+            results[i].update(status="error", message=f"Error adding event: {str(e)}", event_id=None, conflicts=[])
+    finally:
         conn.close()
-        
-        rec_msg = f" (Repeats: {recurrence})" if recurrence else ""
-        return f"Success: Event '{title}' added.{rec_msg} (Start: {clean_start})"
+
+    if any(r["status"] == "added" for r in results):
+        event_cache.invalidate(user_id)
+    return results
+
+def save_event(title: str, start: str, end: str, allDay: bool, user_id: int,
+               recurrence: str = None, recurrence_end: str = None, color: str = "#3788d8") -> dict:
+    """
+    Inserts one event and detects the conflicts it creates (see add_events_bulk).
+
+    Returns:
+        dict with 'status' ("added", "skipped" or "error"), 'message',
+        'event_id' and 'conflicts' (list of Conflict records for the new event)
+    """
+    return add_events_bulk(user_id, [{
+        "title": title, "start": start, "end": end, "allDay": allDay,
+        "recurrence": recurrence, "recurrence_end": recurrence_end, "color": color,
+    }])[0]
+
+@observe(as_type="tool")
+@timed_tool
+def add_event(title: str, start: str, end: str, allDay: bool, user_id: int, 
+              recurrence: str = None, recurrence_end: str = None, color: str = "#3788d8") -> str:
+    """
+    Adds a new event for a specific user.
+    Reports any existing events the new one overlaps with.
+    """
+    return save_event(title, start, end, allDay, user_id, recurrence, recurrence_end, color)["message"]
+
+def _tool_window(start_date: Optional[str], end_date: Optional[str]):
+    """
+    (range_start, range_end) for the tools' inclusive start_date/end_date arguments.
+    The model sends "" for dates it leaves out, so falsy values mean no bound.
+    Raises ValueError for a bound that is not an ISO date/datetime.
+    """
+    range_start = _normalize_bound(start_date) if start_date else None
+    range_end = _normalize_bound(end_date) if end_date else None
+    if end_date and "T" not in end_date and " " not in end_date.strip():
+        # Inclusive day -> exclusive bound at the next midnight
+        range_end = (datetime.fromisoformat(range_end) + timedelta(days=1)).isoformat(timespec="seconds")
+    return range_start, range_end
+
+@observe(as_type="tool")
+@timed_tool
+def list_events_json(user_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
+    """
+    Fetches events ONLY for the specific user_id provided.
+    Pass start_date/end_date (YYYY-MM-DD, both inclusive) to only get events in that period.
+    """
+    try:
+        return _fetch_events_from_db(user_id, *_tool_window(start_date, end_date))
     except Exception as e:
-        return f"Error adding event: {str(e)}"
+        return f"Error fetching events: {str(e)}"
+
+DEFAULT_SEARCH_RESULTS = 10
+MAX_SEARCH_RESULTS = 50
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _search_rows(conn, user_id: int, query: str, range_start=None, range_end=None,
+                 limit: int = DEFAULT_SEARCH_RESULTS, fuzzy: bool = True) -> list:
+    """
+    Matching rows, best first. Uses the FTS5 title index (word prefixes, bm25
+    ranking, typo tolerance) when available, otherwise _like_search_rows.
+    """
+    clause, params = _window_clause(range_start, range_end)
+    if not query.strip() or not fts_available(conn):
+        return _like_search_rows(conn, user_id, query, clause, params, range_start, range_end, limit)
+
+    found = []
+    matches = iter_title_matches(conn, user_id, query, clause, params, fuzzy=fuzzy)
+    for row in _occurs_in_window(matches, range_start, range_end):
+        found.append(row)
+        if len(found) >= limit:
+            break
+    return found
+
+def _like_search_rows(conn, user_id: int, query: str, clause: str, params: list,
+                      range_start=None, range_end=None, limit: int = DEFAULT_SEARCH_RESULTS) -> list:
+    """
+    Matching rows, titles starting with `query` first, then titles containing it.
+    The prefix pass is a range scan on idx_events_user_title_nocase; the second
+    pass only runs when the prefix matches don't fill `limit`.
+    """
+    columns = ("SELECT id, title, start, end, allDay, recurrence, recurrence_end,"
+               " start_ts, end_ts, freq, until_day FROM events")
+    pattern = _escape_like(query.strip())
+
+    passes = [(f"{pattern}%", "")]
+    if pattern:
+        passes.append((f"%{pattern}%", f" AND title NOT LIKE ? ESCAPE '\\'"))
+
+    found = []
+    for like, exclude in passes:
+        sql = (f"{columns} WHERE user_id = ? AND title LIKE ? ESCAPE '\\'{exclude}{clause}"
+               " ORDER BY start_ts")
+        args = [user_id, like] + ([f"{pattern}%"] if exclude else []) + params
+        for row in _occurs_in_window(conn.execute(sql, args), range_start, range_end):
+            found.append(row)
+            if len(found) >= limit:
+                return found
+    return found
+
+def find_events(user_id: int, query: str = "", range_start=None, range_end=None,
+                limit: int = DEFAULT_SEARCH_RESULTS) -> list:
+    """
+    Ranked title search shared by the search_events tool and the UI search box.
+    Returns compact dicts (id, title, start, end, plus 'repeats' for recurring series).
+    """
+    limit = max(1, min(int(limit or DEFAULT_SEARCH_RESULTS), MAX_SEARCH_RESULTS))
+    conn = get_db_connection()
+    try:
+        rows = _search_rows(conn, user_id, query or "", range_start, range_end, limit)
+    finally:
+        conn.close()
+
+    results = []
+    for row in rows:
+        item = {"id": row["id"], "title": row["title"], "start": row["start"], "end": row["end"]}
+        freq = normalize_recurrence(row["recurrence"])
+        if freq:
+            # Deleting a series removes every occurrence, so the model has to know
+            item["repeats"] = freq
+        results.append(item)
+    return results
 
 @observe(as_type="tool")
-def list_events_json(user_id: int) -> str:
-    """Fetches events ONLY for the specific user_id provided."""
-    return _fetch_events_from_db(user_id)
+@timed_tool
+def search_events(user_id: int, query: str = "", start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  limit: int = DEFAULT_SEARCH_RESULTS) -> str:
+    """
+    Finds the user's events whose title matches `query` and returns only id, title,
+    start and end, so it is cheap to call before delete_event. Words match as prefixes,
+    case- and accent-insensitively, best matches first; small typos are tolerated.
+    Pass start_date/end_date (YYYY-MM-DD, both inclusive) to only search that period.
+    An empty query lists the events in the period. At most `limit` results (max 50).
+    """
+    try:
+        results = find_events(user_id, query, *_tool_window(start_date, end_date), limit)
+        return json.dumps(results, separators=(",", ":"))
+    except Exception as e:
+        return f"Error searching events: {str(e)}"
 
 @observe(as_type="tool")
+@timed_tool
 def delete_event(event_id: int, user_id: int) -> str:
     """Deletes an event (only if it belongs to the user)"""
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT title FROM events WHERE id = ? AND user_id = ?", (event_id, user_id))
-        event = cursor.fetchone()
-        
-        if not event:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT title FROM events WHERE id = ? AND user_id = ?", (event_id, user_id))
+            event = cursor.fetchone()
+
+            if not event:
+                conn.rollback()
+                return f"Error: Event ID {event_id} not found or you don't have permission."
+
+            in_sync = _conflicts_in_sync(conn, user_id)
+            occurrence_state = _synced_occurrence_state(conn, user_id)
+            # The events delete triggers drop this event's rows from event_conflicts and occurrences
+            cursor.execute("DELETE FROM events WHERE id = ? AND user_id = ?", (event_id, user_id))
+            if in_sync:
+                _mark_conflicts_synced(conn, user_id)
+            if occurrence_state is not None:
+                _mark_occurrences_synced(conn, user_id, occurrence_state["from_ts"], occurrence_state["to_ts"],
+                                         occurrence_state["max_duration"])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
             conn.close()
-            return f"Error: Event ID {event_id} not found or you don't have permission."
-            
-        cursor.execute("DELETE FROM events WHERE id = ? AND user_id = ?", (event_id, user_id))
-        conn.commit()
-        conn.close()
+        event_cache.invalidate(user_id)
         return f"Success: Event '{event['title']}' deleted."
     except Exception as e:
         return f"Error deleting event: {str(e)}"
 
-@observe(as_type="tool")
-def check_availability(check_datetime: str, user_id: int) -> str:
-    """Check availability for a specific user"""
+# --- MATERIALIZED OCCURRENCES ---
+# occurrences holds one row per occurrence of every event inside the rolling range of
+# tools/occurrences.py. add_event/delete_event keep it current incrementally;
+# occurrence_state records the range and the events version it matches, so any write
+# that bypasses them (or an empty table after upgrading) triggers a rebuild on the
+# next read, like the stored conflicts. Windows outside the range expand in Python.
+
+def _occurrence_state(conn, user_id: int):
+    return conn.execute("SELECT * FROM occurrence_state WHERE user_id = ?", (user_id,)).fetchone()
+
+def _synced_occurrence_state(conn, user_id: int):
+    """The user's occurrence_state row if it matches the current events version, else None."""
+    state = _occurrence_state(conn, user_id)
+    if state is None or state["synced_version"] != _read_events_version(conn, user_id):
+        return None
+    return state
+
+def _mark_occurrences_synced(conn, user_id: int, from_ts: int, to_ts: int, max_duration: int):
+    conn.execute(
+        """INSERT INTO occurrence_state (user_id, from_ts, to_ts, max_duration, synced_version)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT(user_id) DO UPDATE SET from_ts = excluded.from_ts, to_ts = excluded.to_ts,
+               max_duration = excluded.max_duration, synced_version = excluded.synced_version""",
+        (user_id, from_ts, to_ts, max_duration, _read_events_version(conn, user_id))
+    )
+
+def _expand_occurrences(user_id: int, events_series, from_ts: int, to_ts: int) -> list:
+    """(event_id, user_id, start_ts, end_ts) for each (event_id, Series) occurrence overlapping [from_ts, to_ts)."""
+    window_start, window_end = from_epoch(from_ts), from_epoch(to_ts)
+    return [
+        (event_id, user_id, to_epoch(occ_start), to_epoch(occ_end))
+        for event_id, series in events_series
+        for occ_start, occ_end in series.occurrences(window_start, window_end)
+    ]
+
+def _store_occurrences(conn, rows: list) -> int:
+    """Inserts occurrence rows (ones already stored are kept); returns their longest duration."""
+    conn.executemany("INSERT OR IGNORE INTO occurrences (event_id, user_id, start_ts, end_ts) VALUES (?, ?, ?, ?)", rows)
+    return max((end_ts - start_ts for _, _, start_ts, end_ts in rows), default=0)
+
+def _events_series_between(conn, user_id: int, from_ts: int, to_ts: int) -> list:
+    rows = _select_window_rows(conn, user_id, from_epoch(from_ts), from_epoch(to_ts))
+    return [(row["id"], series) for row in rows if (series := _series_for(row)) is not None]
+
+def rebuild_occurrences(user_id: int, now: datetime = None) -> bool:
+    """
+    Re-materializes a user's occurrences over today's rolling range.
+    Returns False (storing nothing) if the user's events changed meanwhile.
+    """
+    from_ts, to_ts = rolling_range(now)
+    conn = get_db_connection()
+    try:
+        version = _read_events_version(conn, user_id)
+        rows = _expand_occurrences(user_id, _events_series_between(conn, user_id, from_ts, to_ts), from_ts, to_ts)
+
+        conn.execute("BEGIN IMMEDIATE")
+        if _read_events_version(conn, user_id) != version:
+            conn.rollback()
+            return False
+        conn.execute("DELETE FROM occurrences WHERE user_id = ?", (user_id,))
+        max_duration = _store_occurrences(conn, rows)
+        _mark_occurrences_synced(conn, user_id, from_ts, to_ts, max_duration)
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def extend_occurrences(user_id: int, now: datetime = None) -> bool:
+    """
+    Moves a user's materialized range to today's rolling range: only the days past
+    the old horizon are expanded, and occurrences that ended before the new start
+    are dropped. Falls back to a rebuild when the stored rows are out of sync.
+    """
+    from_ts, to_ts = rolling_range(now)
+    conn = get_db_connection()
     try:
+        state = _synced_occurrence_state(conn, user_id)
+        stale = state is None or from_ts < state["from_ts"] or to_ts < state["to_ts"]
+        if not stale:
+            if (from_ts, to_ts) == (state["from_ts"], state["to_ts"]):
+                return True
+
+            version = state["synced_version"]
+            added = state["to_ts"]
+            rows = _expand_occurrences(user_id, _events_series_between(conn, user_id, added, to_ts), added, to_ts)
+
+            conn.execute("BEGIN IMMEDIATE")
+            if _read_events_version(conn, user_id) != version:
+                conn.rollback()
+                return False
+            conn.execute("DELETE FROM occurrences WHERE user_id = ? AND start_ts < ? AND end_ts <= ?",
+                         (user_id, from_ts, from_ts))
+            max_duration = max(state["max_duration"], _store_occurrences(conn, rows))
+            _mark_occurrences_synced(conn, user_id, from_ts, to_ts, max_duration)
+            conn.commit()
+            return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    # Out of sync: rebuild on a fresh connection once this one is released
+    return rebuild_occurrences(user_id, now)
+
+def extend_all_occurrences(now: datetime = None) -> int:
+    """Background job: extends every materialized user whose range is behind today's. Returns how many."""
+    from_ts, to_ts = rolling_range(now)
+    conn = get_db_connection()
+    user_ids = [
+        row["user_id"] for row in
+        conn.execute("SELECT user_id FROM occurrence_state WHERE from_ts < ? OR to_ts < ?", (from_ts, to_ts))
+    ]
+    conn.close()
+    return sum(extend_occurrences(user_id, now) for user_id in user_ids)
+
+def find_occurrences(user_id: int, start: datetime, end: datetime) -> list:
+    """
+    Every occurrence overlapping [start, end) as (start, end, event_id, title), in
+    start order, read from the materialized table. None if the window isn't materialized.
+    Out-of-sync rows are rebuilt first; windows outside the rolling range never are.
+    """
+    start_ts, end_ts = to_epoch(start), to_epoch(end)
+    from_ts, to_ts = rolling_range()
+    if start_ts < from_ts or end_ts > to_ts:
+        return None
+
+    conn = get_db_connection()
+    state = _synced_occurrence_state(conn, user_id)
+    if state is None:
+        # The rebuild takes its own connection; don't hold a second one from the pool meanwhile
+        conn.close()
+        if not rebuild_occurrences(user_id):
+            return None
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT title FROM events WHERE start = ? AND user_id = ?", (check_datetime, user_id))
-        event = cursor.fetchone()
+        state = _occurrence_state(conn, user_id)
+    try:
+        if state is None or start_ts < state["from_ts"] or end_ts > state["to_ts"]:
+            return None
+        # Range scan on idx_occurrences_user_start: no occurrence starts more than max_duration before the window
+        rows = conn.execute(
+            """SELECT o.start_ts, o.end_ts, o.event_id, e.title
+               FROM occurrences o JOIN events e ON e.id = o.event_id
+               WHERE o.user_id = ? AND o.start_ts >= ? AND o.start_ts < ? AND o.end_ts > ?
+               ORDER BY o.start_ts""",
+            (user_id, start_ts - state["max_duration"], end_ts, start_ts)
+        ).fetchall()
+    finally:
         conn.close()
-        
-        if event:
-            return f"Busy: There is an event '{event['title']}' starting at {check_datetime}."
+    return [(from_epoch(row[0]), from_epoch(row[1]), row[2], row[3]) for row in rows]
+
+# --- AVAILABILITY ENGINE ---
+# Occurrences are indexed per user in fixed-size windows, so nearby queries reuse
+# one IntervalIndex until the user's data version changes.
+
+AVAILABILITY_WINDOW_DAYS = 90
+_availability_cache = EventCache(max_entries=64)
+
+def _availability_window(start: datetime, end: datetime):
+    """Expands [start, end) to whole AVAILABILITY_WINDOW_DAYS blocks."""
+    first = start.toordinal() // AVAILABILITY_WINDOW_DAYS
+    last = max(end - timedelta(microseconds=1), start).toordinal() // AVAILABILITY_WINDOW_DAYS
+    return (
+        datetime.fromordinal(first * AVAILABILITY_WINDOW_DAYS),
+        datetime.fromordinal((last + 1) * AVAILABILITY_WINDOW_DAYS),
+    )
+
+def get_availability_index(user_id: int, start: datetime, end: datetime) -> IntervalIndex:
+    """
+    Returns an IntervalIndex over every occurrence (recurring series expanded)
+    that overlaps the window containing [start, end).
+    Values stored in the index are (event_id, title) tuples.
+    """
+    window_start, window_end = _availability_window(start, end)
+    key = ("availability", window_start, window_end)
+    version = get_events_version(user_id)
+
+    index = _availability_cache.get(user_id, key, version)
+    if index is None:
+        occurrences = find_occurrences(user_id, window_start, window_end)
+        if occurrences is not None:
+            intervals = [(occ_start, occ_end, (event_id, title)) for occ_start, occ_end, event_id, title in occurrences]
+        else:
+            intervals = []
+            for event in fetch_events(user_id, window_start, window_end):
+                series = _series_for(event)
+                if series is None:
+                    continue
+                for occ_start, occ_end in series.occurrences(window_start, window_end):
+                    intervals.append((occ_start, occ_end, (event.id, event.title)))
+        index = IntervalIndex(intervals)
+        _availability_cache.put(user_id, key, version, index)
+    return index
+
+def is_busy(user_id: int, start: datetime, end: datetime) -> bool:
+    """True if any of the user's occurrences overlaps [start, end)."""
+    return get_availability_index(user_id, start, end).is_busy(start, end)
+
+def find_overlapping(user_id: int, start: datetime, end: datetime) -> list:
+    """Occurrences overlapping [start, end) as (start, end, (event_id, title)), ordered by start."""
+    return get_availability_index(user_id, start, end).overlapping(start, end)
+
+@observe(as_type="tool")
+@timed_tool
+def check_availability(check_datetime: str, user_id: int, end_datetime: Optional[str] = None) -> str:
+    """
+    Check availability for a specific user.
+    With only check_datetime, reports whether any event is happening at that moment.
+    With end_datetime too, reports every event overlapping the range ("" counts as not given).
+    """
+    try:
+        start = datetime.fromisoformat(_normalize_bound(check_datetime))
+        if end_datetime:
+            end = datetime.fromisoformat(_normalize_bound(end_datetime))
+            period = f"between {start:%Y-%m-%d %H:%M} and {end:%Y-%m-%d %H:%M}"
         else:
-            return "Free: No event starts exactly at this time."
+            end = start + timedelta(seconds=1)
+            period = f"at {start:%Y-%m-%d %H:%M}"
+
+        if end <= start:
+            return "Error checking availability: end_datetime must be after check_datetime."
+
+        if not is_busy(user_id, start, end):
+            return f"Free: No events {period}."
+
+        overlapping = find_overlapping(user_id, start, end)
+        listed = [
+            f"'{title}' ({occ_start:%Y-%m-%d %H:%M} - {occ_end:%Y-%m-%d %H:%M})"
+            for occ_start, occ_end, (_, title) in overlapping[:5]
+        ]
+        more = f" and {len(overlapping) - 5} more" if len(overlapping) > 5 else ""
+        return f"Busy: {', '.join(listed)}{more} {period}."
     except Exception as e:
         return f"Error checking availability: {str(e)}"
 
-@observe(as_type="tool")
-def get_conflicts_report(user_id: int) -> str:
-    """Analyzes conflicts for a specific user"""
+# --- CONFLICT REPORT ---
+
+DEFAULT_CONFLICT_RESULTS = 20
+MAX_CONFLICT_WINDOW_DAYS = 730  # Upper bound on how far ahead a default report looks
+
+def _default_conflict_horizon(events_series, window_start: datetime) -> datetime:
+    """Old audit horizon: latest recurrence_end, or 30 days past the latest start; capped."""
+    max_start = max(series.start for _, series in events_series)
+    horizon_end = max_start + timedelta(days=30)
+    for _, series in events_series:
+        if series.until:
+            horizon_end = max(horizon_end, datetime.combine(series.until, datetime.max.time()))
+    return min(horizon_end, window_start + timedelta(days=MAX_CONFLICT_WINDOW_DAYS))
+
+def find_conflicts(user_id: int, window_start=None, window_end=None,
+                   limit: int = DEFAULT_CONFLICT_RESULTS, offset: int = 0) -> ConflictReport:
+    """
+    Structured conflict report for [window_start, window_end).
+
+    Defaults to everything from now on (bounded by MAX_CONFLICT_WINDOW_DAYS).
+    Returns a ConflictReport holding one page (offset/limit) of Conflict records,
+    each with the number of overlapping occurrences for that pair.
+    """
+    window_start = datetime.now() if window_start is None else datetime.fromisoformat(_normalize_bound(window_start))
+    if window_end is not None:
+        window_end = datetime.fromisoformat(_normalize_bound(window_end))
+        occurrences = find_occurrences(user_id, window_start, window_end)
+        if occurrences is not None:
+            return build_report(occurrences, window_start, window_end, limit, offset)
+
+    events = fetch_events(user_id, window_start, window_end)
+    events_series = [(e, _series_for(e)) for e in events]
+    events_series = [(e, series) for e, series in events_series if series is not None]
+    if not events_series:
+        return ConflictReport(window_start, window_end or window_start, 0, offset, limit)
+
+    if window_end is None:
+        window_end = _default_conflict_horizon(events_series, window_start)
+
+    occurrences = (
+        (occ_start, occ_end, event.id, event.title)
+        for event, series in events_series
+        for occ_start, occ_end in series.occurrences(window_start, window_end)
+    )
+    return build_report(occurrences, window_start, window_end, limit, offset)
+
+# --- STORED CONFLICTS ---
+# event_conflicts holds one row per pair that overlaps within MAX_CONFLICT_WINDOW_DAYS
+# of detection, with its next overlap. add_event/delete_event keep it current incrementally; conflict_state
+# records the events version it matches, so any write that bypasses them (or an
+# empty table after upgrading) triggers a one-off rebuild on the next read.
+
+def _conflicts_in_sync(conn, user_id: int) -> bool:
+    row = conn.execute("SELECT synced_version FROM conflict_state WHERE user_id = ?", (user_id,)).fetchone()
+    return row is not None and row["synced_version"] == _read_events_version(conn, user_id)
+
+def _mark_conflicts_synced(conn, user_id: int):
+    conn.execute(
+        """INSERT INTO conflict_state (user_id, synced_version) VALUES (?, ?)
+           ON CONFLICT(user_id) DO UPDATE SET synced_version = excluded.synced_version""",
+        (user_id, _read_events_version(conn, user_id))
+    )
+
+def _detect_conflicts(conn, user_id: int, new_series: Series, before_id: int = None) -> list:
+    """
+    Checks a new event against the user's existing events (only ids below
+    before_id, when given, so a just-inserted batch is compared pairwise once).
+    Candidates come from the indexed window query over the new series' active
+    span; each pair is then decided analytically with first_overlap().
+
+    Returns:
+        List of (event_id, title, first_overlap) sorted by first_overlap
+    """
+    now = datetime.now()
+    span_start = max(now, new_series.start)
+    if new_series.freq is None:
+        span_end = new_series.start + new_series.duration
+    elif new_series.until is not None:
+        span_end = datetime.combine(new_series.until + timedelta(days=1), datetime.min.time()) + new_series.duration
+    else:
+        span_end = None
+    if span_end is not None and span_end <= now:
+        return []
+
+    # Same look-ahead as a full rebuild, so both paths store the same pairs
+    horizon = now + timedelta(days=MAX_CONFLICT_WINDOW_DAYS)
+    found = []
+    for row in _select_window_rows(conn, user_id, span_start, span_end):
+        if before_id is not None and row["id"] >= before_id:
+            continue
+        other = _series_for(row)
+        if other is None:
+            continue
+        when = first_overlap(new_series, other, not_before=now)
+        if when is not None and when < horizon:
+            found.append((row["id"], row["title"], when))
+    found.sort(key=lambda item: item[2])
+    return found
+
+def rebuild_conflicts(user_id: int) -> bool:
+    """
+    Recomputes the stored conflicts from scratch with the sweep.
+    Returns False (storing nothing) if the user's events changed meanwhile.
+    """
+    version = get_events_version(user_id)
+    now = datetime.now()
+    # find_conflicts takes its own connections, so none is held while it runs
+    report = find_conflicts(user_id, now, now + timedelta(days=MAX_CONFLICT_WINDOW_DAYS), limit=None)
+
+    conn = get_db_connection()
     try:
-        events_json = _fetch_events_from_db(user_id)
-        events = json.loads(events_json)
-        if not events:
-            return "✅ No conflicts found."
-
-        conflicts = []
-        conflict_pairs = set()
-
-        def normalize_recurrence(value):
-            if not value:
-                return None
-            lowered = str(value).lower().strip()
-            return None if lowered in ("none", "null", "") else lowered
-
-        def parse_date_only(value):
-            if not value:
-                return None
-            lowered = str(value).lower().strip()
-            if lowered in ("none", "null", ""):
-                return None
-            return parse_dt(value).date()
-
-        def add_months(date_obj, months):
-            year = date_obj.year + (date_obj.month - 1 + months) // 12
-            month = (date_obj.month - 1 + months) % 12 + 1
-            # Clamp day to last day of month
-            from calendar import monthrange
-            day = min(date_obj.day, monthrange(year, month)[1])
-            return date_obj.replace(year=year, month=month, day=day)
-
-        def iter_occurrences(event, horizon_end):
-            start_dt = parse_dt(event["start"])
-            end_dt = parse_dt(event["end"])
-            duration = end_dt - start_dt
-
-            if event.get("allDay"):
-                start_dt = start_dt.replace(hour=0, minute=0, second=0)
-                duration = timedelta(hours=23, minutes=59, seconds=59)
-
-            rec = normalize_recurrence(event.get("recurrence"))
-            rec_end = parse_date_only(event.get("recurrence_end")) or horizon_end.date()
-
-            current_date = start_dt.date()
-            last_date = min(rec_end, horizon_end.date())
-
-            if not rec:
-                yield (start_dt, start_dt + duration)
-                return
-
-            while current_date <= last_date:
-                occ_start = datetime.combine(current_date, start_dt.time())
-                occ_end = occ_start + duration
-                yield (occ_start, occ_end)
-
-                if rec == "daily":
-                    current_date = current_date + timedelta(days=1)
-                elif rec == "weekly":
-                    current_date = current_date + timedelta(days=7)
-                elif rec == "monthly":
-                    current_date = add_months(current_date, 1)
-                elif rec == "yearly":
-                    current_date = add_months(current_date, 12)
-                else:
-                    # Unknown recurrence: treat as non-recurring
-                    break
-
-        def overlaps(a_start, a_end, b_start, b_end):
-            return a_start < b_end and a_end > b_start
-
-        # Determine horizon end to prevent infinite expansion
-        max_start = max(parse_dt(e["start"]) for e in events)
-        max_rec_end = None
-        for e in events:
-            rec_end = parse_date_only(e.get("recurrence_end"))
-            if rec_end:
-                rec_end_dt = datetime.combine(rec_end, datetime.max.time())
-                max_rec_end = max(rec_end_dt, max_rec_end) if max_rec_end else rec_end_dt
-        horizon_end = max_rec_end if max_rec_end else (max_start + timedelta(days=30))
-        horizon_end = max(horizon_end, max_start + timedelta(days=30))
-
-        now = datetime.now()
-        # Build occurrences list
-        occurrences = []
-        for event in events:
-            for occ_start, occ_end in iter_occurrences(event, horizon_end):
-                # --- 2. Only add occurrences that are happening now or in the future ---
-                if occ_end > now: 
-                    occurrences.append({
-                        "event_id": event["id"],
-                        "title": event["title"],
-                        "start": occ_start,
-                        "end": occ_end,
-                    })
-
-        # Sweep line to detect overlaps efficiently
-        occurrences.sort(key=lambda x: x["start"])
-        active = []
-
-        for occ in occurrences:
-            active = [a for a in active if a["end"] > occ["start"]]
-            for a in active:
-                if overlaps(a["start"], a["end"], occ["start"], occ["end"]):
-                    pair = tuple(sorted((a["event_id"], occ["event_id"])))
-
-
-                    if pair not in conflict_pairs:
-                        conflict_pairs.add(pair)
-                        conflicts.append(
-                            f"⚠️ **Conflict:** '{a['title']}' overlaps with '{occ['title']}' (e.g., {occ['start'].strftime('%Y-%m-%d %H:%M')})."
-                        )
-            active.append(occ)
-
-        if not conflicts:
-            return "✅ No conflicts found."
-
-        return "\n\n".join(conflicts)
+        conn.execute("BEGIN IMMEDIATE")
+        if _read_events_version(conn, user_id) != version:
+            conn.rollback()
+            return False
+        conn.execute("DELETE FROM event_conflicts WHERE user_id = ?", (user_id,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO event_conflicts (event_id_a, event_id_b, user_id, first_overlap) VALUES (?, ?, ?, ?)",
+            [
+                (min(c.event_id_a, c.event_id_b), max(c.event_id_a, c.event_id_b), user_id, c.first_overlap.isoformat())
+                for c in report.conflicts
+            ]
+        )
+        _mark_conflicts_synced(conn, user_id)
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def _refresh_passed_conflicts(conn, user_id: int, now: datetime):
+    """Moves stored first overlaps that are now in the past to the next one (or drops the pair)."""
+    passed = conn.execute(
+        "SELECT event_id_a, event_id_b FROM event_conflicts WHERE user_id = ? AND first_overlap < ?",
+        (user_id, now.isoformat())
+    ).fetchall()
+    if not passed:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    for pair in passed:
+        rows = conn.execute(
+            "SELECT * FROM events WHERE id IN (?, ?)", (pair["event_id_a"], pair["event_id_b"])
+        ).fetchall()
+        series = [_series_for(row) for row in rows]
+        when = None
+        if len(series) == 2 and None not in series:
+            when = first_overlap(series[0], series[1], not_before=now)
+        if when is None:
+            conn.execute(
+                "DELETE FROM event_conflicts WHERE event_id_a = ? AND event_id_b = ?",
+                (pair["event_id_a"], pair["event_id_b"])
+            )
+        else:
+            conn.execute(
+                "UPDATE event_conflicts SET first_overlap = ? WHERE event_id_a = ? AND event_id_b = ?",
+                (when.isoformat(), pair["event_id_a"], pair["event_id_b"])
+            )
+    conn.commit()
 
+def get_stored_conflicts(user_id: int, limit: int = DEFAULT_CONFLICT_RESULTS, offset: int = 0) -> ConflictReport:
+    """
+    Reads one page of the stored conflicts, ordered by next overlap.
+    No recurrence expansion happens here unless the store is out of sync.
+    """
+    conn = get_db_connection()
+    if not _conflicts_in_sync(conn, user_id):
+        conn.close()
+        rebuild_conflicts(user_id)
+        conn = get_db_connection()
+
+    now = datetime.now()
+    _refresh_passed_conflicts(conn, user_id, now)
+
+    total = conn.execute("SELECT COUNT(*) FROM event_conflicts WHERE user_id = ?", (user_id,)).fetchone()[0]
+    rows = conn.execute(
+        """SELECT c.event_id_a, a.title AS title_a, c.event_id_b, b.title AS title_b, c.first_overlap
+           FROM event_conflicts c
+           JOIN events a ON a.id = c.event_id_a
+           JOIN events b ON b.id = c.event_id_b
+           WHERE c.user_id = ?
+           ORDER BY c.first_overlap, c.event_id_a, c.event_id_b
+           LIMIT ? OFFSET ?""",
+        (user_id, -1 if limit is None else limit, offset)
+    ).fetchall()
+    conn.close()
+
+    conflicts = [
+        Conflict(row["event_id_a"], row["title_a"], row["event_id_b"], row["title_b"],
+                 datetime.fromisoformat(row["first_overlap"]))
+        for row in rows
+    ]
+    return ConflictReport(now, None, total, offset, limit, conflicts)
+
+@observe(as_type="tool")
+@timed_tool
+def get_conflicts_report(user_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                         max_results: int = DEFAULT_CONFLICT_RESULTS) -> str:
+    """
+    Analyzes conflicts for a specific user.
+    Optionally limit to start_date/end_date (YYYY-MM-DD, inclusive); defaults to from now on.
+    """
+    try:
+        range_start, range_end = _tool_window(start_date, end_date)
+        if range_start is None and range_end is None:
+            # Maintained on every write, so no re-expansion is needed
+            return get_stored_conflicts(user_id, limit=max_results).to_text()
+        return find_conflicts(user_id, range_start, range_end, limit=max_results).to_text()
     except Exception as e:
         return f"Error calculating conflicts: {str(e)}"
@@ -0,0 +1,93 @@
+"""
+Conflict detection over expanded event occurrences.
+
+The sweep walks occurrences in start order and keeps the ones still running in
+a min-heap keyed on end time. Finished occurrences are popped in O(log n), and
+everything left on the heap overlaps the current occurrence, so the total cost
+is O(n log n + conflicts) no matter how many long or all-day events there are.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# (start, end, event_id, title)
+Occurrence = Tuple[datetime, datetime, int, str]
+
+
+@dataclass
+class Conflict:
+    """All overlaps between one pair of events inside the report window."""
+    event_id_a: int
+    title_a: str
+    event_id_b: int
+    title_b: str
+    first_overlap: datetime
+    occurrences: int = 1  # Number of overlapping occurrence pairs
+
+    def describe(self) -> str:
+        times = f" ({self.occurrences} times)" if self.occurrences > 1 else ""
+        return (f"⚠️ **Conflict:** '{self.title_a}' overlaps with '{self.title_b}'"
+                f" (e.g., {self.first_overlap.strftime('%Y-%m-%d %H:%M')}){times}.")
+
+
+@dataclass
+class ConflictReport:
+    window_start: datetime
+    window_end: Optional[datetime]  # None for the open-ended stored report
+    total: int                      # Conflicting pairs in the window
+    offset: int
+    limit: Optional[int]
+    conflicts: List[Conflict] = field(default_factory=list)  # The requested page
+
+    @property
+    def has_more(self) -> bool:
+        return self.offset + len(self.conflicts) < self.total
+
+    def to_text(self) -> str:
+        if not self.total:
+            return "✅ No conflicts found."
+        text = "\n\n".join(c.describe() for c in self.conflicts)
+        if self.offset or self.has_more:
+            first = self.offset + 1 if self.conflicts else self.offset
+            text += f"\n\n_Showing conflicts {first}-{self.offset + len(self.conflicts)} of {self.total}._"
+        return text
+
+
+def sweep_conflicts(occurrences: Iterable[Occurrence]) -> List[Conflict]:
+    """
+    Finds every pair of distinct events with overlapping occurrences.
+    Returns one Conflict per pair, ordered by first overlap.
+    """
+    pairs = {}
+    active = []  # heap of (end, seq, start, event_id, title)
+
+    # Ties broken by event id, so the result doesn't depend on where the occurrences came from
+    for seq, (start, end, event_id, title) in enumerate(sorted(occurrences, key=lambda o: (o[0], o[2]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        for a_end, _, a_start, a_id, a_title in active:
+            # a_end > start holds for all heap items; guard zero-length occurrences
+            if a_id == event_id or not a_start < end:
+                continue
+            key = (a_id, event_id) if a_id < event_id else (event_id, a_id)
+            conflict = pairs.get(key)
+            if conflict is None:
+                pairs[key] = Conflict(a_id, a_title, event_id, title, start)
+            else:
+                conflict.occurrences += 1
+
+        heapq.heappush(active, (end, seq, start, event_id, title))
+
+    return sorted(pairs.values(), key=lambda c: (c.first_overlap, c.event_id_a, c.event_id_b))
+
+
+def build_report(occurrences: Iterable[Occurrence], window_start: datetime, window_end: Optional[datetime],
+                 limit: Optional[int] = None, offset: int = 0) -> ConflictReport:
+    """Runs the sweep and returns one page of the result."""
+    conflicts = sweep_conflicts(occurrences)
+    offset = max(0, offset)
+    page = conflicts[offset:] if limit is None else conflicts[offset:offset + max(0, limit)]
+    return ConflictReport(window_start, window_end, len(conflicts), offset, limit, page)
@@ -1,7 +1,11 @@
 import sqlite3
 import os
-import bcrypt
+import queue
+import threading
+import time
 from typing import Tuple, Dict, Optional
+from tools import auth
+from tools.metrics import DB_QUERY_SECONDS, DB_QUERY_ERRORS, DB_LOCK_ERRORS, query_operation
 
 ### Create a local database file and set up tables for users and calendar events.
 
@@ -9,10 +13,226 @@ from typing import Tuple, Dict, Optional
 # Define path to database
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'scheduler.db')
 
+# --- CONNECTION POOL SETTINGS ---
+POOL_MAX_SIZE = int(os.getenv("AGENDAI_DB_POOL_SIZE", "8"))
+POOL_ACQUIRE_TIMEOUT = 30.0        # Seconds to wait for a free connection
+BUSY_TIMEOUT_MS = 5000             # How long SQLite retries on a locked database
+MMAP_SIZE = 64 * 1024 * 1024       # 64 MB memory-mapped I/O
+CACHE_SIZE_KIB = 16 * 1024         # 16 MB page cache per connection
+
+
+class _TimedCursor(sqlite3.Cursor):
+    """Cursor that records each statement's execution time in the metrics registry."""
+
+    def _timed(self, method, sql, *args):
+        operation = query_operation(sql)
+        started = time.perf_counter()
+        try:
+            return method(sql, *args)
+        except sqlite3.OperationalError as e:
+            DB_QUERY_ERRORS.inc(operation=operation)
+            if "locked" in str(e) or "busy" in str(e):
+                DB_LOCK_ERRORS.inc(operation=operation)
+            raise
+        except Exception:
+            DB_QUERY_ERRORS.inc(operation=operation)
+            raise
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation=operation)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(super().executescript, sql_script)
+
+
+class _TimedConnection(sqlite3.Connection):
+    """Hands out _TimedCursor. Connection.execute() does not go through cursor(), so it is routed here too."""
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+class _PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3.Connection.
+    Behaves like a normal connection, but close() hands it back to the pool
+    instead of closing it, so existing 'conn.close()' call sites keep working.
+    Used as a context manager, it commits (or rolls back on error) and then
+    returns itself to the pool. Every borrower must do one or the other.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+
+    def close(self):
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return self._conn.__exit__(exc_type, exc, tb)
+        finally:
+            self.close()
+
+    def __del__(self):
+        # A borrower forgot close(). Don't recycle the connection: it may hold a half-finished
+        # transaction from another thread, and re-pooling it quietly would hide the leak.
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            return
+        try:
+            print("Warning: a pooled database connection was garbage-collected without close(); discarding it.")
+            self._pool.discard(conn)
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections for a single database file.
+    Each connection is tuned once (WAL, synchronous=NORMAL, busy timeout,
+    mmap and page cache) when it is opened, then reused across calls and threads.
+    Statement latencies are recorded in tools/metrics (agendai_db_query_seconds).
+    """
+
+    def __init__(self, db_path: str, max_size: int = POOL_MAX_SIZE, timeout: float = POOL_ACQUIRE_TIMEOUT):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._stats = {"hits": 0, "waits": 0, "opens": 0, "leaks": 0, "in_use": 0}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               factory=_TimedConnection)
+        conn.row_factory = sqlite3.Row  # Allows accessing columns by name (row['title'])
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+        return conn
+
+    def acquire(self) -> _PooledConnection:
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats["hits"] += 1
+        except queue.Empty:
+            with self._lock:
+                can_open = self._size < self.max_size
+                if can_open:
+                    self._size += 1
+                    self._stats["opens"] += 1
+                else:
+                    self._stats["waits"] += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("Timed out waiting for a database connection")
+
+        with self._lock:
+            self._stats["in_use"] += 1
+        return _PooledConnection(self, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        # Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._stats["in_use"] -= 1
+        self._idle.put(conn)
+
+    def discard(self, conn: sqlite3.Connection):
+        """Closes a connection that was never released (rolling back any open transaction) and frees its slot."""
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+                self._stats["leaks"] += 1
+                self._size -= 1
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._size -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "open": self._size, "idle": self._idle.qsize(), "max_size": self.max_size}
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool() -> ConnectionPool:
+    # Looked up on every call so DB_PATH can be pointed elsewhere (e.g. a temp DB)
+    pool = _pools.get(DB_PATH)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(DB_PATH, ConnectionPool(DB_PATH))
+    return pool
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Allows accessing columns by name (row['title'])
-    return conn
+    """Borrow a tuned connection from the pool. Call close() to return it."""
+    return _get_pool().acquire()
+
+def get_pool_stats() -> Dict:
+    """Returns hit/wait/open/leak counters for the active database's connection pool."""
+    return _get_pool().stats()
+
+def close_all_connections():
+    """Closes every idle pooled connection (e.g. before deleting a temp DB)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
 
 def init_db():
     """Initialize database with users and events tables"""
@@ -52,26 +272,347 @@ def init_db():
     
     conn.commit()
     conn.close()
+
+    run_migrations()
     print(f"Database initialized at: {DB_PATH}")
 
-def migrate_add_user_id():
-    """Migration: Add user_id column to existing events table if it doesn't exist"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if user_id column exists
+# --- SCHEMA MIGRATIONS ---
+# Each migration runs exactly once per database and bumps schema_version.
+# Append new entries at the end; never renumber or edit an applied migration.
+
+def _migrate_add_user_id(cursor):
+    """Add user_id column to legacy events tables that predate multi-user support"""
     cursor.execute("PRAGMA table_info(events)")
     columns = [col[1] for col in cursor.fetchall()]
-    
+
     if 'user_id' not in columns:
         print("Migrating: Adding user_id column to events table...")
         cursor.execute("ALTER TABLE events ADD COLUMN user_id INTEGER")
         # Set all existing events to user_id = 1 (first user)
         cursor.execute("UPDATE events SET user_id = 1 WHERE user_id IS NULL")
+
+def _migrate_events_indexes(cursor):
+    """Composite indexes for per-user reads, duplicate checks and availability lookups"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_user_start ON events (user_id, start)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_user_title_start ON events (user_id, title, start)")
+    cursor.execute("ANALYZE")
+
+def _migrate_event_versions(cursor):
+    """Per-user data version, bumped by triggers on every write to that user's events"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    bump = '''
+        INSERT INTO event_versions (user_id, version) VALUES ({uid}, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    '''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_events_version_insert AFTER INSERT ON events
+        BEGIN {bump.format(uid="NEW.user_id")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_events_version_delete AFTER DELETE ON events
+        BEGIN {bump.format(uid="OLD.user_id")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_events_version_update AFTER UPDATE ON events
+        BEGIN {bump.format(uid="OLD.user_id")} {bump.format(uid="NEW.user_id")} END
+    ''')
+
+def _migrate_event_conflicts(cursor):
+    """Stored conflicting pairs (event_id_a < event_id_b), maintained on every write"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_conflicts (
+            event_id_a INTEGER NOT NULL,
+            event_id_b INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            first_overlap TEXT NOT NULL,
+            PRIMARY KEY (event_id_a, event_id_b)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_event_conflicts_b ON event_conflicts (event_id_b)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_event_conflicts_user ON event_conflicts (user_id, first_overlap)")
+    # Which events version the stored conflicts were computed for
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conflict_state (
+            user_id INTEGER PRIMARY KEY,
+            synced_version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_events_conflicts_delete AFTER DELETE ON events
+        BEGIN
+            DELETE FROM event_conflicts WHERE event_id_a = OLD.id OR event_id_b = OLD.id;
+        END
+    ''')
+
+def _migrate_unique_event_key(cursor):
+    """
+    Enforce the add_event duplicate rule in the schema. Events that already share
+    a (user_id, title, start) are reported, not deleted: the migration stays pending
+    until they are removed by hand.
+    """
+    cursor.execute('''
+        SELECT user_id, title, start, GROUP_CONCAT(id, ', ') AS ids FROM events
+        GROUP BY user_id, title, start HAVING COUNT(*) > 1
+    ''')
+    duplicates = cursor.fetchall()
+    if duplicates:
+        print(f"Warning: {len(duplicates)} group(s) of duplicate events (same user, title and start) "
+              "block the unique index; delete all but one event of each:")
+        for user_id, title, start, ids in duplicates:
+            print(f"  user {user_id}: '{title}' at {start} (event ids {ids})")
+        return False
+    cursor.execute("DROP INDEX IF EXISTS idx_events_user_title_start")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_events_user_title_start ON events (user_id, title, start)")
+
+def _migrate_vision_cache(cursor):
+    """Content-addressed cache of vision extraction results (see tools/extraction_cache.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vision_cache (
+            cache_key TEXT PRIMARY KEY,
+            image_hash TEXT NOT NULL,
+            week_start TEXT NOT NULL,
+            hint TEXT NOT NULL,
+            model TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            events_json TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vision_cache_last_used ON vision_cache (last_used_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vision_cache_created ON vision_cache (created_at)")
+
+def _migrate_title_search_index(cursor):
+    """Case-insensitive title index so search_events' LIKE 'prefix%' is a range scan"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_user_title_nocase ON events (user_id, title COLLATE NOCASE)")
+
+def _migrate_events_fts(cursor):
+    """
+    FTS5 index over event titles (see tools/event_search.py), synced by triggers.
+    Returns False (left pending and retried on the next startup) when SQLite lacks FTS5.
+    """
+    cursor.execute("PRAGMA compile_options")
+    if "ENABLE_FTS5" not in {row[0] for row in cursor.fetchall()}:
+        print("Warning: SQLite was built without FTS5; title search falls back to LIKE"
+              " until the full-text index can be created.")
+        return False
+    # External content table: titles are read from events, only the index is stored
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            title,
+            content='events',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS events_fts_vocab USING fts5vocab(events_fts, 'row')")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_events_fts_insert AFTER INSERT ON events
+        BEGIN
+            INSERT INTO events_fts (rowid, title) VALUES (NEW.id, NEW.title);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_events_fts_delete AFTER DELETE ON events
+        BEGIN
+            INSERT INTO events_fts (events_fts, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_events_fts_update AFTER UPDATE OF title ON events
+        BEGIN
+            INSERT INTO events_fts (events_fts, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+            INSERT INTO events_fts (rowid, title) VALUES (NEW.id, NEW.title);
+        END
+    ''')
+    # Index the events that already exist
+    cursor.execute("INSERT INTO events_fts (events_fts) VALUES ('rebuild')")
+
+# SQL twin of Series.to_columns() (tools/recurrence.py), for the backfill and for rows
+# inserted without the columns. Two statements, as the second one reads start_ts/freq.
+# substr() drops fractions and UTC offsets, like the naive parsing in Python.
+_EPOCH_COLUMNS_SQL = (
+    """UPDATE events SET
+           start_ts = CAST(strftime('%s', CASE WHEN allDay THEN date(substr(start, 1, 10))
+                                               ELSE substr(start, 1, 19) END) AS INTEGER),
+           freq = CASE WHEN LOWER(TRIM(recurrence)) IN ('daily', 'weekly', 'monthly', 'yearly')
+                       THEN LOWER(TRIM(recurrence)) END
+       WHERE {where};""",
+    """UPDATE events SET
+           end_ts = CASE WHEN allDay
+                         THEN MAX(COALESCE(CAST(strftime('%s', date(substr(end, 1, 10)), '+1 day') AS INTEGER), 0),
+                                  start_ts + 86400)
+                         ELSE MAX(CAST(strftime('%s', substr(end, 1, 19)) AS INTEGER), start_ts) END,
+           until_day = CASE WHEN freq IS NOT NULL
+                            THEN CAST(strftime('%s', date(substr(recurrence_end, 1, 10))) AS INTEGER) / 86400 END
+       WHERE {where};""",
+)
+
+def _migrate_epoch_columns(cursor):
+    """Integer start/end (epoch seconds), frequency and last day, so windows and sorting run on integers"""
+    cursor.execute("PRAGMA table_info(events)")
+    columns = {col[1] for col in cursor.fetchall()}
+    for name, sql_type in (("start_ts", "INTEGER"), ("end_ts", "INTEGER"), ("freq", "TEXT"), ("until_day", "INTEGER")):
+        if name not in columns:
+            cursor.execute(f"ALTER TABLE events ADD COLUMN {name} {sql_type}")
+    for statement in _EPOCH_COLUMNS_SQL:
+        cursor.execute(statement.format(where="1"))
+
+    unusable = cursor.execute("SELECT COUNT(*) FROM events WHERE start_ts IS NULL OR end_ts IS NULL").fetchone()[0]
+    if unusable:
+        print(f"Warning: {unusable} event(s) have unparseable dates and will not show up in date ranges.")
+
+    # add_events_bulk fills the columns itself; these cover plain INSERTs and later edits of the strings
+    fill = " ".join(statement.format(where="id = NEW.id") for statement in _EPOCH_COLUMNS_SQL)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_events_epoch_insert AFTER INSERT ON events
+        WHEN NEW.start_ts IS NULL
+        BEGIN {fill} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_events_epoch_update
+        AFTER UPDATE OF start, end, allDay, recurrence, recurrence_end ON events
+        BEGIN {fill} END
+    ''')
+    cursor.execute("DROP INDEX IF EXISTS idx_events_user_start")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_user_start_ts ON events (user_id, start_ts)")
+    cursor.execute("ANALYZE")
+
+def _migrate_occurrences(cursor):
+    """Materialized occurrences over a rolling horizon (see tools/occurrences.py), filled on first read"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS occurrences (
+            event_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            start_ts INTEGER NOT NULL,
+            end_ts INTEGER NOT NULL,
+            PRIMARY KEY (event_id, start_ts)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_occurrences_user_start ON occurrences (user_id, start_ts, end_ts)")
+    # Materialized range, longest occurrence (bounds range scans) and the events version it matches
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS occurrence_state (
+            user_id INTEGER PRIMARY KEY,
+            from_ts INTEGER NOT NULL,
+            to_ts INTEGER NOT NULL,
+            max_duration INTEGER NOT NULL,
+            synced_version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_events_occurrences_delete AFTER DELETE ON events
+        BEGIN
+            DELETE FROM occurrences WHERE event_id = OLD.id;
+        END
+    ''')
+
+def _migrate_revoked_sessions(cursor):
+    """Ids of session tokens ended by a logout, kept until the token would have expired anyway"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS revoked_sessions (
+            jti TEXT PRIMARY KEY,
+            expires_at INTEGER NOT NULL
+        )
+    ''')
+
+def _migrate_recheck_events_fts(cursor):
+    """Reopens migration 8 where older versions recorded it without creating the index (no FTS5)"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'events_fts'")
+    if cursor.fetchone() is None:
+        cursor.execute("DELETE FROM schema_version WHERE version = 8")
+
+def _migrate_recompute_all_day_spans(cursor):
+    """
+    Stored conflicts and occurrences were computed with every all-day event lasting
+    one day. Dropping them and their sync state makes the next read rebuild each user's.
+    """
+    cursor.execute("DELETE FROM conflict_state")
+    cursor.execute("DELETE FROM event_conflicts")
+    cursor.execute("DELETE FROM occurrence_state")
+    cursor.execute("DELETE FROM occurrences")
+
+# (version, description, function(cursor)); a migration that returns False is not
+# recorded and is tried again on the next startup
+MIGRATIONS = [
+    (1, "add user_id to events", _migrate_add_user_id),
+    (2, "composite indexes on events", _migrate_events_indexes),
+    (3, "per-user event data versions", _migrate_event_versions),
+    (4, "stored event conflicts", _migrate_event_conflicts),
+    (5, "unique (user_id, title, start) on events", _migrate_unique_event_key),
+    (6, "vision extraction cache", _migrate_vision_cache),
+    (7, "case-insensitive title index on events", _migrate_title_search_index),
+    (8, "full-text index over event titles", _migrate_events_fts),
+    (9, "integer epoch columns on events", _migrate_epoch_columns),
+    (10, "materialized event occurrences", _migrate_occurrences),
+    (11, "revoked session tokens", _migrate_revoked_sessions),
+    (12, "re-check the full-text index", _migrate_recheck_events_fts),
+    (13, "recompute conflicts and occurrences of multi-day all-day events", _migrate_recompute_all_day_spans),
+]
+
+def get_schema_version(conn) -> int:
+    """Highest applied migration version (0 for a fresh database)"""
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def _applied_migrations(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+def run_migrations() -> int:
+    """
+    Applies any pending migrations in order. Safe to call on every startup:
+    applied versions are skipped, and the write lock taken up front stops
+    two processes from applying the same migration twice. A migration that
+    can't apply yet (returns False) stays pending, even below later versions.
+
+    Returns:
+        The schema version after migrating.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
         conn.commit()
-        print("Migration complete!")
-    
-    conn.close()
+
+        conn.execute("BEGIN IMMEDIATE")
+        applied = _applied_migrations(conn)
+        cursor = conn.cursor()
+        for version, description, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            if migrate(cursor) is False:
+                print(f"Skipped migration {version}: {description} (will retry)")
+                continue
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            print(f"Applied migration {version}: {description}")
+        current = get_schema_version(conn)
+        conn.commit()
+        return current
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def migrate_add_user_id():
+    """Kept for older scripts: the user_id migration now runs via run_migrations()"""
+    run_migrations()
 
 # --- USER AUTHENTICATION FUNCTIONS ---
 
@@ -86,8 +627,8 @@ def create_user(username: str, password: str, email: str) -> Tuple[bool, str]:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Hash password
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        # Hash password (on the auth process pool, at AGENDAI_BCRYPT_ROUNDS)
+        password_hash = auth.hash_password(password)
         
         cursor.execute(
             "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
@@ -127,8 +668,10 @@ def verify_user(username: str, password: str) -> Tuple[bool, Optional[int]]:
         if not user:
             return False, None
         
-        # Verify password
-        if bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+        # Verify password (on the auth process pool, not the calling thread)
+        if auth.check_password(password, user['password_hash']):
+            if auth.needs_rehash(user['password_hash']):
+                _rehash_password(user['user_id'], user['password_hash'], password)
             return True, user['user_id']
         
         return False, None
@@ -136,6 +679,80 @@ def verify_user(username: str, password: str) -> Tuple[bool, Optional[int]]:
         print(f"Error verifying user: {e}")
         return False, None
 
+def _rehash_password(user_id: int, old_hash: str, password: str):
+    """Upgrades a hash made with another cost factor; a failure here never blocks the login."""
+    try:
+        new_hash = auth.hash_password(password)
+        conn = get_db_connection()
+        # Only if nobody changed the password in the meantime
+        conn.execute(
+            "UPDATE users SET password_hash = ? WHERE user_id = ? AND password_hash = ?",
+            (new_hash, user_id, old_hash)
+        )
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Warning: could not rehash password for user {user_id}: {e}")
+
+def _get_password_hash(user_id: int) -> Optional[sqlite3.Row]:
+    conn = get_db_connection()
+    row = conn.execute("SELECT user_id, username, password_hash FROM users WHERE user_id = ?", (user_id,)).fetchone()
+    conn.close()
+    return row
+
+def create_session_token(user_id: int) -> Optional[str]:
+    """Signed token a returning browser can present instead of the password (see tools/auth.py)."""
+    try:
+        user = _get_password_hash(user_id)
+        return auth.issue_token(user_id, user['password_hash']) if user else None
+    except Exception as e:
+        print(f"Error creating session token: {e}")
+        return None
+
+def verify_session_token(token: str) -> Tuple[bool, Optional[int], Optional[str]]:
+    """
+    Checks a session token without bcrypt: signature, expiry, revocation and the user's current password hash.
+
+    Returns:
+        (valid: bool, user_id: int or None, username: str or None)
+    """
+    try:
+        claims = auth.read_token(token)
+        if claims is None or not claims.get("jti"):
+            return False, None, None
+        conn = get_db_connection()
+        revoked = conn.execute("SELECT 1 FROM revoked_sessions WHERE jti = ?", (claims["jti"],)).fetchone()
+        conn.close()
+        if revoked:
+            return False, None, None
+        user = _get_password_hash(claims.get("uid"))
+        if not user or not auth.token_matches(claims, user['password_hash']):
+            return False, None, None
+        return True, user['user_id'], user['username']
+    except Exception as e:
+        print(f"Error verifying session token: {e}")
+        return False, None, None
+
+def revoke_session_token(token: str) -> bool:
+    """
+    Ends a session server-side (logout): the token is refused from now on, even if
+    a copy of it survives in the browser. Expired revocations are purged on the way.
+    """
+    try:
+        claims = auth.read_token(token) if token else None
+        if claims is None or not claims.get("jti"):
+            return False  # Already unusable
+        conn = get_db_connection()
+        conn.execute("INSERT OR IGNORE INTO revoked_sessions (jti, expires_at) VALUES (?, ?)",
+                     (claims["jti"], claims["exp"]))
+        conn.execute("DELETE FROM revoked_sessions WHERE expires_at < ?", (int(time.time()),))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error revoking session token: {e}")
+        return False
+
 def get_user_info(user_id: int) -> Optional[Dict]:
     """Get user information by user_id"""
     try:
@@ -157,5 +774,4 @@ def get_user_info(user_id: int) -> Optional[Dict]:
         return None
 
 if __name__ == "__main__":
-    init_db()
-    migrate_add_user_id()
\ No newline at end of file
+    init_db()
\ No newline at end of file
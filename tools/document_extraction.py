@@ -6,19 +6,106 @@ Separated from UI layer for reusability and testability.
 import datetime
 import json
 import io
-import base64
-from PIL import Image
-from google import genai
+import time
+from typing import TYPE_CHECKING, Optional, Tuple
 from tools.api_client import get_genai_client
-from langfuse import observe
+from tools.extraction_cache import extraction_cache, image_digest, make_key, prompt_fingerprint
+from tools.observability import observe
+from tools.metrics import VISION_ERRORS, VISION_SECONDS, timer
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Longest side sent to the model: keeps timetable text legible while shrinking phone photos ~10x
+DEFAULT_MAX_DIMENSION = 1600
+DEFAULT_JPEG_QUALITY = 85
+
+
+def _encoded_size(image: "Image.Image") -> Optional[int]:
+    """Size of the file the image was opened from, if PIL still holds it."""
+    fp = getattr(image, 'fp', None)
+    try:
+        position = fp.tell()
+        fp.seek(0, io.SEEK_END)
+        size = fp.tell()
+        fp.seek(position)
+        return size
+    except Exception:
+        return None
+
+
+def preprocess_image(
+    image: "Image.Image",
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    grayscale: bool = False,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    quality: int = DEFAULT_JPEG_QUALITY
+) -> bytes:
+    """
+    Shrinks an uploaded image into the JPEG bytes sent to the vision model.
+
+    Args:
+        image: PIL Image object (a JPEG that is not loaded yet is decoded at reduced size)
+        max_dimension: Longest side of the output in pixels (0 or None keeps the size)
+        grayscale: Drop colour for a smaller payload
+        crop: Optional (left, upper, right, lower) box in original pixel coordinates
+        quality: JPEG quality used for the single re-encode
+
+    Returns:
+        Raw JPEG bytes, passed to the client as-is
+    """
+    from PIL import Image
+
+    started = time.perf_counter()
+    original_width, original_height = image.size
+    original_bytes = _encoded_size(image)
+
+    # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 instead of decoding every
+    # pixel of a phone photo first. Not with crop: draft() changes the coordinates.
+    if max_dimension and crop is None and image.format == 'JPEG':
+        image.draft('L' if grayscale else 'RGB', (max_dimension, max_dimension))
+
+    if crop is not None:
+        image = image.crop(crop)
+
+    # Handle RGBA/transparency by flattening onto a white background
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+
+    target_mode = 'L' if grayscale else 'RGB'
+    if image.mode != target_mode:
+        image = image.convert(target_mode)
+
+    if max_dimension and max(image.size) > max_dimension:
+        scale = max_dimension / max(image.size)
+        new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(new_size, Image.LANCZOS, reducing_gap=3.0)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, optimize=True)
+    data = buffer.getvalue()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    before = f"{original_bytes:,} bytes" if original_bytes else "size unknown"
+    print(f"Vision preprocessing: {original_width}x{original_height} ({before}) -> "
+          f"{image.width}x{image.height} ({len(data):,} bytes) in {elapsed_ms:.1f} ms")
+    return data
+
 
 @observe(name="Tool: Vision Extraction")
 def extract_events_from_image(
-    image: Image.Image,
+    image: "Image.Image",
     event_categories: dict,
     vision_model_name: str,
     get_vision_prompt_fn,
-    user_hint: str = ""
+    user_hint: str = "",
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    grayscale: bool = False,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    use_cache: bool = True
 ) -> list:
     """
     Sends an image + user context to Gemini and extracts a JSON list with event categories.
@@ -29,13 +116,12 @@ def extract_events_from_image(
         vision_model_name: Model to use for vision extraction
         get_vision_prompt_fn: Function that returns the vision prompt
         user_hint: Optional user context (e.g., "next week", "following week")
+        max_dimension, grayscale, crop: Preprocessing options (see preprocess_image)
+        use_cache: Reuse the result of an identical earlier extraction (see extraction_cache)
     
     Returns:
         List of extracted events as dicts, or empty list on error
     """
-    # Get the centralized API client
-    genai_client = get_genai_client()
-    
     today = datetime.date.today()
     
     # 1. Calculate THIS week's Monday
@@ -57,33 +143,40 @@ def extract_events_from_image(
     # 4. FETCH PROMPT FROM CONFIG
     prompt = get_vision_prompt_fn(monday_str, valid_keys, user_hint)
     
-    # 5. Convert PIL Image to bytes
-    # Handle RGBA/transparency by converting to RGB
-    if image.mode in ('RGBA', 'LA', 'P'):
-        # Create white background
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-        image = background
-    
-    image_bytes = io.BytesIO()
-    image.save(image_bytes, format='JPEG')
-    image_bytes = image_bytes.getvalue()
+    # Preprocessing, cache lookup and the vision call are timed together (tools/metrics.py)
+    with timer(VISION_SECONDS, VISION_ERRORS, cache="miss") as timing:
+        # 5. Downsize and encode once; the SDK takes raw bytes (no base64 step of our own)
+        image_bytes = preprocess_image(image, max_dimension=max_dimension, grayscale=grayscale, crop=crop)
     
-    # 6. Encode image as base64
-    image_b64 = base64.standard_b64encode(image_bytes).decode('utf-8')
+        # 6. Same image, week, hint, model and prompt as before? Skip the vision call
+        if use_cache:
+            image_hash = image_digest(image_bytes)
+            prompt_version = prompt_fingerprint(get_vision_prompt_fn)
+            cache_key = make_key(image_hash, monday_str, user_hint, vision_model_name, prompt_version, valid_keys)
+            cached = extraction_cache.get(cache_key)
+            if cached is not None:
+                timing.labels["cache"] = "hit"
+                return cached
     
-    # 7. Send to Gemini and extract events
-    response = genai_client.models.generate_content(
-        model=vision_model_name,
-        contents=[
-            genai.types.Part.from_text(text=prompt),
-            genai.types.Part(
-                inline_data=genai.types.Blob(
-                    mime_type='image/jpeg',
-                    data=image_b64
+        # 7. Send to Gemini and extract events
+        from google import genai
+        genai_client = get_genai_client()
+        response = genai_client.models.generate_content(
+            model=vision_model_name,
+            contents=[
+                genai.types.Part.from_text(text=prompt),
+                genai.types.Part(
+                    inline_data=genai.types.Blob(
+                        mime_type='image/jpeg',
+                        data=image_bytes
+                    )
                 )
-            )
-        ]
-    )
-    text_data = response.text.replace("```json", "").replace("```", "").strip()
-    return json.loads(text_data)
\ No newline at end of file
+            ]
+        )
+        text_data = response.text.replace("```json", "").replace("```", "").strip()
+        events = json.loads(text_data)
+    
+        # Empty answers are often transient, so only real results are cached
+        if use_cache and events:
+            extraction_cache.put(cache_key, events, image_hash, monday_str, user_hint, vision_model_name, prompt_version)
+        return events
\ No newline at end of file
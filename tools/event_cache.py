@@ -0,0 +1,66 @@
+"""
+Per-user cache of rendered FullCalendar payloads.
+
+Streamlit reruns the whole script on every widget interaction, so the calendar
+would otherwise be rebuilt from SQLite on each click. Entries are keyed on
+(user_id, visible range) and tagged with the user's data version, a counter
+bumped by database triggers on every write to that user's events. A lookup
+only hits when the stored version matches the current one, which keeps the
+cache correct even when several sessions of the same user write concurrently.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class EventCache:
+    """Thread-safe, bounded LRU cache with hit/miss counters."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # (user_id, key) -> (version, payload)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, user_id: int, key: Hashable, version: int) -> Optional[list]:
+        """Returns the cached payload if it was built from `version`, else None."""
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None or entry[0] != version:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, user_id: int, key: Hashable, version: int, payload: list):
+        with self._lock:
+            self._entries[(user_id, key)] = (version, payload)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, user_id: int):
+        """Drops every cached window for a user (write-through after add/delete/import)."""
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == user_id]
+            for k in stale:
+                del self._entries[k]
+            if stale:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_entries": self.max_entries}
+
+
+# Process-wide instance shared by every Streamlit session
+event_cache = EventCache()
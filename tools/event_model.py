@@ -0,0 +1,107 @@
+"""
+Internal representation of a stored event.
+
+The data layer (tools/calendar_ops.fetch_events) returns `Event` objects: slotted,
+one per row, holding the stored strings as they are next to the integer
+columns written at insert time (start_ts/end_ts in epoch seconds, freq,
+until_day). Recurrence math reads `event.series`, and the FullCalendar shape
+(all-day end shift, rrule, duration) is built only at the edges by
+`to_fullcalendar()`, for the UI payload and the list_events_json tool string.
+Neither parses a date string.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from tools.recurrence import Series, from_epoch
+
+
+@dataclass(eq=False)
+class Event:
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ("id", "title", "start", "end", "all_day", "recurrence", "recurrence_end",
+                 "background_color", "border_color", "resource_id", "start_ts", "end_ts", "freq", "until_day")
+
+    id: int
+    title: str
+    start: str
+    end: str
+    all_day: bool
+    recurrence: Optional[str]
+    recurrence_end: Optional[str]
+    background_color: Optional[str]
+    border_color: Optional[str]
+    resource_id: Optional[str]
+    start_ts: Optional[int]         # Epoch seconds; None if the stored dates are unusable
+    end_ts: Optional[int]           # Exclusive (the midnight after an all-day event)
+    freq: Optional[str]             # Known frequency, or None for a single occurrence
+    until_day: Optional[int]        # Last day a recurrence may start on, in days since 1970-01-01
+
+    @classmethod
+    def from_row(cls, row) -> "Event":
+        return cls(row["id"], row["title"], row["start"], row["end"], bool(row["allDay"]),
+                   row["recurrence"], row["recurrence_end"], row["backgroundColor"],
+                   row["borderColor"], row["resourceId"], row["start_ts"], row["end_ts"],
+                   row["freq"], row["until_day"])
+
+    @property
+    def series(self) -> Series:
+        """Recurrence series of this event. Raises ValueError/TypeError on unusable dates."""
+        return Series.from_stored(self)
+
+    # Mapping-style access, so helpers written for sqlite3.Row (e.g. _series_for) accept events too
+    _KEYS = {"id": "id", "title": "title", "start": "start", "end": "end", "allDay": "all_day",
+             "recurrence": "recurrence", "recurrence_end": "recurrence_end",
+             "backgroundColor": "background_color", "borderColor": "border_color", "resourceId": "resource_id",
+             "start_ts": "start_ts", "end_ts": "end_ts", "freq": "freq", "until_day": "until_day"}
+
+    def __getitem__(self, key: str):
+        return getattr(self, self._KEYS[key])
+
+    def to_fullcalendar(self) -> dict:
+        """
+        The FullCalendar event shape (also what list_events_json sends the model).
+        Includes fix for All-Day event rendering and duration calculation.
+        """
+        end_str = self.end
+
+        # --- FIX: EXCLUSIVE END DATE FOR ALL-DAY EVENTS ---
+        # If it's all-day, FullCalendar needs the 'end' to be the start of the NEXT day,
+        # which is exactly the stored end_ts
+        if self.all_day and self.end_ts is not None:
+            end_str = from_epoch(self.end_ts).strftime("%Y-%m-%d")
+
+        event_dict = {
+            "id": self.id,
+            "title": self.title,
+            "start": self.start,
+            "end": end_str,
+            "allDay": self.all_day,
+            "backgroundColor": self.background_color,
+            "borderColor": self.border_color,
+            "resourceId": self.resource_id,
+            "recurrence": self.recurrence,
+            "recurrence_end": self.recurrence_end
+        }
+
+        # --- HANDLE RECURRENCE DURATION ---
+        if self.recurrence and self.recurrence.lower() != "none":
+            rule = {
+                "freq": self.recurrence.lower() if self.recurrence.lower() in ("daily", "weekly", "monthly", "yearly") else "daily",
+                "dtstart": self.start
+            }
+            if self.recurrence_end and str(self.recurrence_end) != "None":
+                rule["until"] = self.recurrence_end
+            event_dict["rrule"] = rule
+
+            # FullCalendar needs a 'duration' if using rrule, or it defaults to 0
+            # For all-day events, ensure duration is at least 24 hours
+            if self.all_day:
+                event_dict["duration"] = "24:00"
+            elif self.end_ts is not None:
+                total_seconds = self.end_ts - self.start_ts
+                hours = total_seconds // 3600
+                minutes = (total_seconds % 3600) // 60
+                event_dict["duration"] = f"{hours:02}:{minutes:02}"
+
+        return event_dict
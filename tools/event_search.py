@@ -0,0 +1,109 @@
+"""
+Full-text search over event titles.
+
+Titles are indexed in the FTS5 table `events_fts` (kept in sync with `events` by
+triggers, see database_ops._migrate_events_fts). Queries are tokenized the same
+way as the index, every word is matched as a prefix ("dent" finds "Dentist"),
+and results are ranked with FTS5's bm25. When that finds too little, each word
+is also matched against similar indexed words ("dentsit" -> "dentist") taken
+from the index vocabulary, so typos still find the event.
+"""
+
+import difflib
+import re
+import sqlite3
+from typing import Iterator, List, Optional
+
+# Same folding as the index tokenizer (unicode61 remove_diacritics 2) for plain ASCII input
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+FUZZY_CUTOFF = 0.75         # difflib ratio a vocabulary word needs to count as a typo match
+FUZZY_TERMS_PER_WORD = 3
+MIN_FUZZY_WORD_LENGTH = 3   # Shorter words are already covered by the prefix match
+
+
+def tokenize(text: str) -> List[str]:
+    return [word.lower() for word in _WORD.findall(text or "")]
+
+
+_fallback_logged = False
+
+
+def fts_available(conn) -> bool:
+    """True when the events_fts index exists (SQLite builds without FTS5 leave the migration pending)."""
+    global _fallback_logged
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'events_fts'").fetchone()
+    if row is None and not _fallback_logged:
+        _fallback_logged = True
+        print("Warning: events_fts is missing; title search uses the LIKE fallback.")
+    return row is not None
+
+
+def prefix_expression(words: List[str]) -> Optional[str]:
+    """FTS5 MATCH expression requiring every word as a prefix: '"team"* AND "meet"*'."""
+    if not words:
+        return None
+    return " AND ".join(f'"{word}"*' for word in words)
+
+
+def similar_terms(conn, word: str) -> List[str]:
+    """Indexed words close to `word`, looked up among vocabulary words sharing its first letter."""
+    if len(word) < MIN_FUZZY_WORD_LENGTH:
+        return []
+    first = word[0]
+    rows = conn.execute(
+        "SELECT term FROM events_fts_vocab WHERE term >= ? AND term < ?",
+        (first, chr(ord(first) + 1))
+    ).fetchall()
+    return difflib.get_close_matches(word, [row[0] for row in rows], n=FUZZY_TERMS_PER_WORD, cutoff=FUZZY_CUTOFF)
+
+
+def fuzzy_expression(conn, words: List[str]) -> Optional[str]:
+    """Every word must match as a prefix or as one of its similar indexed words."""
+    if not words:
+        return None
+    groups = []
+    for word in words:
+        options = [f'"{word}"*'] + [f'"{term}"' for term in similar_terms(conn, word) if term != word]
+        groups.append(options[0] if len(options) == 1 else "(" + " OR ".join(options) + ")")
+    return " AND ".join(groups)
+
+
+def iter_title_matches(conn, user_id: int, query: str, extra_clause: str = "", extra_params=(),
+                       fuzzy: bool = True) -> Iterator:
+    """
+    Lazily yields one user's event rows (id, title, start, end, allDay, recurrence,
+    recurrence_end and the integer start_ts, end_ts, freq, until_day) whose titles match `query`, best bm25 rank first.
+    `extra_clause` (starting with ' AND') narrows the events, e.g. to a date window.
+
+    Prefix matches come first; the typo-tolerant pass only runs if the caller
+    keeps consuming after they run out, so stop iterating once you have enough.
+    """
+    words = tokenize(query)
+    if not words:
+        return
+    sql = f"""
+        SELECT e.id, e.title, e.start, e.end, e.allDay, e.recurrence, e.recurrence_end,
+               e.start_ts, e.end_ts, e.freq, e.until_day
+        FROM events_fts f JOIN events e ON e.id = f.rowid
+        WHERE events_fts MATCH ? AND e.user_id = ?{extra_clause}
+        ORDER BY f.rank, e.start_ts
+    """
+    seen = set()
+    exact = prefix_expression(words)
+    for expression in (exact, "fuzzy"):
+        if expression == "fuzzy":
+            if not fuzzy:
+                return
+            expression = fuzzy_expression(conn, words)
+            if expression == exact:
+                return  # No similar words in the index
+        try:
+            cursor = conn.execute(sql, (expression, user_id, *extra_params))
+        except sqlite3.OperationalError as e:
+            print(f"Warning: full-text query {expression!r} failed: {e}")
+            return
+        for row in cursor:
+            if row["id"] not in seen:
+                seen.add(row["id"])
+                yield row
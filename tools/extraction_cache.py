@@ -0,0 +1,141 @@
+"""
+Persistent, content-addressed cache of vision extraction results.
+
+Re-uploading the same timetable (often with a different hint) used to pay a full
+Gemini vision call every time. Results are now stored in SQLite under a key
+derived from everything that determines the model's answer: a hash of the
+normalised image bytes, the resolved week-start date, the hint, the vision
+model and a fingerprint of the prompt template. A hit skips the network call.
+
+Entries expire after a TTL, and the least recently used ones are evicted once
+the table grows past a maximum number of entries.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+from tools.database_ops import get_db_connection
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # 30 days
+DEFAULT_MAX_ENTRIES = 500
+
+
+def image_digest(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def prompt_fingerprint(get_vision_prompt_fn) -> str:
+    """
+    Short hash of the prompt template. Rendering it with placeholder arguments
+    keeps only the fixed wording, so editing the prompt invalidates old entries
+    without anyone having to remember to bump a version number.
+    """
+    template = get_vision_prompt_fn("{monday}", "{categories}", "{hint}")
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def make_key(image_hash: str, week_start: str, hint: str, model: str, prompt_version: str,
+             categories: str = "") -> str:
+    parts = (image_hash, week_start, (hint or "").strip(), model, prompt_version, categories)
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite-backed cache (table vision_cache) with TTL, LRU eviction and hit/miss counters."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stores": 0}
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key: str) -> Optional[list]:
+        """Returns the cached events for `key`, or None on a miss or an expired entry."""
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            row = conn.execute(
+                "SELECT events_json, created_at FROM vision_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            if now - row["created_at"] > self.ttl_seconds:
+                conn.execute("DELETE FROM vision_cache WHERE cache_key = ?", (key,))
+                conn.commit()
+                self._count("expired")
+                self._count("misses")
+                return None
+            conn.execute("UPDATE vision_cache SET last_used_at = ?, hits = hits + 1 WHERE cache_key = ?", (now, key))
+            conn.commit()
+        finally:
+            conn.close()
+        self._count("hits")
+        return json.loads(row["events_json"])
+
+    def put(self, key: str, events: list, image_hash: str, week_start: str, hint: str,
+            model: str, prompt_version: str):
+        now = time.time()
+        payload = json.dumps(events)
+        conn = get_db_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute('''
+                INSERT OR REPLACE INTO vision_cache
+                    (cache_key, image_hash, week_start, hint, model, prompt_version,
+                     events_json, size_bytes, created_at, last_used_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            ''', (key, image_hash, week_start, (hint or "").strip(), model, prompt_version,
+                  payload, len(payload), now, now))
+            evicted = self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+        self._count("stores")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _evict(self, conn, now: float) -> int:
+        """Drops expired entries, then the least recently used ones above max_entries."""
+        expired = conn.execute(
+            "DELETE FROM vision_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        over = conn.execute("SELECT COUNT(*) FROM vision_cache").fetchone()[0] - self.max_entries
+        if over > 0:
+            conn.execute('''
+                DELETE FROM vision_cache WHERE cache_key IN (
+                    SELECT cache_key FROM vision_cache ORDER BY last_used_at LIMIT ?
+                )
+            ''', (over,))
+        return expired + max(0, over)
+
+    def clear(self):
+        conn = get_db_connection()
+        try:
+            conn.execute("DELETE FROM vision_cache")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        conn = get_db_connection()
+        try:
+            size, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM vision_cache"
+            ).fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            return {**self._stats, "size": size, "bytes": total_bytes,
+                    "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds}
+
+
+# Process-wide instance; the table itself is shared by every process using the DB
+extraction_cache = ExtractionCache()
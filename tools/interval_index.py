@@ -0,0 +1,72 @@
+"""
+Static interval index used by the availability engine.
+
+Intervals are half-open [start, end) and sorted by start. The sorted array is
+treated as an implicit balanced binary tree (the root of [lo, hi) is its middle
+element) and every node stores the maximum end in its subtree. That gives:
+    - is_busy(a, b):     O(log n)      (bisect + prefix max of ends)
+    - overlapping(a, b): O(log n + k)  (subtrees that end before `a` are pruned)
+"""
+
+from bisect import bisect_left
+from typing import Any, Iterable, List, Tuple
+
+Interval = Tuple[Any, Any, Any]  # (start, end, value)
+
+
+class IntervalIndex:
+
+    def __init__(self, intervals: Iterable[Interval]):
+        items = sorted(intervals, key=lambda item: item[0])
+        self._starts = [item[0] for item in items]
+        self._ends = [item[1] for item in items]
+        self._values = [item[2] for item in items]
+
+        # Running max of ends: any interval starting before index i ends by _prefix_max_end[i]
+        self._prefix_max_end = []
+        running = None
+        for end in self._ends:
+            running = end if running is None or end > running else running
+            self._prefix_max_end.append(running)
+
+        # Max end per implicit-tree subtree, stored at the subtree's root index
+        self._subtree_max_end = list(self._ends)
+        self._build(0, len(items))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def _build(self, lo: int, hi: int):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        best = self._ends[mid]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > best:
+                best = child
+        self._subtree_max_end[mid] = best
+        return best
+
+    def is_busy(self, start, end) -> bool:
+        """True if any interval overlaps [start, end)."""
+        idx = bisect_left(self._starts, end)  # intervals [0, idx) start before `end`
+        return idx > 0 and self._prefix_max_end[idx - 1] > start
+
+    def overlapping(self, start, end) -> List[Interval]:
+        """All intervals overlapping [start, end), ordered by start."""
+        found = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._subtree_max_end[mid] <= start:
+                continue  # Everything below ends before the query starts
+            stack.append((lo, mid))
+            if self._starts[mid] < end:
+                if self._ends[mid] > start:
+                    found.append((self._starts[mid], self._ends[mid], self._values[mid]))
+                stack.append((mid + 1, hi))
+        found.sort(key=lambda item: item[0])
+        return found
@@ -0,0 +1,370 @@
+"""
+In-process metrics: counters and latency histograms, independent of Langfuse.
+
+Every calendar tool, SQLite query, agent turn and vision extraction records into
+the process-wide `registry`. It can be read three ways:
+- `registry.to_prometheus()`: Prometheus text exposition format
+- `registry.snapshot()`: JSON-friendly dict with count, sum and p50/p90/p99 per series
+- `start_exporters()`: serves /metrics and /metrics.json over HTTP (AGENDAI_METRICS_PORT)
+  and/or rewrites a file every few seconds (AGENDAI_METRICS_FILE, .json or Prometheus text)
+
+Only the standard library is used, so importing this module stays cheap.
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Dict, Iterable, Optional, Tuple
+
+# Upper bounds in seconds. DB queries are sub-millisecond, LLM calls take seconds.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.9, 0.99)
+EXPORT_INTERVAL_SECONDS = float(os.getenv("AGENDAI_METRICS_INTERVAL", "15"))
+
+
+def _label_key(label_names: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in label_names)
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = []
+    for name, value in pairs:
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        rendered.append(f'{name}="{value}"')
+    return "{" + ",".join(rendered) + "}" if rendered else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.label_names, labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def _prometheus_lines(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(zip(self.label_names, key))} {_format_number(value)}"
+
+    def _snapshot(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [{"labels": dict(zip(self.label_names, key)), "value": value} for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set (observed values in seconds)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), count, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = _label_key(self.label_names, labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def _copy(self):
+        with self._lock:
+            return sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimated quantile for one label set (same interpolation as PromQL's histogram_quantile)."""
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            series = self._series.get(key)
+            counts = list(series[0]) if series else None
+        return self._quantile(counts, q) if counts else None
+
+    def _quantile(self, counts: list, q: float) -> Optional[float]:
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the last bucket: report its bound
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def _prometheus_lines(self):
+        for key, (counts, count, total) in self._copy():
+            pairs = list(zip(self.label_names, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(pairs + [("le", _format_number(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(pairs)} {_format_number(total)}"
+            yield f"{self.name}_count{_format_labels(pairs)} {count}"
+
+    def _snapshot(self) -> list:
+        series = []
+        for key, (counts, count, total) in self._copy():
+            entry = {"labels": dict(zip(self.label_names, key)), "count": count, "sum": total,
+                     "mean": total / count if count else None}
+            for q in QUANTILES:
+                entry[f"p{int(q * 100)}"] = self._quantile(counts, q)
+            series.append(entry)
+        return series
+
+
+class MetricsRegistry:
+    """Named counters and histograms, exportable as Prometheus text or a JSON snapshot."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric '{metric.name}' is already registered as a {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def reset(self):
+        """Clears every recorded value (the metric definitions stay registered)."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric._prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        return {
+            "generated_at": time.time(),
+            "metrics": {
+                name: {"type": metric.kind, "help": metric.help, "series": metric._snapshot()}
+                for name, metric in sorted(self._metrics.items())
+            },
+        }
+
+
+registry = MetricsRegistry()
+
+# --- METRICS RECORDED BY THE APP ---
+TOOL_SECONDS = registry.histogram(
+    "agendai_tool_seconds", "Calendar tool execution time", ("tool",))
+TOOL_ERRORS = registry.counter(
+    "agendai_tool_errors_total", "Calendar tool calls that raised or returned an error", ("tool",))
+DB_QUERY_SECONDS = registry.histogram(
+    "agendai_db_query_seconds", "SQLite statement execution time (excludes fetching rows)", ("operation",))
+DB_QUERY_ERRORS = registry.counter(
+    "agendai_db_query_errors_total", "SQLite statements that raised", ("operation",))
+DB_LOCK_ERRORS = registry.counter(
+    "agendai_db_lock_errors_total", "SQLite statements that gave up on a locked/busy database", ("operation",))
+AGENT_TURN_SECONDS = registry.histogram(
+    "agendai_agent_turn_seconds", "Agent turn latency, tool rounds included", ("mode",))
+AGENT_TURN_ERRORS = registry.counter(
+    "agendai_agent_turn_errors_total", "Agent turns that failed", ("mode",))
+AGENT_FIRST_TOKEN_SECONDS = registry.histogram(
+    "agendai_agent_first_token_seconds", "Time to the first streamed text chunk")
+VISION_SECONDS = registry.histogram(
+    "agendai_vision_extraction_seconds", "Vision extraction time per image", ("cache",))
+VISION_ERRORS = registry.counter(
+    "agendai_vision_extraction_errors_total", "Vision extractions that raised")
+
+
+class timer(ContextDecorator):
+    """
+    Times a block or function into a histogram; exceptions also bump `errors`.
+    Labels can be filled in while the block runs: `with timer(H) as t: t.labels["cache"] = "hit"`.
+    """
+
+    def __init__(self, histogram: Histogram, errors: Optional[Counter] = None, **labels):
+        self.histogram = histogram
+        self.errors = errors
+        self.labels = labels
+        self._started = None
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call, so concurrent calls don't share a start time
+        return timer(self.histogram, self.errors, **self.labels)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self._started, **self.labels)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc(**self.labels)
+        return False
+
+
+def timed_tool(func):
+    """
+    Records a tool's latency and errors under its function name. Tools report most
+    failures to the model as an "Error..." string, so those count as errors too.
+    """
+    timed = timer(TOOL_SECONDS, TOOL_ERRORS, tool=func.__name__)(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = timed(*args, **kwargs)
+        if isinstance(result, str) and result.startswith("Error"):
+            TOOL_ERRORS.inc(tool=func.__name__)
+        return result
+
+    return wrapper
+
+
+def query_operation(sql: str) -> str:
+    """Low-cardinality label for a statement: its leading keyword (SELECT, INSERT, ...)."""
+    words = sql.split(None, 1)
+    return words[0].upper() if words else "EMPTY"
+
+
+# --- EXPORT ---
+
+def write_metrics_file(path: str):
+    """Writes the registry to `path` atomically: JSON for *.json, Prometheus text otherwise."""
+    if path.endswith(".json"):
+        content = json.dumps(registry.snapshot(), indent=2)
+    else:
+        content = registry.to_prometheus()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def start_http_server(port: int, host: str = "0.0.0.0"):
+    """Serves /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body, content_type = json.dumps(registry.snapshot()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the console
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Metrics endpoint listening on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def _file_export_loop(path: str, interval: float):
+    while True:
+        try:
+            write_metrics_file(path)
+        except OSError as e:
+            print(f"Warning: could not write metrics to {path}: {e}")
+        time.sleep(interval)
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+def start_exporters() -> Dict:
+    """
+    Starts the exporters configured by environment variables (once per process):
+    AGENDAI_METRICS_PORT for the HTTP endpoint, AGENDAI_METRICS_FILE for the file.
+    Returns what was started, e.g. {"port": 9464, "file": "data/metrics.prom"}.
+    """
+    global _exporters_started
+    started = {}
+    with _exporters_lock:
+        if _exporters_started:
+            return started
+        _exporters_started = True
+        port = os.getenv("AGENDAI_METRICS_PORT")
+        if port:
+            try:
+                started["port"] = start_http_server(int(port)).server_port
+            except (OSError, ValueError) as e:
+                print(f"Warning: metrics endpoint not started on port {port!r}: {e}")
+        path = os.getenv("AGENDAI_METRICS_FILE")
+        if path:
+            threading.Thread(target=_file_export_loop, args=(path, EXPORT_INTERVAL_SECONDS),
+                             name="metrics-file", daemon=True).start()
+            started["file"] = path
+    return started
@@ -0,0 +1,49 @@
+"""
+Lazy Langfuse integration.
+
+Importing langfuse pulls in the whole OpenTelemetry stack, which the login page
+never needs. `observe` here has the same call signature as `langfuse.observe`,
+but only imports langfuse the first time a decorated function actually runs.
+When langfuse is not installed, decorated functions run untraced.
+"""
+
+import functools
+import threading
+
+_langfuse_observe = None
+_resolve_lock = threading.Lock()
+
+
+def _noop_observe(**kwargs):
+    def decorator(func):
+        return func
+    return decorator
+
+
+def _get_langfuse_observe():
+    global _langfuse_observe
+    if _langfuse_observe is None:
+        with _resolve_lock:
+            if _langfuse_observe is None:
+                try:
+                    from langfuse import observe as langfuse_observe
+                except ImportError:
+                    print("Warning: Langfuse not available, observability disabled")
+                    langfuse_observe = _noop_observe
+                _langfuse_observe = langfuse_observe
+    return _langfuse_observe
+
+
+def observe(**kwargs):
+    """Drop-in for langfuse.observe(...) that defers the langfuse import to the first call."""
+    def decorator(func):
+        traced = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **call_kwargs):
+            nonlocal traced
+            if traced is None:
+                traced = _get_langfuse_observe()(**kwargs)(func)
+            return traced(*args, **call_kwargs)
+        return wrapper
+    return decorator
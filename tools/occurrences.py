@@ -0,0 +1,59 @@
+"""
+Rolling horizon of the materialized `occurrences` table.
+
+Every event is expanded into one row per occurrence (start_ts, end_ts) for a
+window around today, from AGENDAI_OCCURRENCE_PAST_DAYS back to
+AGENDAI_OCCURRENCE_HORIZON_DAYS ahead. The rows are written and read by
+tools/calendar_ops.py (see "MATERIALIZED OCCURRENCES" there): add_event and
+delete_event maintain them incrementally, and windows outside the materialized
+range fall back to expanding the series in Python.
+
+The range moves with the clock, so a background thread (start_extender())
+periodically extends each user's rows to the new horizon and drops the ones
+that fell behind it.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from tools.recurrence import to_epoch
+
+OCCURRENCE_PAST_DAYS = int(os.getenv("AGENDAI_OCCURRENCE_PAST_DAYS", "90"))
+# Conflict reports look 730 days ahead; the extra month gives the extender room to fall behind
+OCCURRENCE_HORIZON_DAYS = int(os.getenv("AGENDAI_OCCURRENCE_HORIZON_DAYS", "760"))
+EXTEND_INTERVAL_SECONDS = float(os.getenv("AGENDAI_OCCURRENCE_EXTEND_SECONDS", "3600"))
+
+
+def rolling_range(now: Optional[datetime] = None) -> Tuple[int, int]:
+    """(from_ts, to_ts) that should be materialized today, aligned to midnights."""
+    today = datetime.combine((now or datetime.now()).date(), datetime.min.time())
+    return (to_epoch(today - timedelta(days=OCCURRENCE_PAST_DAYS)),
+            to_epoch(today + timedelta(days=OCCURRENCE_HORIZON_DAYS)))
+
+
+def _extend_loop(interval: float):
+    from tools.calendar_ops import extend_all_occurrences
+    while True:
+        time.sleep(interval)
+        try:
+            extend_all_occurrences()
+        except Exception as e:
+            print(f"Warning: extending materialized occurrences failed: {e}")
+
+
+_extender_started = False
+_extender_lock = threading.Lock()
+
+
+def start_extender(interval: float = EXTEND_INTERVAL_SECONDS) -> bool:
+    """Starts the background extension thread once per process. Returns False if not started."""
+    global _extender_started
+    with _extender_lock:
+        if _extender_started or interval <= 0:
+            return False
+        _extender_started = True
+        threading.Thread(target=_extend_loop, args=(interval,), name="occurrences-extender", daemon=True).start()
+    return True
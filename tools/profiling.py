@@ -0,0 +1,223 @@
+"""
+Opt-in profiler for Streamlit reruns.
+
+Enabled with AGENDAI_PROFILE=1 or the `?profile=1` query parameter. A
+`RerunProfiler` runs cProfile over one execution of streamlit_app.py and keeps
+a wall-clock breakdown of named sections (auth, calendar fetch, agent turn, ...).
+Service methods decorated with `profiled` add themselves to the breakdown of
+whichever rerun is active on the current thread, and cost one thread-local
+lookup when profiling is off.
+
+Streamlit may run each rerun on a fresh thread, so the rerun in progress is also
+kept on the session's `RerunHistory`: that is how the next rerun finds (and closes)
+one that st.rerun()/st.stop() cut short.
+
+Set AGENDAI_PROFILE_DIR to also dump a `.prof` file per rerun, for snakeviz or
+`python -m pstats`. Nothing here depends on Streamlit; the panel is drawn by the app.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+PROFILE_ENV = "AGENDAI_PROFILE"
+PROFILE_DIR_ENV = "AGENDAI_PROFILE_DIR"
+PROFILE_QUERY_PARAM = "profile"
+DEFAULT_TOP_FUNCTIONS = 15
+MAX_PROFILE_HISTORY = 20
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+_active = threading.local()
+
+
+def profiling_enabled(query_value: Optional[str] = None) -> bool:
+    """True when the env var or the query parameter value asks for profiling."""
+    if os.getenv(PROFILE_ENV, "").strip().lower() in _TRUTHY:
+        return True
+    return (query_value or "").strip().lower() in _TRUTHY
+
+
+@dataclass
+class Section:
+    name: str
+    depth: int                      # 0 for top-level sections, +1 per nesting level
+    ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class RerunReport:
+    label: str
+    started_at: float               # time.time() when the rerun began
+    total_ms: float
+    sections: List[Section]
+    top_functions: List[dict]       # cProfile rows, slowest cumulative time first
+    interrupted: bool = False       # Ended by st.rerun()/st.stop() before the end of the script
+    dump_path: Optional[str] = None
+
+    @property
+    def unaccounted_ms(self) -> float:
+        """Rerun time spent outside every top-level section (imports, layout, widgets)."""
+        return max(0.0, self.total_ms - sum(s.ms for s in self.sections if s.depth == 0))
+
+    def breakdown(self) -> List[dict]:
+        """Rows for a table: one per section, indented by depth, plus the unaccounted rest."""
+        rows = [{"section": "  " * s.depth + s.name, "ms": round(s.ms, 1),
+                 "share": f"{s.ms / self.total_ms:.0%}" if self.total_ms else "-"}
+                for s in self.sections]
+        rows.append({"section": "(other)", "ms": round(self.unaccounted_ms, 1),
+                     "share": f"{self.unaccounted_ms / self.total_ms:.0%}" if self.total_ms else "-"})
+        return rows
+
+
+class RerunProfiler:
+    """cProfile plus named wall-clock sections for one rerun on the current thread."""
+
+    def __init__(self, label: str = "rerun", top_n: int = DEFAULT_TOP_FUNCTIONS,
+                 dump_dir: Optional[str] = None):
+        self.label = label
+        self.top_n = top_n
+        self.dump_dir = dump_dir if dump_dir is not None else os.getenv(PROFILE_DIR_ENV)
+        self.sections: List[Section] = []
+        self._depth = 0
+        self._profile = None
+        self._started = None
+        self._started_at = None
+        self.stopped = False
+
+    def start(self) -> "RerunProfiler":
+        import cProfile
+        self._profile = cProfile.Profile()
+        self._started_at = time.time()
+        self._started = time.perf_counter()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger's) already owns this thread: keep the sections only
+            print(f"Warning: cProfile not enabled for this rerun: {e}")
+            self._profile = None
+        _active.profiler = self
+        return self
+
+    @contextmanager
+    def section(self, name: str):
+        """Times a block into the breakdown; nested sections are indented under it."""
+        entry = Section(name, self._depth, 0.0)
+        self.sections.append(entry)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield entry
+        except Exception as e:
+            entry.error = str(e)
+            raise
+        finally:
+            entry.ms = (time.perf_counter() - started) * 1000
+            self._depth -= 1
+
+    def stop(self, interrupted: bool = False) -> RerunReport:
+        total_ms = (time.perf_counter() - self._started) * 1000
+        self.stopped = True
+        if getattr(_active, "profiler", None) is self:
+            _active.profiler = None
+        top_functions, dump_path = [], None
+        if self._profile is not None:
+            self._profile.disable()
+            top_functions = _top_functions(self._profile, self.top_n)
+            dump_path = self._dump()
+        return RerunReport(self.label, self._started_at, total_ms, list(self.sections),
+                           top_functions, interrupted, dump_path)
+
+    def _dump(self) -> Optional[str]:
+        if not self.dump_dir:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started_at))
+        path = os.path.join(self.dump_dir, f"{self.label}-{stamp}-{int(self._started_at * 1000) % 1000:03d}.prof")
+        try:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            self._profile.dump_stats(path)
+        except OSError as e:
+            print(f"Warning: could not write profile to {path}: {e}")
+            return None
+        return path
+
+
+def _top_functions(profile, top_n: int) -> List[dict]:
+    import pstats
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        location = func if filename == "~" else f"{os.path.basename(filename)}:{line}({func})"
+        rows.append({"function": location, "calls": ncalls,
+                     "tottime_ms": round(tottime * 1000, 2), "cumtime_ms": round(cumtime * 1000, 2)})
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:top_n]
+
+
+class RerunHistory(deque):
+    """One session's latest RerunReports, plus the profiler of the rerun in progress."""
+
+    def __init__(self, maxlen: int = MAX_PROFILE_HISTORY):
+        super().__init__(maxlen=maxlen)
+        self.running: Optional[RerunProfiler] = None
+
+
+def active_profiler() -> Optional[RerunProfiler]:
+    profiler = getattr(_active, "profiler", None)
+    return None if profiler is None or profiler.stopped else profiler
+
+
+def start_rerun(history: RerunHistory, label: str = "rerun") -> RerunProfiler:
+    """
+    Starts profiling this rerun. If the session's previous rerun never reached
+    finish_rerun (st.rerun()/st.stop() end the script early), it is closed first and
+    kept in `history` as interrupted, whichever thread it ran on.
+    """
+    previous = history.running
+    if previous is not None and not previous.stopped:
+        history.append(previous.stop(interrupted=True))
+    history.running = RerunProfiler(label).start()
+    return history.running
+
+
+def finish_rerun(profiler: RerunProfiler, history: RerunHistory) -> RerunReport:
+    report = profiler.stop()
+    history.append(report)
+    if history.running is profiler:
+        history.running = None
+    return report
+
+
+def new_history() -> RerunHistory:
+    return RerunHistory()
+
+
+@contextmanager
+def section(name: str):
+    """Section on the active rerun profiler, or a plain block when profiling is off."""
+    profiler = active_profiler()
+    if profiler is None:
+        yield None
+        return
+    with profiler.section(name) as entry:
+        yield entry
+
+
+def profiled(func):
+    """Adds each call to the active rerun's breakdown (as Class.method)."""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = active_profiler()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.section(name):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,229 @@
+"""
+Closed-form recurrence expansion shared by the calendar tools.
+
+A Series is one stored event: a first occurrence, a duration, an optional
+frequency (daily, weekly, monthly, yearly) and an optional inclusive end date.
+The k-th occurrence is computed directly from the anchor, so the code can jump
+straight to the first occurrence of a window instead of walking day by day,
+and monthly/yearly series do not drift after a clamped month (Jan 31 -> Feb 28 -> Mar 31).
+"""
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+_FIXED_STEPS = {"daily": timedelta(days=1), "weekly": timedelta(days=7)}
+_MONTH_STEPS = {"monthly": 1, "yearly": 12}
+
+# Rough spacing, only used to decide which series of a pair is the sparser one
+_SPACING_DAYS = {"daily": 1, "weekly": 7, "monthly": 30, "yearly": 365, None: float("inf")}
+
+# How many occurrences of the sparser series must be checked before the pair's
+# combined pattern repeats: weekday vs day-of-month realigns every 28 years,
+# month-end clamping every 4 years, and a daily series looks the same every day.
+_CYCLE_CHECKS = {
+    ("daily", "daily"): 2, ("daily", "weekly"): 2, ("daily", "monthly"): 2, ("daily", "yearly"): 2,
+    ("weekly", "weekly"): 2, ("weekly", "monthly"): 28 * 12 + 1, ("weekly", "yearly"): 28 + 1,
+    ("monthly", "monthly"): 4 * 12 + 1, ("monthly", "yearly"): 4 + 1,
+    ("yearly", "yearly"): 4 + 1,
+}
+
+MIN_ALL_DAY_DURATION = timedelta(days=1)
+
+EMPTY_MARKERS = ("", "none", "null")
+
+
+def normalize_recurrence(value) -> Optional[str]:
+    """Maps stored recurrence values ("None", "", "Weekly", ...) to a frequency or None."""
+    if not value:
+        return None
+    lowered = str(value).lower().strip()
+    return None if lowered in EMPTY_MARKERS else lowered
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parses 'YYYY-MM-DD' or ISO datetimes into a naive datetime. Raises ValueError."""
+    value = str(value).strip()
+    if "T" in value or " " in value:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def parse_until(value) -> Optional[date]:
+    """Parses a recurrence_end value, treating empty markers as 'no end'."""
+    if not value or str(value).lower().strip() in EMPTY_MARKERS:
+        return None
+    return parse_datetime(value).date()
+
+
+# Stored epoch columns (see migration 9 in tools/database_ops.py): naive datetimes
+# read as UTC, in whole seconds, the same numbers SQLite's strftime('%s', ...) gives.
+EPOCH = datetime(1970, 1, 1)
+DAY_SECONDS = 86400
+
+
+def to_epoch(dt: datetime) -> int:
+    return (dt - EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(ts: int) -> datetime:
+    return EPOCH + timedelta(0, ts)  # Positional: about twice as fast as seconds=ts
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    """Shifts by whole months, clamping the day to the length of the target month."""
+    year = dt.year + (dt.month - 1 + months) // 12
+    month = (dt.month - 1 + months) % 12 + 1
+    day = min(dt.day, monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+@dataclass(frozen=True)
+class Series:
+    start: datetime
+    duration: timedelta
+    freq: Optional[str] = None       # None means a single occurrence
+    until: Optional[date] = None     # Last day an occurrence may start on (inclusive)
+
+    @classmethod
+    def from_event(cls, event: dict) -> "Series":
+        """Builds a Series from an event dict/row (start, end, allDay, recurrence, recurrence_end)."""
+        start = parse_datetime(event["start"])
+        if event["allDay"]:
+            # Whole days up to the midnight after the (inclusive) end date, like to_columns()
+            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+            duration = MIN_ALL_DAY_DURATION
+            if event["end"]:
+                end_day = datetime.combine(parse_datetime(event["end"]).date() + timedelta(days=1), datetime.min.time())
+                duration = max(end_day - start, duration)
+        else:
+            duration = parse_datetime(event["end"]) - start
+
+        freq = normalize_recurrence(event["recurrence"])
+        if freq not in FREQUENCIES:
+            freq = None  # Unknown recurrence: treat as non-recurring
+        until = parse_until(event["recurrence_end"]) if freq else None
+        return cls(start, max(duration, timedelta(0)), freq, until)
+
+    @classmethod
+    def from_columns(cls, start_ts: int, end_ts: int, all_day, freq: Optional[str],
+                     until_day: Optional[int]) -> "Series":
+        """Builds a Series from the stored integer columns, without parsing any string."""
+        duration = timedelta(seconds=end_ts - start_ts)
+        if all_day:
+            duration = max(duration, MIN_ALL_DAY_DURATION)
+        until = date.fromordinal(EPOCH.toordinal() + until_day) if freq and until_day is not None else None
+        return cls(from_epoch(start_ts), duration, freq, until)
+
+    @classmethod
+    def from_stored(cls, row) -> "Series":
+        """Series for an events row or Event: the integer columns when filled, else the strings."""
+        if row["start_ts"] is None or row["end_ts"] is None:
+            return cls.from_event(row)
+        return cls.from_columns(row["start_ts"], row["end_ts"], row["allDay"], row["freq"], row["until_day"])
+
+    def to_columns(self, end: str, all_day) -> Tuple[int, int, Optional[str], Optional[int]]:
+        """
+        (start_ts, end_ts, freq, until_day) to store next to the strings.
+        end_ts is exclusive; an all-day event ends at the midnight after its stored
+        (inclusive) end date, and at least one day after it starts.
+        """
+        start_ts = to_epoch(self.start)
+        if all_day:
+            end_day = datetime.combine(parse_datetime(end).date() + timedelta(days=1), datetime.min.time())
+            end_ts = max(to_epoch(end_day), start_ts + DAY_SECONDS)
+        else:
+            end_ts = start_ts + self.duration // timedelta(seconds=1)
+        until_day = (self.until - EPOCH.date()).days if self.freq and self.until else None
+        return start_ts, end_ts, self.freq, until_day
+
+    def occurrence(self, k: int) -> datetime:
+        """Start of the k-th occurrence (k >= 0), ignoring `until`."""
+        if k == 0 or self.freq is None:
+            return self.start
+        if self.freq in _FIXED_STEPS:
+            return self.start + k * _FIXED_STEPS[self.freq]
+        return add_months(self.start, k * _MONTH_STEPS[self.freq])
+
+    def _in_bounds(self, k: int) -> bool:
+        if self.freq is None:
+            return k == 0
+        return self.until is None or self.occurrence(k).date() <= self.until
+
+    def first_index_ending_after(self, t: datetime) -> Optional[int]:
+        """Smallest k whose occurrence ends after `t` (so it overlaps or follows t), or None."""
+        threshold = t - self.duration  # occurrence(k) must be strictly later than this
+        if self.start > threshold:
+            k = 0
+        elif self.freq is None:
+            return None
+        elif self.freq in _FIXED_STEPS:
+            k = (threshold - self.start) // _FIXED_STEPS[self.freq] + 1
+        else:
+            step = _MONTH_STEPS[self.freq]
+            months = (threshold.year - self.start.year) * 12 + threshold.month - self.start.month
+            k = max(0, months // step - 1)
+            while self.occurrence(k) <= threshold:
+                k += 1
+        return k if self._in_bounds(k) else None
+
+    def occurrences(self, window_start: datetime = None, window_end: datetime = None) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Lazily yields (start, end) for occurrences overlapping [window_start, window_end).
+        Without window_end an endless series yields forever, so always bound it or stop early.
+        """
+        k = 0 if window_start is None else self.first_index_ending_after(window_start)
+        while k is not None and self._in_bounds(k):
+            occ_start = self.occurrence(k)
+            if window_end is not None and occ_start >= window_end:
+                return
+            yield occ_start, occ_start + self.duration
+            if self.freq is None:
+                return
+            k += 1
+
+    def has_occurrence_in(self, window_start: datetime, window_end: datetime) -> bool:
+        """O(1) check for at least one occurrence overlapping [window_start, window_end)."""
+        k = self.first_index_ending_after(window_start)
+        return k is not None and self.occurrence(k) < window_end
+
+
+def first_overlap(a: Series, b: Series, not_before: datetime = None) -> Optional[datetime]:
+    """
+    Returns the start of the first overlap between two series (at or after
+    `not_before`), or None if they never overlap.
+
+    Only the sparser series is stepped, and only for as many occurrences as it
+    takes the pair's combined pattern to repeat (see _CYCLE_CHECKS); each step
+    locates the matching occurrence of the denser series in O(1). The cost is
+    therefore bounded by the calendar cycle, not by how far the series run.
+    """
+    if _SPACING_DAYS[a.freq] > _SPACING_DAYS[b.freq]:
+        a, b = b, a
+    dense, sparse = a, b
+
+    # Start where both series are active
+    begin = dense.start if not_before is None else max(dense.start, not_before)
+    k = sparse.first_index_ending_after(begin)
+    if sparse.freq is None:
+        limit = 1
+    else:
+        limit = _CYCLE_CHECKS[(dense.freq, sparse.freq)]
+
+    checked = 0
+    while k is not None and checked < limit and sparse._in_bounds(k):
+        s_start = sparse.occurrence(k)
+        j = dense.first_index_ending_after(s_start if not_before is None else max(s_start, not_before))
+        if j is None:
+            return None  # The denser series has ended
+        d_start = dense.occurrence(j)
+        if d_start < s_start + sparse.duration:
+            return max(s_start, d_start, begin)
+        if sparse.freq is None:
+            return None
+        k += 1
+        checked += 1
+    return None
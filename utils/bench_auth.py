@@ -0,0 +1,118 @@
+"""
+Benchmark for login bursts: N concurrent logins with bcrypt on the calling threads
+(the old behaviour, AGENDAI_AUTH_WORKERS=0) vs on the auth process pool (tools/auth.py),
+and returning sessions resumed from a signed token instead.
+While each burst runs, a probe thread times a cheap calendar read every 10 ms to show
+how much the burst slows everything else in the server process.
+Uses a throwaway database; the real DB is never touched.
+Run this from command line: python -m utils.bench_auth [--logins 50] [--out FILE]
+"""
+import argparse
+import sys
+import os
+import statistics
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from tools import auth
+from utils.bench_report import bench_meta, write_report
+from utils.synthetic_data import seed_database, temporary_database
+
+DEFAULT_LOGINS = 50
+PASSWORD = "bench-password"
+PROBE_INTERVAL = 0.01
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def burst(n, login):
+    """Starts n logins at once; returns (wall seconds, per-login ms, probe ms)."""
+    from tools.calendar_ops import get_events_version
+
+    latencies, probes = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(n + 1)
+    done = threading.Event()
+
+    def worker(i):
+        start.wait()
+        t0 = time.perf_counter()
+        ok = login(i)
+        with lock:
+            latencies.append((time.perf_counter() - t0) * 1000)
+        assert ok, f"login {i} failed"
+
+    def probe():
+        while not done.is_set():
+            t0 = time.perf_counter()
+            get_events_version(1)
+            probes.append((time.perf_counter() - t0) * 1000)
+            time.sleep(PROBE_INTERVAL)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    prober = threading.Thread(target=probe)
+    prober.start()
+    t0 = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - t0
+    done.set()
+    prober.join()
+    return wall, latencies, probes
+
+
+def report(label, n, wall, latencies, probes):
+    print(f"{label:<28} {n / wall:8.1f} logins/s | p50 {statistics.median(latencies):8.1f} ms"
+          f" | p99 {_percentile(latencies, 0.99):8.1f} ms | probe p99 {_percentile(probes, 0.99):6.2f} ms")
+    return {"case": label, "logins": n, "logins_per_s": round(n / wall, 2),
+            "p50_ms": round(statistics.median(latencies), 3), "p99_ms": round(_percentile(latencies, 0.99), 3),
+            "probe_p99_ms": round(_percentile(probes, 0.99), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent logins and session token resumes.")
+    parser.add_argument("--logins", type=int, default=DEFAULT_LOGINS, help="Concurrent logins per burst")
+    parser.add_argument("--out", help="Also write the results as JSON")
+    args = parser.parse_args()
+    n = args.logins
+
+    results = []
+    with temporary_database():
+        seed_database(n, n)
+        password_hash = auth.hash_password(PASSWORD)
+        conn = database_ops.get_db_connection()
+        conn.execute("UPDATE users SET password_hash = ?", (password_hash,))
+        conn.commit()
+        conn.close()
+        print(f"{n} concurrent logins, bcrypt cost {auth.BCRYPT_ROUNDS}, {auth.AUTH_WORKERS} auth workers\n")
+
+        def login(i):
+            return database_ops.verify_user(f"user_{i + 1}", PASSWORD)[0]
+
+        workers = auth.AUTH_WORKERS
+        auth.AUTH_WORKERS = 0
+        try:
+            results.append(report("bcrypt on request threads", n, *burst(n, login)))
+        finally:
+            auth.AUTH_WORKERS = workers
+        results.append(report("bcrypt on process pool", n, *burst(n, login)))
+
+        tokens = [database_ops.create_session_token(i + 1) for i in range(n)]
+        results.append(report("session token resume", n,
+                              *burst(n, lambda i: database_ops.verify_session_token(tokens[i])[0])))
+    auth.shutdown()
+
+    if args.out:
+        write_report(args.out, bench_meta(bcrypt_rounds=auth.BCRYPT_ROUNDS, auth_workers=auth.AUTH_WORKERS), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark for the availability engine (tools/interval_index.py + check_availability).
+Uses a throwaway database with 10k+ events for one user; the real DB is never touched.
+Run this from command line: python -m utils.bench_availability [--sizes 10000 50000] [--out FILE]
+"""
+import argparse
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from tools.interval_index import IntervalIndex
+from utils.bench_report import bench_meta, write_report
+
+DEFAULT_SIZES = [10_000, 50_000]
+N_QUERIES = 2000
+SEED = 42
+
+def _random_intervals(n, rng, base):
+    intervals = []
+    for i in range(n):
+        start = base + timedelta(minutes=15 * rng.randrange(0, 4 * 24 * 365))
+        intervals.append((start, start + timedelta(minutes=rng.choice((30, 60, 90, 120))), i))
+    return intervals
+
+def _linear_overlapping(intervals, start, end):
+    return [iv for iv in intervals if iv[0] < end and iv[1] > start]
+
+def bench_index(n, rng):
+    base = datetime(2026, 1, 1)
+    intervals = _random_intervals(n, rng, base)
+    queries = []
+    for _ in range(N_QUERIES):
+        q_start = base + timedelta(minutes=15 * rng.randrange(0, 4 * 24 * 365))
+        queries.append((q_start, q_start + timedelta(hours=1)))
+
+    t0 = time.perf_counter()
+    index = IntervalIndex(intervals)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    indexed = [index.overlapping(a, b) for a, b in queries]
+    index_us = (time.perf_counter() - t0) / N_QUERIES * 1e6
+
+    t0 = time.perf_counter()
+    busy = [index.is_busy(a, b) for a, b in queries]
+    busy_us = (time.perf_counter() - t0) / N_QUERIES * 1e6
+
+    t0 = time.perf_counter()
+    linear = [_linear_overlapping(intervals, a, b) for a, b in queries]
+    linear_us = (time.perf_counter() - t0) / N_QUERIES * 1e6
+
+    # Sanity check: both strategies must agree
+    assert [sorted(x[2] for x in r) for r in indexed] == [sorted(x[2] for x in r) for r in linear]
+    assert busy == [bool(r) for r in linear]
+
+    print(f"IntervalIndex n={n:>7}: build {build_ms:8.1f} ms | overlapping {index_us:7.1f} us/query"
+          f" | is_busy {busy_us:5.1f} us/query | linear scan {linear_us:9.1f} us/query")
+    return {"case": "IntervalIndex", "n_events": n, "build_ms": round(build_ms, 3),
+            "overlapping_us": round(index_us, 3), "is_busy_us": round(busy_us, 3), "linear_us": round(linear_us, 3)}
+
+def bench_check_availability(n, rng):
+    import tools.calendar_ops as calendar_ops
+
+    original_path = database_ops.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_ops.DB_PATH = os.path.join(tmp_dir, "bench.db")
+        try:
+            database_ops.init_db()
+            base = datetime(2026, 1, 1)
+            rows = []
+            for start, end, i in _random_intervals(n, rng, base):
+                recurrence = "weekly" if i % 50 == 0 else None
+                rows.append((1, 0, f"Event {i}", start.isoformat(), end.isoformat(), recurrence))
+            conn = database_ops.get_db_connection()
+            conn.executemany(
+                "INSERT INTO events (user_id, allDay, title, start, end, recurrence) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+            conn.close()
+
+            queries = [
+                (base + timedelta(days=rng.randrange(0, 80), hours=rng.randrange(8, 18))).isoformat()
+                for _ in range(N_QUERIES)
+            ]
+
+            t0 = time.perf_counter()
+            calendar_ops.check_availability(queries[0], 1)
+            cold_ms = (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            for q in queries:
+                calendar_ops.check_availability(q, 1)
+            warm_us = (time.perf_counter() - t0) / N_QUERIES * 1e6
+
+            print(f"check_availability n={n:>7}: cold (builds index) {cold_ms:8.1f} ms"
+                  f" | warm {warm_us:7.1f} us/call")
+            return {"case": "check_availability", "n_events": n,
+                    "cold_ms": round(cold_ms, 3), "warm_us": round(warm_us, 3)}
+        finally:
+            database_ops.close_all_connections()
+            database_ops.DB_PATH = original_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the availability engine at several calendar sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = [bench_index(n, rng) for n in args.sizes]
+    results += [bench_check_availability(n, rng) for n in args.sizes]
+    if args.out:
+        write_report(args.out, bench_meta(seed=args.seed, queries=N_QUERIES), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark suite for the calendar hot paths at growing calendar sizes.
+Each size gets a throwaway database (utils/synthetic_data.py) where the benchmarked
+user owns n events and nine other users share n/10 more; the real DB is never touched.
+
+Cases: the occurrences rebuild, _fetch_events_from_db, CalendarService.get_ui_events,
+check_availability, get_conflicts_report and add_event (run last, since it writes). "cold" cases clear
+the in-process caches before every sample.
+
+Results go to a JSON file, so two commits can be compared:
+    python -m utils.bench_calendar_ops [--sizes 100 1000 10000 100000] [--out FILE]
+    python -m utils.bench_calendar_ops --compare OLD.json NEW.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bench_report import ROOT_DIR, bench_meta, write_report
+from utils.synthetic_data import SEED, base_date, seed_database, temporary_database
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+DEFAULT_REPEATS = 20
+MIN_REPEATS = 3
+CASE_BUDGET_SECONDS = 5.0    # Stop repeating a case after this long (once MIN_REPEATS ran)
+N_OTHER_USERS = 9
+
+
+def measure(fn, repeats: int, setup=None) -> dict:
+    """Runs fn up to `repeats` times (setup before each, untimed) and summarises the samples in ms."""
+    samples = []
+    deadline = time.perf_counter() + CASE_BUDGET_SECONDS
+    for i in range(repeats):
+        if setup:
+            setup(i)
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+        if len(samples) >= MIN_REPEATS and time.perf_counter() > deadline:
+            break
+    samples.sort()
+    return {
+        "samples": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def bench_size(n: int, repeats: int, seed: int) -> list:
+    import tools.calendar_ops as calendar_ops
+    from services.calendar_service import CalendarService
+    from tools.event_cache import event_cache
+
+    def clear_caches(_=None):
+        event_cache.clear()
+        calendar_ops._availability_cache.clear()
+
+    results = []
+
+    def record(case, stats):
+        results.append({"case": case, "n_events": n, **stats})
+        print(f"  {case:<40} median {stats['median_ms']:>10.2f} ms | p95 {stats['p95_ms']:>10.2f} ms"
+              f" | {stats['samples']:>3} samples")
+
+    with temporary_database():
+        t0 = time.perf_counter()
+        user_id = seed_database(n // 10, 1 + N_OTHER_USERS, seed, events_per_user={0: n})[0]
+        print(f"n={n:,}: seeded in {time.perf_counter() - t0:.1f} s")
+
+        rng = random.Random(seed)
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        month_start, month_end = today.replace(day=1), today.replace(day=1) + timedelta(days=42)
+        window = (month_start.isoformat(), month_end.isoformat())
+        moments = [
+            (today + timedelta(days=rng.randrange(-60, 120), hours=rng.randrange(8, 20))).isoformat()
+            for _ in range(repeats)
+        ]
+
+        # 0. Seeding bypasses add_event, so the occurrences table is materialized from scratch once
+        t0 = time.perf_counter()
+        calendar_ops.rebuild_occurrences(user_id)
+        record("occurrences rebuild", {
+            "samples": 1, **{k: round((time.perf_counter() - t0) * 1000, 3)
+                             for k in ("median_ms", "p95_ms", "min_ms", "mean_ms")}})
+
+        # 1. Raw windowed fetch (what the agent tools and the UI build on)
+        record("_fetch_events_from_db month", measure(
+            lambda i: calendar_ops._fetch_events_from_db(user_id, *window), repeats))
+        record("_fetch_events_from_db all", measure(
+            lambda i: calendar_ops._fetch_events_from_db(user_id), repeats))
+
+        # 2. Calendar payload for a rerun: cache miss vs version-validated hit
+        record("get_ui_events month cold", measure(
+            lambda i: CalendarService.get_ui_events(user_id, *window), repeats, setup=clear_caches))
+        CalendarService.get_ui_events(user_id, *window)
+        record("get_ui_events month warm", measure(
+            lambda i: CalendarService.get_ui_events(user_id, *window), repeats))
+
+        # 3. Availability: first query builds the window's interval index
+        record("check_availability cold", measure(
+            lambda i: calendar_ops.check_availability(moments[i], user_id), repeats, setup=clear_caches))
+        for moment in moments:
+            calendar_ops.check_availability(moment, user_id)
+        record("check_availability warm", measure(
+            lambda i: calendar_ops.check_availability(moments[i], user_id), repeats))
+
+        # 4. Conflicts: the first stored read rebuilds the table (seeding bypasses add_event)
+        t0 = time.perf_counter()
+        calendar_ops.get_conflicts_report(user_id)
+        record("get_conflicts_report rebuild", {
+            "samples": 1, **{k: round((time.perf_counter() - t0) * 1000, 3)
+                             for k in ("median_ms", "p95_ms", "min_ms", "mean_ms")}})
+        record("get_conflicts_report stored", measure(
+            lambda i: calendar_ops.get_conflicts_report(user_id), repeats))
+        record("get_conflicts_report month", measure(
+            lambda i: calendar_ops.get_conflicts_report(user_id, window[0][:10], window[1][:10]), repeats))
+
+        # 5. Writes last: each add_event checks the new event for conflicts
+        record("add_event", measure(
+            lambda i: calendar_ops.add_event(
+                f"Bench event {i}", (today + timedelta(days=i % 30, hours=10)).isoformat(),
+                (today + timedelta(days=i % 30, hours=11)).isoformat(), False, user_id),
+            repeats))
+        record("add_event weekly", measure(
+            lambda i: calendar_ops.add_event(
+                f"Bench series {i}", (today + timedelta(days=i % 7, hours=14)).isoformat(),
+                (today + timedelta(days=i % 7, hours=15)).isoformat(), False, user_id, recurrence="weekly"),
+            repeats))
+    return results
+
+
+def run(sizes, repeats: int, seed: int) -> dict:
+    report = {
+        "meta": bench_meta(seed=seed, repeats=repeats, base_date=base_date().date().isoformat()),
+        "results": [],
+    }
+    for n in sizes:
+        report["results"].extend(bench_size(n, repeats, seed))
+    return report
+
+
+def compare(old_path: str, new_path: str):
+    """Prints median time per case and size for two result files, with the change in %."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    old_by_key = {(r["case"], r["n_events"]): r for r in old["results"]}
+    print(f"{'case':<40} {'n':>8} {old['meta']['commit']:>12} {new['meta']['commit']:>12}   change")
+    for r in new["results"]:
+        before = old_by_key.get((r["case"], r["n_events"]))
+        if before is None:
+            continue
+        change = (r["median_ms"] - before["median_ms"]) / max(before["median_ms"], 1e-9)
+        print(f"{r['case']:<40} {r['n_events']:>8,} {before['median_ms']:>10.2f}ms {r['median_ms']:>10.2f}ms"
+              f"   {change:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark calendar_ops at several calendar sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="JSON results file (default: bench_results/calendar_ops-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args.sizes, max(args.repeats, MIN_REPEATS), args.seed)
+    out = args.out or os.path.join(ROOT_DIR, "bench_results", f"calendar_ops-{report['meta']['commit']}.json")
+    write_report(out, report["meta"], report["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark for the internal event representation (tools/event_model.py) at 100k events.
+Compares, from the same fetched rows:
+    - the old JSON round-trip: FullCalendar dict per row -> json.dumps -> json.loads
+    - FullCalendar dicts built for every row (what fetch_events used to return)
+    - slotted Event objects (what fetch_events returns now)
+    - Event objects converted to FullCalendar dicts at the edge (the UI payload)
+Time is the median of several runs; memory is what the resulting list keeps alive (tracemalloc).
+Uses a throwaway database; the real DB is never touched.
+Run this from command line: python -m utils.bench_event_model [--events 100000] [--out FILE]
+"""
+import argparse
+import sys
+import os
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from tools.event_model import Event
+from utils.bench_report import bench_meta, write_report
+from utils.synthetic_data import SEED, seed_database, temporary_database
+
+DEFAULT_EVENTS = 100_000
+REPEATS = 5
+
+
+def as_fullcalendar(rows):
+    return [Event.from_row(row).to_fullcalendar() for row in rows]
+
+
+def json_round_trip(rows):
+    return json.loads(json.dumps(as_fullcalendar(rows)))
+
+
+def as_events(rows):
+    return [Event.from_row(row) for row in rows]
+
+
+def events_then_fullcalendar(rows):
+    return [event.to_fullcalendar() for event in as_events(rows)]
+
+
+def series_from_dicts(rows):
+    from tools.recurrence import Series
+    return [Series.from_event(event) for event in as_fullcalendar(rows)]
+
+
+def series_from_events(rows):
+    return [event.series for event in as_events(rows)]
+
+
+CASES = [
+    ("JSON round-trip (old)", json_round_trip),
+    ("FullCalendar dicts", as_fullcalendar),
+    ("Event objects", as_events),
+    ("Events -> FullCalendar at edge", events_then_fullcalendar),
+    ("Series via dicts (availability)", series_from_dicts),
+    ("Series via Events (availability)", series_from_events),
+]
+
+
+def retained_bytes(fn, rows) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = fn(rows)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the internal event representations.")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    with temporary_database():
+        seed_database(args.events, 1, args.seed)
+        conn = database_ops.get_db_connection()
+        rows = conn.execute("SELECT * FROM events WHERE user_id = 1").fetchall()
+        conn.close()
+    print(f"{len(rows):,} events\n")
+    print(f"{'representation':<34} {'median ms':>10} {'retained MiB':>13} {'bytes/event':>12}")
+    results = []
+    for label, fn in CASES:
+        samples = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            fn(rows)
+            samples.append((time.perf_counter() - t0) * 1000)
+        size = retained_bytes(fn, rows)
+        print(f"{label:<34} {statistics.median(samples):>10.1f} {size / 2**20:>13.1f} {size / len(rows):>12.0f}")
+        results.append({"case": label, "n_events": len(rows), "median_ms": round(statistics.median(samples), 3),
+                        "retained_bytes": size})
+
+    if args.out:
+        write_report(args.out, bench_meta(seed=args.seed, repeats=args.repeats), results)
+
+
+if __name__ == "__main__":
+    main()
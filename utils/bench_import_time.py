@@ -0,0 +1,82 @@
+"""
+Startup budget check for the modules the login page imports.
+Runs `python -X importtime` in a fresh interpreter (without GOOGLE_API_KEY, like a
+cold start before any Gemini call), reports the slowest imports and fails when:
+    - the median import time of the app modules exceeds the budget, or
+    - a heavy dependency (google-genai, langfuse, PIL) is imported eagerly.
+Run this from command line: python -m utils.bench_import_time [--budget-ms 150] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What streamlit_app.py imports from this repo before the login form is shown
+APP_MODULES = ["services.calendar_service", "src.agent"]
+
+# Only needed once the user chats or uploads an image
+LAZY_MODULES = ["google.genai", "langfuse", "PIL"]
+
+DEFAULT_BUDGET_MS = float(os.getenv("AGENDAI_IMPORT_BUDGET_MS", "150"))
+
+def _run_importtime():
+    """Returns [(module, self_us, cumulative_us, depth)] for one cold interpreter."""
+    env = {k: v for k, v in os.environ.items() if k != "GOOGLE_API_KEY"}
+    env["PYTHONPATH"] = ROOT_DIR
+    code = "import " + ", ".join(APP_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"❌ Importing the app modules failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(max(1, args.runs)):
+        entries = _run_importtime()
+        totals.append(sum(cum for name, _, cum, _ in entries if name in APP_MODULES) / 1000)
+    median_ms = statistics.median(totals)
+
+    # Slowest imports of the last run, by time spent in the module itself
+    print(f"Slowest imports (self time, last of {len(totals)} runs):")
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda e: -e[1])[:args.top]:
+        print(f"  {self_us / 1000:8.2f} ms self | {cumulative_us / 1000:8.2f} ms cumulative | {name}")
+
+    imported = {name for name, _, _, _ in entries}
+    eager = [m for m in LAZY_MODULES if m in imported]
+
+    print(f"\nApp modules ({', '.join(APP_MODULES)}): median {median_ms:.1f} ms"
+          f" (min {min(totals):.1f}, max {max(totals):.1f}) | budget {args.budget_ms:.0f} ms")
+
+    failed = False
+    if eager:
+        print(f"❌ Heavy modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"❌ Startup import budget exceeded by {median_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Startup imports are within budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+JSON results shared by the benchmark scripts (their --out option), so runs on
+two commits can be diffed. Every file holds {"meta": {...}, "results": [...]}.
+"""
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_meta(**settings) -> dict:
+    """Where and how the results were produced, plus the script's own settings."""
+    return {
+        "commit": git_commit(),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        **settings,
+    }
+
+
+def write_report(path: str, meta: dict, results: list):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\n✅ Results written to {path}")
@@ -0,0 +1,102 @@
+"""
+Compares how much context the agent pays to find an event by name:
+list_events_json (full dump, as the old prompt instructed) vs search_events.
+Uses a throwaway database with 1k events for one user; the real DB is never touched.
+Token counts use Gemini's count_tokens when GOOGLE_API_KEY is set, else ~4 chars/token.
+Run this from command line: python -m utils.bench_search_tokens [--events 1000] [--out FILE]
+"""
+import argparse
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from config.constants import EVENT_CATEGORIES, LLM_MODEL_NAME
+from utils.bench_report import bench_meta, write_report
+
+DEFAULT_EVENTS = 1000
+SEED = 42
+TITLES = ["Math Lecture", "Physics Lab", "Team Meeting", "Dentist", "Gym", "Lunch with Ana",
+          "Project Review", "Guitar Lesson", "Exam: Chemistry", "Birthday Party"]
+
+def _count_tokens(text):
+    """(tokens, method): exact via the API when a key is configured, else an estimate."""
+    if os.getenv("GOOGLE_API_KEY"):
+        try:
+            from tools.api_client import get_genai_client
+            result = get_genai_client().models.count_tokens(model=LLM_MODEL_NAME, contents=text)
+            return result.total_tokens, "count_tokens"
+        except Exception as e:
+            print(f"Warning: count_tokens failed ({e}), using the estimate")
+    return len(text) // 4, "chars/4"
+
+def seed(n, rng):
+    base = datetime(2026, 1, 5, 8)
+    colors = list(EVENT_CATEGORIES.values())
+    rows = []
+    for i in range(n):
+        start = base + timedelta(days=rng.randrange(0, 365), hours=rng.randrange(0, 10))
+        recurrence = rng.choice(["weekly", "daily", "monthly"]) if i % 20 == 0 else None
+        color = rng.choice(colors)
+        rows.append((1, 0, f"{rng.choice(TITLES)} #{i}", start.isoformat(),
+                     (start + timedelta(hours=1)).isoformat(), recurrence, color, color))
+    conn = database_ops.get_db_connection()
+    conn.executemany(
+        "INSERT INTO events (user_id, allDay, title, start, end, recurrence, backgroundColor, borderColor)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+def measure(label, fn):
+    t0 = time.perf_counter()
+    output = fn()
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    tokens, method = _count_tokens(output)
+    print(f"{label:<52} {len(output):>9,} chars | {tokens:>8,} tokens ({method}) | {elapsed_ms:7.1f} ms")
+    return {"case": label, "chars": len(output), "tokens": tokens, "token_count": method,
+            "ms": round(elapsed_ms, 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the context cost of list_events_json and search_events.")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS, help="Events seeded for the user")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Also write the results as JSON")
+    args = parser.parse_args()
+    n = args.events
+    rng = random.Random(args.seed)
+
+    original_path = database_ops.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_ops.DB_PATH = os.path.join(tmp_dir, "bench.db")
+        try:
+            database_ops.init_db()
+            seed(n, rng)
+            from tools.calendar_ops import list_events_json, search_events
+
+            print(f"Finding one event by name among {n:,} events:")
+            results = [
+                measure("list_events_json(user_id)", lambda: list_events_json(1)),
+                measure("list_events_json(user_id, one month)",
+                        lambda: list_events_json(1, "2026-03-01", "2026-03-31")),
+                measure('search_events(user_id, "dentist")', lambda: search_events(1, "dentist")),
+                measure('search_events(user_id, "dentist", one month)',
+                        lambda: search_events(1, "dentist", "2026-03-01", "2026-03-31")),
+            ]
+            full, month, search = (r["tokens"] for r in results[:3])
+
+            print(f"\nsearch_events uses {full / max(search, 1):,.0f}x fewer tokens than the full dump"
+                  f" and {month / max(search, 1):,.1f}x fewer than a one-month listing.")
+        finally:
+            database_ops.close_all_connections()
+            database_ops.DB_PATH = original_path
+
+    if args.out:
+        write_report(args.out, bench_meta(seed=args.seed, n_events=n), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark for title search: the FTS5 index (tools/event_search.py) vs a LIKE scan.
+Uses a throwaway database with 100k events spread over 10 users; the real DB is never touched.
+Run this from command line: python -m utils.bench_title_search [--events 100000] [--out FILE]
+"""
+import argparse
+import sys
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from utils.bench_report import bench_meta, write_report
+
+DEFAULT_EVENTS = 100_000
+SEED = 42
+N_USERS = 10
+LIMIT = 10
+REPEATS = 20
+
+WHAT = ["Math", "Physics", "Chemistry", "History", "Team", "Project", "Client", "Dentist", "Gym",
+        "Guitar", "Lunch", "Dinner", "Review", "Yoga", "Doctor", "Standup", "Workshop", "Exam"]
+KIND = ["Lecture", "Lab", "Meeting", "Sync", "Appointment", "Session", "Lesson", "Call", "Deadline", "Party"]
+WHO = ["with Ana", "with Rui", "with Marta", "with the team", "", "", ""]
+
+# (label, query): common words, rare words, prefixes and typos
+QUERIES = [("common word", "meeting"), ("two words", "team sync"), ("prefix", "chem"),
+           ("rare title", "guitar lesson marta"), ("typo", "dentsit"), ("no match", "zebra")]
+
+def seed(n, rng):
+    base = datetime(2026, 1, 5, 8)
+    rows = []
+    for i in range(n):
+        start = base + timedelta(days=rng.randrange(0, 730), hours=rng.randrange(0, 12))
+        title = " ".join(filter(None, [rng.choice(WHAT), rng.choice(KIND), rng.choice(WHO)])) + f" {i}"
+        rows.append((1 + i % N_USERS, 0, title, start.isoformat(), (start + timedelta(hours=1)).isoformat()))
+    conn = database_ops.get_db_connection()
+    conn.executemany("INSERT INTO events (user_id, allDay, title, start, end) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+def like_scan(conn, user_id, query):
+    """What title lookups cost without the index: a substring scan over the user's events."""
+    return conn.execute(
+        "SELECT id, title, start, end FROM events WHERE user_id = ? AND title LIKE ? ORDER BY start LIMIT ?",
+        (user_id, f"%{query}%", LIMIT)
+    ).fetchall()
+
+def timed(fn, repeats=REPEATS):
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FTS5 title search against a LIKE scan.")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS, help=f"Events spread over {N_USERS} users")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Also write the results as JSON")
+    args = parser.parse_args()
+    n = args.events
+    rng = random.Random(args.seed)
+    results = []
+
+    original_path = database_ops.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_ops.DB_PATH = os.path.join(tmp_dir, "bench.db")
+        try:
+            database_ops.init_db()
+            t0 = time.perf_counter()
+            seed(n, rng)
+            print(f"Seeded {n:,} events ({N_USERS} users) in {time.perf_counter() - t0:.1f} s, FTS kept in sync by triggers\n")
+
+            from tools.calendar_ops import find_events
+            conn = database_ops.get_db_connection()
+            print(f"{'query':<30} {'FTS5 (ms)':>10} {'hits':>5} | {'LIKE scan (ms)':>14} {'hits':>5} | speed-up")
+            for label, query in QUERIES:
+                fts_ms, fts_hits = timed(lambda: find_events(1, query, limit=LIMIT), args.repeats)
+                like_ms, like_hits = timed(lambda: like_scan(conn, 1, query), args.repeats)
+                print(f"{label + ': ' + repr(query):<30} {fts_ms:>10.2f} {len(fts_hits):>5} |"
+                      f" {like_ms:>14.2f} {len(like_hits):>5} | {like_ms / max(fts_ms, 1e-6):6.1f}x")
+                results.append({"case": label, "query": query, "n_events": n,
+                                "fts_median_ms": round(fts_ms, 3), "fts_hits": len(fts_hits),
+                                "like_median_ms": round(like_ms, 3), "like_hits": len(like_hits)})
+            conn.close()
+        finally:
+            database_ops.close_all_connections()
+            database_ops.DB_PATH = original_path
+
+    if args.out:
+        write_report(args.out, bench_meta(seed=args.seed, repeats=args.repeats, users=N_USERS), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Checks that the hot event queries are served by the composite indexes.
+Builds a throwaway database, runs the migrations and inspects EXPLAIN QUERY PLAN.
+Run this from command line: python -m utils.check_query_plans
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from tools.calendar_ops import _window_clause
+
+WINDOW_CLAUSE, WINDOW_PARAMS = _window_clause("2026-02-01", "2026-03-01")
+
+# (description, query, params, index that must appear in the plan)
+QUERY_PLAN_CHECKS = [
+    ("fetch events for visible window (_select_window_rows)",
+     "SELECT * FROM events WHERE user_id = ?" + WINDOW_CLAUSE,
+     (1, *WINDOW_PARAMS),
+     "idx_events_user_start_ts (user_id=? AND start_ts<?)"),
+    ("occurrences for availability and conflict reports",
+     "SELECT o.start_ts, o.end_ts, o.event_id, e.title FROM occurrences o JOIN events e ON e.id = o.event_id"
+     " WHERE o.user_id = ? AND o.start_ts >= ? AND o.start_ts < ? AND o.end_ts > ? ORDER BY o.start_ts",
+     (1, 1769900400, 1772323200, 1769904000),
+     "idx_occurrences_user_start (user_id=? AND start_ts>? AND start_ts<?)"),
+    ("stored conflicts report",
+     "SELECT c.event_id_a, a.title AS title_a, c.event_id_b, b.title AS title_b, c.first_overlap"
+     " FROM event_conflicts c JOIN events a ON a.id = c.event_id_a JOIN events b ON b.id = c.event_id_b"
+     " WHERE c.user_id = ? ORDER BY c.first_overlap, c.event_id_a, c.event_id_b LIMIT ? OFFSET ?",
+     (1, 20, 0), "idx_event_conflicts_user (user_id=?)"),
+    ("duplicate probe in add_events_bulk",
+     "SELECT 1 FROM events WHERE user_id = ? AND title = ? AND start = ?",
+     (1, "Gym", "2026-02-02T10:00:00"), "uq_events_user_title_start"),
+    ("search_events title prefix",
+     "SELECT id, title, start, end FROM events WHERE user_id = ? AND title LIKE ? ESCAPE '\\' ORDER BY start_ts",
+     (1, "eve%"), "idx_events_user_title_nocase"),
+]
+
+def seed_events(n_users: int = 5, per_user: int = 200):
+    """Fill the temp DB so ANALYZE has realistic statistics to work with"""
+    conn = database_ops.get_db_connection()
+    rows = []
+    for user_id in range(1, n_users + 1):
+        for i in range(per_user):
+            day = f"2026-{i % 12 + 1:02}-{i % 28 + 1:02}"
+            rows.append((user_id, 0, f"Event {i % 40}", f"{day}T{i % 24:02}:00:00", f"{day}T{i % 24:02}:30:00"))
+    conn.executemany(
+        "INSERT INTO events (user_id, allDay, title, start, end) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+def check_query_plans() -> bool:
+    conn = database_ops.get_db_connection()
+    all_ok = True
+    try:
+        for description, query, params, index_name in QUERY_PLAN_CHECKS:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            details = " | ".join(row["detail"] for row in plan)
+            ok = index_name in details
+            all_ok = all_ok and ok
+            print(f"{'✅' if ok else '❌'} {description}: {details}")
+    finally:
+        conn.close()
+    return all_ok
+
+def main():
+    original_path = database_ops.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_ops.DB_PATH = os.path.join(tmp_dir, "plans.db")
+        try:
+            database_ops.init_db()
+            # Second run must be a no-op
+            version = database_ops.run_migrations()
+            assert version == database_ops.MIGRATIONS[-1][0], f"Unexpected schema version {version}"
+            seed_events()
+            ok = check_query_plans()
+        finally:
+            database_ops.close_all_connections()
+            database_ops.DB_PATH = original_path
+
+    if not ok:
+        print("❌ Some queries are not using the expected indexes.")
+        sys.exit(1)
+    print("✅ All event queries use their indexes.")
+
+if __name__ == "__main__":
+    main()
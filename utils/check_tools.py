@@ -0,0 +1,113 @@
+"""
+Checks the calendar tools against the inputs the model actually sends.
+Optional parameters must not be declared required, and the model fills the
+ones it leaves out with "" (which must mean "no bound"). Also covers window
+edge cases of the event queries. Runs on a throwaway database.
+Run this from command line: python -m utils.check_tools
+"""
+import sys
+import os
+import json
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.calendar_ops as calendar_ops
+from utils.synthetic_data import temporary_database
+
+USER_ID = 1
+
+# Tool -> parameters the model may leave out
+OPTIONAL_TOOL_PARAMS = {
+    "list_events_json": ("start_date", "end_date"),
+    "search_events": ("query", "start_date", "end_date", "limit"),
+    "check_availability": ("end_datetime",),
+    "get_conflicts_report": ("start_date", "end_date", "max_results"),
+}
+
+def check(description: str, passed: bool, detail: str = "") -> bool:
+    print(f"{'✅' if passed else '❌'} {description}" + (f": {detail}" if detail and not passed else ""))
+    return passed
+
+def check_declarations() -> bool:
+    from src.agent import get_tool_declarations
+
+    ok = True
+    declarations = {d.name: d for d in get_tool_declarations().function_declarations}
+    for name, optional in OPTIONAL_TOOL_PARAMS.items():
+        required = set(declarations[name].parameters.required or [])
+        wrongly_required = sorted(required.intersection(optional))
+        ok &= check(f"{name} declares {', '.join(optional)} optional", not wrongly_required,
+                    f"declared required: {wrongly_required}")
+    return ok
+
+def check_empty_dates() -> bool:
+    calendar_ops.add_event("Standup", "2026-02-02T09:00:00", "2026-02-02T09:15:00", False, USER_ID,
+                           recurrence="weekly", recurrence_end="2026-06-29")
+    calendar_ops.add_event("Dentist", "2026-03-10T14:00:00", "2026-03-10T15:00:00", False, USER_ID)
+
+    unbounded = calendar_ops.list_events_json(USER_ID)
+    ok = check("list_events_json with empty dates", calendar_ops.list_events_json(USER_ID, "", "") == unbounded,
+               calendar_ops.list_events_json(USER_ID, "", ""))
+    before = [e["title"] for e in json.loads(calendar_ops.list_events_json(USER_ID, "", "2026-02-01"))]
+    ok &= check("list_events_json with an empty start_date", before == [], str(before))
+
+    found = calendar_ops.search_events(USER_ID, "dentist", "", "")
+    titles = [e["title"] for e in json.loads(found)] if found.startswith("[") else None
+    ok &= check("search_events with empty dates", titles == ["Dentist"], found)
+
+    busy = calendar_ops.check_availability("2026-03-10T14:30:00", USER_ID, "")
+    ok &= check("check_availability with an empty end_datetime", busy.startswith("Busy: 'Dentist'"), busy)
+
+    stored = calendar_ops.get_stored_conflicts(USER_ID).to_text()
+    report = calendar_ops.get_conflicts_report(USER_ID, "", "")
+    ok &= check("get_conflicts_report with empty dates reads the stored conflicts", report == stored, report)
+    report = calendar_ops.get_conflicts_report(USER_ID, "", "2026-12-31")
+    ok &= check("get_conflicts_report with an empty start_date", not report.startswith("Error"), report)
+    return ok
+
+def check_window_edges() -> bool:
+    # The last occurrence starts the evening before the window and runs into it
+    calendar_ops.add_event("Night shift", "2027-03-01T20:00:00", "2027-03-02T08:00:00", False, USER_ID,
+                           recurrence="daily", recurrence_end="2027-03-05")
+    morning = [e["title"] for e in json.loads(calendar_ops.list_events_json(USER_ID, "2027-03-06T00:00:00", "2027-03-06T12:00:00"))]
+    later = [e["title"] for e in json.loads(calendar_ops.list_events_json(USER_ID, "2027-03-07", "2027-03-07"))]
+    ok = check("series whose last occurrence runs into the window", morning == ["Night shift"], str(morning))
+    ok &= check("series that ended before the window", later == [], str(later))
+    return ok
+
+def check_invalid_dates() -> bool:
+    ok = True
+    for start_date, end_date in (("2026-02-01", "next friday"), ("tomorrow", "2026-12-31")):
+        result = calendar_ops.list_events_json(USER_ID, start_date, end_date)
+        ok &= check(f"list_events_json reports an invalid date ({start_date!r}, {end_date!r})",
+                    result.startswith("Error fetching events:"), result)
+    return ok
+
+def check_multi_day_all_day() -> bool:
+    # Stored end dates of all-day events are inclusive: busy through the 28th
+    calendar_ops.add_event("Conference", "2026-10-26", "2026-10-28", True, USER_ID)
+    day_two = calendar_ops.check_availability("2026-10-27T12:00:00", USER_ID)
+    day_after = calendar_ops.check_availability("2026-10-29T12:00:00", USER_ID)
+    ok = check("multi-day all-day event is busy after its first day", day_two.startswith("Busy: 'Conference'"), day_two)
+    ok &= check("multi-day all-day event is over after its end date", day_after.startswith("Free"), day_after)
+
+    calendar_ops.add_event("Talk", "2026-10-27T10:00:00", "2026-10-27T11:00:00", False, USER_ID)
+    for label, report in (("stored", calendar_ops.get_conflicts_report(USER_ID)),
+                          ("windowed", calendar_ops.get_conflicts_report(USER_ID, "2026-10-01", "2026-11-30"))):
+        ok &= check(f"{label} conflict report sees a talk on day two", "'Conference' overlaps with 'Talk'" in report, report)
+    return ok
+
+def main():
+    ok = check_declarations()
+    with temporary_database():
+        ok &= check_empty_dates()
+        ok &= check_window_edges()
+        ok &= check_invalid_dates()
+        ok &= check_multi_day_all_day()
+
+    if not ok:
+        print("❌ Some tool checks failed.")
+        sys.exit(1)
+    print("✅ All tool checks passed.")
+
+if __name__ == "__main__":
+    main()
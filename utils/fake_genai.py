@@ -0,0 +1,157 @@
+"""
+Local stand-in for the google-genai client, for load tests without network or API key.
+
+FakeGenAIClient exposes the one path get_agent() uses (client.chats.create) and
+returns chats that play back scripted turns: the user's message selects a
+ScriptedTurn, whose rounds of tool calls are returned one per model call before
+the final text. Each model call sleeps for a configurable latency, so the agent
+loop, the tools and SQLite run for real while Gemini is simulated.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class Latency:
+    """Per model call: mean_ms +/- jitter_ms (uniform); first_token_ms applies to streaming."""
+    mean_ms: float = 400.0
+    jitter_ms: float = 150.0
+    first_token_ms: float = 250.0
+
+    def sleep(self, rng: random.Random, mean_ms: float = None):
+        mean_ms = self.mean_ms if mean_ms is None else mean_ms
+        delay = max(0.0, mean_ms + rng.uniform(-self.jitter_ms, self.jitter_ms))
+        time.sleep(delay / 1000)
+
+
+@dataclass
+class ToolCall:
+    name: str
+    args: Callable[[dict], dict]    # ctx (user_id, rng, today, turn) -> call arguments
+
+
+@dataclass
+class ScriptedTurn:
+    message: str
+    rounds: List[List[ToolCall]] = field(default_factory=list)  # One list of calls per model response
+    reply: str = "Done."
+
+
+def _at(ctx, days: int, hour: int) -> str:
+    return (ctx["today"] + timedelta(days=days, hours=hour)).isoformat()
+
+
+# What a session typically asks, with the tool calls Gemini answers with
+DEFAULT_SCRIPT = [
+    ScriptedTurn("Am I free tomorrow at 10?", [
+        [ToolCall("check_availability", lambda c: {"check_datetime": _at(c, 1, 10), "user_id": c["user_id"]})],
+    ], "You're free tomorrow at 10:00."),
+    ScriptedTurn("Book a dentist appointment next week", [
+        [ToolCall("check_availability", lambda c: {
+            "check_datetime": _at(c, 7 + c["rng"].randrange(5), 15), "user_id": c["user_id"]})],
+        [ToolCall("add_event", lambda c: {
+            "title": f"Dentist {c['turn']}", "start": _at(c, 7 + c["turn"] % 5, 15),
+            "end": _at(c, 7 + c["turn"] % 5, 16), "allDay": False, "user_id": c["user_id"]})],
+    ], "Booked the dentist."),
+    ScriptedTurn("Add a weekly gym session", [
+        [ToolCall("add_event", lambda c: {
+            "title": f"Gym {c['turn']}", "start": _at(c, c["turn"] % 7, 18), "end": _at(c, c["turn"] % 7, 19),
+            "allDay": False, "user_id": c["user_id"], "recurrence": "weekly"})],
+    ], "Added your weekly gym session."),
+    ScriptedTurn("What do I have next week?", [
+        [ToolCall("search_events", lambda c: {
+            "user_id": c["user_id"], "start_date": (c["today"] + timedelta(days=7)).date().isoformat(),
+            "end_date": (c["today"] + timedelta(days=13)).date().isoformat()})],
+    ], "Here's your next week."),
+    ScriptedTurn("When is my math lecture?", [
+        [ToolCall("search_events", lambda c: {"user_id": c["user_id"], "query": "math lecture"})],
+    ], "Your math lecture is on Monday."),
+    ScriptedTurn("Do I have any conflicts?", [
+        [ToolCall("get_conflicts_report", lambda c: {"user_id": c["user_id"]})],
+    ], "No conflicts found."),
+    ScriptedTurn("Thanks!", [], "You're welcome!"),
+]
+
+
+def _function_call(name: str, args: dict):
+    return SimpleNamespace(name=name, args=args, id=None)
+
+
+def _response(text: Optional[str], function_calls: list):
+    parts = [SimpleNamespace(text=text, function_call=None)] if text else []
+    content = SimpleNamespace(parts=parts, role="model")
+    return SimpleNamespace(
+        text=text, function_calls=function_calls or None,
+        candidates=[SimpleNamespace(content=content)],
+    )
+
+
+class FakeChat:
+    """One chat session: keeps a history like the real SDK and plays back the script."""
+
+    def __init__(self, script: Dict[str, ScriptedTurn], user_id: int, latency: Latency, seed: int):
+        self.script = script
+        self.user_id = user_id
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.history = []
+        self.turns = 0
+        self._pending: List[List[ToolCall]] = []
+        self._turn: Optional[ScriptedTurn] = None
+
+    def _next(self, message):
+        self.history.append(message)
+        if isinstance(message, str):
+            # A user message starts a turn; anything else is the tool results of the current one
+            self.turns += 1
+            self._turn = self.script.get(message, ScriptedTurn(message, [], "I'm not sure how to help with that."))
+            self._pending = list(self._turn.rounds)
+        if self._pending:
+            ctx = {"user_id": self.user_id, "rng": self.rng, "turn": self.turns,
+                   "today": datetime.combine(datetime.now().date(), datetime.min.time())}
+            calls = [_function_call(call.name, call.args(ctx)) for call in self._pending.pop(0)]
+            response = _response(None, calls)
+        else:
+            response = _response(self._turn.reply if self._turn else "OK.", [])
+        self.history.append(response)
+        return response
+
+    def send_message(self, message):
+        self.latency.sleep(self.rng)
+        return self._next(message)
+
+    def send_message_stream(self, message):
+        self.latency.sleep(self.rng, self.latency.first_token_ms)
+        response = self._next(message)
+        if response.function_calls:
+            yield response
+            return
+        words = response.text.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(max(0.0, self.latency.mean_ms - self.latency.first_token_ms) / 1000 / len(words))
+            yield _response(word if i == 0 else " " + word, [])
+
+
+class FakeGenAIClient:
+    """Drop-in for genai.Client in get_agent(..., client=...), scripted for one user."""
+
+    def __init__(self, user_id: int, script: List[ScriptedTurn] = None, latency: Latency = None, seed: int = 0):
+        self.user_id = user_id
+        self.script = {turn.message: turn for turn in (script or DEFAULT_SCRIPT)}
+        self.latency = latency or Latency()
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._created = 0
+        self.chats = SimpleNamespace(create=self._create_chat)
+
+    def _create_chat(self, model: str = None, config=None, **kwargs) -> FakeChat:
+        with self._lock:
+            self._created += 1
+            seed = self.seed * 1000 + self._created
+        return FakeChat(self.script, self.user_id, self.latency, seed)
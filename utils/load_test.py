@@ -0,0 +1,256 @@
+"""
+Multi-user load test: many simulated sessions hitting CalendarService and the agent at once.
+Gemini is replaced by utils/fake_genai.py (scripted tool calls, configurable latency),
+so the agent loop, the tools and SQLite run for real without network or API key.
+Uses a throwaway database seeded by utils/synthetic_data.py; the real DB is never touched.
+
+Each session logs in, builds its agent, then loops over a weighted mix of actions
+(calendar view, sidebar search, conflict check, chat turn) with think time between them.
+Sessions run as threads; --processes splits them over several worker processes.
+
+Reports throughput, p50/p95/p99 latency per action, errors, SQLite lock errors
+(tools/metrics.py) and memory per session (tracemalloc over a few calibration sessions).
+Run this from command line:
+    python -m utils.load_test [--users 50] [--processes 1] [--duration 60] [--llm-ms 400] [--out FILE]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+from utils.fake_genai import DEFAULT_SCRIPT, FakeGenAIClient, Latency
+from utils.synthetic_data import SEED, seed_database, temporary_database
+
+PASSWORD = "load-test-password"
+EVENTS_PER_USER = 500
+THINK_TIME_MS = (200, 1500)      # Pause between a session's actions, like a user reading the page
+MEMORY_SAMPLE_SESSIONS = 5
+
+# (action, weight): most reruns only redraw the calendar
+ACTIONS = [("calendar_view", 50), ("search", 15), ("conflicts", 10), ("chat_turn", 25)]
+
+
+class Recorder:
+    """Thread-safe latency samples and error counts per action."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def timed(self, action: str, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self.errors[action] += 1
+            print(f"Warning: {action} failed: {e}")
+            return None
+        finally:
+            elapsed = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                self.samples[action].append(elapsed)
+        # Tools report failures as text instead of raising
+        if isinstance(result, str) and result.startswith("Error"):
+            with self._lock:
+                self.errors[action] += 1
+        return result
+
+
+def _month_windows(today: date):
+    first = today.replace(day=1)
+    return [((first + timedelta(days=31 * k)).replace(day=1) - timedelta(days=7),
+             (first + timedelta(days=31 * k)).replace(day=1) + timedelta(days=42))
+            for k in range(-1, 3)]
+
+
+def run_session(index: int, user_id: int, deadline: float, latency: Latency, recorder: Recorder,
+                seed: int, think_ms=THINK_TIME_MS):
+    """One simulated user: login, agent creation, then weighted actions until the deadline."""
+    from services.calendar_service import CalendarService
+    from src.agent import get_agent
+
+    rng = random.Random(seed * 10_000 + index)
+    recorder.timed("login", CalendarService.authenticate, f"user_{index + 1}", PASSWORD)
+    client = FakeGenAIClient(user_id, latency=latency, seed=seed * 10_000 + index)
+    agent = recorder.timed("get_agent", get_agent, user_id, f"user_{index + 1}", client=client)
+    if agent is None:
+        return
+
+    windows = [(a.isoformat(), b.isoformat()) for a, b in _month_windows(date.today())]
+    actions, weights = zip(*ACTIONS)
+    while time.time() < deadline:
+        action = rng.choices(actions, weights)[0]
+        if action == "calendar_view":
+            recorder.timed(action, CalendarService.get_ui_events, user_id, *rng.choice(windows))
+        elif action == "search":
+            recorder.timed(action, CalendarService.search_events, user_id, rng.choice(["math", "gym", "team sync"]))
+        elif action == "conflicts":
+            recorder.timed(action, CalendarService.get_conflict_report, user_id)
+        else:
+            recorder.timed(action, agent.send_message, rng.choice(DEFAULT_SCRIPT).message)
+        time.sleep(rng.uniform(*think_ms) / 1000)
+
+
+def _run_worker(db_path: str, sessions: list, duration: float, latency: Latency, seed: int) -> dict:
+    """Runs a slice of the sessions as threads in this process and returns its raw results."""
+    from tools.metrics import DB_LOCK_ERRORS, registry
+    database_ops.close_all_connections()
+    database_ops.DB_PATH = db_path
+    registry.reset()
+
+    recorder = Recorder()
+    deadline = time.time() + duration
+    threads = [
+        threading.Thread(target=run_session, args=(index, user_id, deadline, latency, recorder, seed),
+                         name=f"session-{index}", daemon=True)
+        for index, user_id in sessions
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lock_errors = sum(series["value"] for series in DB_LOCK_ERRORS._snapshot())
+    return {
+        "samples": dict(recorder.samples),
+        "errors": dict(recorder.errors),
+        "lock_errors": lock_errors,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "pool": database_ops.get_pool_stats(),
+    }
+
+
+def measure_session_memory(user_ids: list, latency: Latency, seed: int, n: int = MEMORY_SAMPLE_SESSIONS) -> float:
+    """Average bytes retained per session (login, agent, one pass over the script), via tracemalloc."""
+    from services.calendar_service import CalendarService
+    from src.agent import get_agent
+
+    fast = Latency(mean_ms=0, jitter_ms=0, first_token_ms=0)
+    # Warm imports and shared caches first, so they are not charged to the sessions
+    warm = get_agent(user_ids[0], "user_1", client=FakeGenAIClient(user_ids[0], latency=fast))
+    warm.send_message(DEFAULT_SCRIPT[0].message)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        sessions = []
+        for i, user_id in enumerate(user_ids[:n]):
+            agent = get_agent(user_id, f"user_{i + 1}", client=FakeGenAIClient(user_id, latency=fast, seed=seed))
+            for turn in DEFAULT_SCRIPT:
+                agent.send_message(turn.message)
+            sessions.append((agent, CalendarService.get_ui_events(user_id)))
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return retained / max(1, len(sessions))
+
+
+def _percentile(sorted_samples: list, q: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * q))]
+
+
+def summarize(worker_results: list, duration: float) -> dict:
+    samples, errors = defaultdict(list), defaultdict(int)
+    for result in worker_results:
+        for action, values in result["samples"].items():
+            samples[action].extend(values)
+        for action, count in result["errors"].items():
+            errors[action] += count
+
+    actions = {}
+    for action, values in sorted(samples.items()):
+        values.sort()
+        actions[action] = {
+            "count": len(values),
+            "errors": errors.get(action, 0),
+            "per_second": round(len(values) / duration, 2),
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(_percentile(values, 0.95), 2),
+            "p99_ms": round(_percentile(values, 0.99), 2),
+            "max_ms": round(values[-1], 2),
+        }
+    steady = [a for a in actions if a not in ("login", "get_agent")]
+    return {
+        "throughput_per_second": round(sum(actions[a]["count"] for a in steady) / duration, 2),
+        "errors": sum(errors.values()),
+        "sqlite_lock_errors": sum(r["lock_errors"] for r in worker_results),
+        "max_rss_mib_per_process": round(max(r["max_rss_kib"] for r in worker_results) / 1024, 1),
+        "pool": [r["pool"] for r in worker_results],
+        "actions": actions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test CalendarService and the agent with a fake GenAI client.")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent sessions")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes the sessions are split over")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of steady load per session")
+    parser.add_argument("--events", type=int, default=EVENTS_PER_USER, help="Seeded events per user")
+    parser.add_argument("--llm-ms", type=float, default=400.0, help="Mean fake model latency per call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=150.0)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    latency = Latency(mean_ms=args.llm_ms, jitter_ms=args.llm_jitter_ms)
+    with temporary_database() as db_path:
+        from tools.auth import hash_password
+        t0 = time.perf_counter()
+        user_ids = seed_database(args.events * args.users, args.users, args.seed)
+        # One real hash shared by every synthetic user, so logins pay a genuine bcrypt check
+        password_hash = hash_password(PASSWORD)
+        conn = database_ops.get_db_connection()
+        conn.execute("UPDATE users SET password_hash = ?", (password_hash,))
+        conn.commit()
+        conn.close()
+        print(f"Seeded {args.users} users x {args.events} events in {time.perf_counter() - t0:.1f} s")
+
+        per_session = measure_session_memory(user_ids, latency, args.seed)
+
+        sessions = list(enumerate(user_ids))
+        slices = [sessions[i::args.processes] for i in range(args.processes)]
+        print(f"Running {args.users} sessions in {args.processes} process(es) for {args.duration:.0f} s...")
+        started = time.perf_counter()
+        if args.processes == 1:
+            results = [_run_worker(db_path, sessions, args.duration, latency, args.seed)]
+        else:
+            database_ops.close_all_connections()  # Never share pooled connections across fork
+            with ProcessPoolExecutor(max_workers=args.processes) as pool:
+                futures = [pool.submit(_run_worker, db_path, s, args.duration, latency, args.seed) for s in slices if s]
+                results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - started
+
+    report = summarize(results, elapsed)
+    report["config"] = {"users": args.users, "processes": args.processes, "duration_s": args.duration,
+                        "events_per_user": args.events, "llm_ms": args.llm_ms, "llm_jitter_ms": args.llm_jitter_ms}
+    report["memory_per_session_kib"] = round(per_session / 1024, 1)
+
+    print(f"\n{'action':<15} {'count':>7} {'err':>5} {'/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, s in report["actions"].items():
+        print(f"{action:<15} {s['count']:>7} {s['errors']:>5} {s['per_second']:>8.2f} {s['p50_ms']:>9.1f}"
+              f" {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+    print(f"\nThroughput: {report['throughput_per_second']} actions/s | errors: {report['errors']}"
+          f" | SQLite lock errors: {report['sqlite_lock_errors']}")
+    print(f"Memory: ~{report['memory_per_session_kib']} KiB per session,"
+          f" peak RSS {report['max_rss_mib_per_process']} MiB per process")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Seeded synthetic calendars for benchmarks and load tests.
+Generates users and a realistic mix of events: timed and all-day one-offs plus
+daily, weekly, monthly and yearly series, with and without recurrence_end.
+The same seed always produces the same rows, so runs on different commits compare.
+
+temporary_database() points tools.database_ops at a throwaway SQLite file for the
+duration of a `with` block; the real data/scheduler.db is never touched.
+Run this from command line: python -m utils.synthetic_data OUT.db [--events 10000] [--users 10] [--seed 42]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.database_ops as database_ops
+
+SEED = 42
+SPAN_DAYS = 730          # Events start between ~6 months ago and ~18 months ahead
+PAST_DAYS = 180
+
+# (kind, weight): roughly what a student/worker calendar looks like
+EVENT_MIX = [("timed", 62), ("all_day", 8), ("daily", 4), ("weekly", 16), ("monthly", 6), ("yearly", 4)]
+RECURRENCE_END_SHARE = 0.5     # Share of series that stop at a recurrence_end
+SERIES_LENGTH_DAYS = {"daily": (7, 60), "weekly": (28, 180), "monthly": (90, 540), "yearly": (365, 1825)}
+DURATIONS_MIN = (30, 45, 60, 60, 90, 120, 180)
+
+WHAT = ["Math", "Physics", "Chemistry", "History", "Team", "Project", "Client", "Dentist", "Gym",
+        "Guitar", "Lunch", "Dinner", "Review", "Yoga", "Doctor", "Standup", "Workshop", "Exam"]
+KIND = ["Lecture", "Lab", "Meeting", "Sync", "Appointment", "Session", "Lesson", "Call", "Deadline", "Party"]
+COLORS = ["#0a9905", "#0080FF", "#FF0000", "#e3e627", "#03399e", "#5a0070", "#999999"]
+
+# A cheap placeholder: synthetic users never log in, so no bcrypt round is spent on them
+SYNTHETIC_PASSWORD_HASH = "synthetic"
+
+
+def base_date(today: date = None) -> datetime:
+    """Monday PAST_DAYS before today, so "from now on" queries see past and future events."""
+    today = today or date.today()
+    start = today - timedelta(days=PAST_DAYS)
+    return datetime.combine(start - timedelta(days=start.weekday()), datetime.min.time())
+
+
+def generate_events(n: int, user_ids, rng: random.Random, base: datetime = None) -> list:
+    """
+    Returns n event dicts (user_id, title, start, end, allDay, recurrence, recurrence_end, color),
+    spread round-robin over user_ids. Titles are unique per user.
+    """
+    base = base or base_date()
+    kinds = [kind for kind, _ in EVENT_MIX]
+    weights = [weight for _, weight in EVENT_MIX]
+    user_ids = list(user_ids)
+    events = []
+    for i in range(n):
+        kind = rng.choices(kinds, weights)[0]
+        day = base + timedelta(days=rng.randrange(SPAN_DAYS))
+        title = f"{rng.choice(WHAT)} {rng.choice(KIND)} {i}"
+        if kind == "all_day":
+            start, end, all_day = day, day + timedelta(days=rng.choice((1, 1, 1, 2, 3))), True
+        else:
+            start = day + timedelta(hours=rng.randrange(7, 21), minutes=rng.choice((0, 15, 30, 45)))
+            end, all_day = start + timedelta(minutes=rng.choice(DURATIONS_MIN)), False
+
+        recurrence = recurrence_end = None
+        if kind in SERIES_LENGTH_DAYS:
+            recurrence = kind
+            if rng.random() < RECURRENCE_END_SHARE:
+                recurrence_end = (start + timedelta(days=rng.randint(*SERIES_LENGTH_DAYS[kind]))).date().isoformat()
+
+        events.append({
+            "user_id": user_ids[i % len(user_ids)],
+            "title": title,
+            "start": start.date().isoformat() if all_day else start.isoformat(),
+            "end": end.date().isoformat() if all_day else end.isoformat(),
+            "allDay": all_day,
+            "recurrence": recurrence,
+            "recurrence_end": recurrence_end,
+            "color": rng.choice(COLORS),
+        })
+    return events
+
+
+def create_users(n_users: int) -> list:
+    """Inserts synthetic users (user_1, user_2, ...) and returns their ids."""
+    conn = database_ops.get_db_connection()
+    ids = []
+    for i in range(1, n_users + 1):
+        cursor = conn.execute(
+            "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
+            (f"user_{i}", SYNTHETIC_PASSWORD_HASH, f"user_{i}@example.com")
+        )
+        ids.append(cursor.lastrowid)
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def insert_events(events: list):
+    """
+    Writes events in one transaction with plain INSERTs (triggers keep versions and FTS in sync).
+    Stored conflicts are not computed here; they are rebuilt on the first conflict read.
+    """
+    conn = database_ops.get_db_connection()
+    conn.executemany(
+        """INSERT INTO events (user_id, allDay, title, start, end, recurrence, recurrence_end, backgroundColor, borderColor)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (e["user_id"], int(e["allDay"]), e["title"], e["start"], e["end"],
+             e["recurrence"], e["recurrence_end"], e["color"], e["color"])
+            for e in events
+        ]
+    )
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def seed_database(n_events: int, n_users: int = 1, seed: int = SEED, events_per_user: dict = None) -> list:
+    """
+    Creates n_users users and n_events events spread evenly over them, in the current DB_PATH.
+    events_per_user ({user_index: n}, 0-based) overrides the spread for specific users.
+    Returns the user ids.
+    """
+    rng = random.Random(seed)
+    user_ids = create_users(n_users)
+    events = []
+    if events_per_user:
+        for index, n in sorted(events_per_user.items()):
+            events.extend(generate_events(n, [user_ids[index]], rng))
+        rest = [uid for i, uid in enumerate(user_ids) if i not in events_per_user]
+        if rest:
+            events.extend(generate_events(n_events, rest, rng))
+    else:
+        events = generate_events(n_events, user_ids, rng)
+    insert_events(events)
+    return user_ids
+
+
+@contextmanager
+def temporary_database(db_path: str = None):
+    """
+    Points tools.database_ops at a fresh, migrated SQLite file for the duration of the block.
+    Without db_path, the file lives in a temp directory that is removed afterwards.
+    """
+    original_path = database_ops.DB_PATH
+    tmp_dir = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, "synthetic.db")
+    database_ops.close_all_connections()
+    database_ops.DB_PATH = db_path
+    try:
+        database_ops.init_db()
+        yield db_path
+    finally:
+        database_ops.close_all_connections()
+        database_ops.DB_PATH = original_path
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic AgendAI database.")
+    parser.add_argument("out", help="Path of the new SQLite file (must not exist)")
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out)
+    if os.path.exists(out):
+        raise SystemExit(f"❌ {out} already exists; pick a new path")
+    if out == os.path.abspath(database_ops.DB_PATH):
+        raise SystemExit("❌ Refusing to write into the app database")
+
+    t0 = time.perf_counter()
+    with temporary_database(out):
+        seed_database(args.events, args.users, args.seed)
+    print(f"✅ Wrote {args.events:,} events for {args.users} users to {out} in {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == "__main__":
+    main()